@@ -0,0 +1,319 @@
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Description: Nodos del árbol sintáctico abstracto (AST) del lenguaje.
+#   Cada clase usa __slots__ para no reservar un diccionario por nodo, y
+#   guarda la fila y columna donde comienza en el código fuente.
+
+import sys
+
+
+class Node():
+    """Nodo base del AST.
+
+        _fields indica, en orden, los atributos que contienen hijos (un nodo,
+        una lista de nodos o None). label() es el texto con el que se imprime.
+    """
+    __slots__ = ("lineno", "column")
+    _fields = ()
+
+    def __init__(self, lineno=0, column=0):
+        self.lineno = lineno
+        self.column = column
+
+    def children(self):
+        """Devuelve la lista de hijos del nodo, en orden."""
+        result = []
+        for name in self._fields:
+            value = getattr(self, name)
+            if isinstance(value, list):
+                result.extend(value)
+            elif value is not None:
+                result.append(value)
+        return result
+
+    def label(self):
+        return type(self).__name__
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}"
+                           for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+#------------------------------------------------
+# Instrucciones
+#------------------------------------------------
+
+class Block(Node):
+    __slots__ = ("declare", "body", "symbols")
+    _fields = ("declare", "body")
+
+    def __init__(self, declare, body, lineno=0, column=0):
+        Node.__init__(self, lineno, column)
+        self.declare = declare    # DeclareSection o None
+        self.body = body          # instrucción, Secuencing o None
+        self.symbols = None       # resolver.SymbolTable, tras resolver el árbol
+
+
+class DeclareSection(Node):
+    __slots__ = ("declarations",)
+    _fields = ("declarations",)
+
+    def __init__(self, declarations, lineno=0, column=0):
+        Node.__init__(self, lineno, column)
+        self.declarations = declarations  # lista de Declare
+
+    def label(self):
+        return "Declare"
+
+
+class Declare(Node):
+    """Declaración de una o más variables del mismo tipo.
+
+        type es "int", "bool" o "function"; size es el Literal N de
+        function[..N] (None para los otros tipos).
+    """
+    __slots__ = ("type", "names", "size")
+    _fields = ()
+
+    def __init__(self, type, names, size=None, lineno=0, column=0):
+        Node.__init__(self, lineno, column)
+        self.type = type
+        self.names = names        # lista de Ident
+        self.size = size
+
+    def type_name(self):
+        if self.type == "function":
+            return f"function[..{self.size.value}]"
+        return self.type
+
+    def label(self):
+        names = ", ".join(ident.name for ident in self.names)
+        return f"{names} : {self.type_name()}"
+
+
+class Secuencing(Node):
+    """Secuencia de dos o más instrucciones, guardadas en una lista plana."""
+    __slots__ = ("instructions",)
+    _fields = ("instructions",)
+
+    def __init__(self, instructions, lineno=0, column=0):
+        Node.__init__(self, lineno, column)
+        self.instructions = instructions
+
+
+class Asig(Node):
+    __slots__ = ("target", "value")
+    _fields = ("target", "value")
+
+    def __init__(self, target, value, lineno=0, column=0):
+        Node.__init__(self, lineno, column)
+        self.target = target      # Ident
+        self.value = value        # expresión o WriteFunction
+
+
+class TwoPoints(Node):
+    """Par índice:valor de una modificación de función."""
+    __slots__ = ("index", "value")
+    _fields = ("index", "value")
+
+    def __init__(self, index, value, lineno=0, column=0):
+        Node.__init__(self, lineno, column)
+        self.index = index
+        self.value = value
+
+
+class If(Node):
+    __slots__ = ("guards",)
+    _fields = ("guards",)
+
+    def __init__(self, guards, lineno=0, column=0):
+        Node.__init__(self, lineno, column)
+        self.guards = guards      # lista de Guard
+
+
+class Guard(Node):
+    """Comando con guardia: condition --> body"""
+    __slots__ = ("condition", "body")
+    _fields = ("condition", "body")
+
+    def __init__(self, condition, body, lineno=0, column=0):
+        Node.__init__(self, lineno, column)
+        self.condition = condition
+        self.body = body
+
+
+class While(Node):
+    __slots__ = ("condition", "body")
+    _fields = ("condition", "body")
+
+    def __init__(self, condition, body, lineno=0, column=0):
+        Node.__init__(self, lineno, column)
+        self.condition = condition
+        self.body = body
+
+
+class Print(Node):
+    __slots__ = ("value",)
+    _fields = ("value",)
+
+    def __init__(self, value, lineno=0, column=0):
+        Node.__init__(self, lineno, column)
+        self.value = value
+
+
+class Skip(Node):
+    __slots__ = ()
+
+
+#------------------------------------------------
+# Expresiones
+#------------------------------------------------
+
+class Expr(Node):
+    """Expresión. type es su tipo ("int", "bool", "string" o
+        "function[..N]"), que completa typechecker.py; None si no se verificó
+        o si la expresión tiene un error de tipos.
+    """
+    __slots__ = ("type",)
+
+    def __init__(self, lineno=0, column=0):
+        Node.__init__(self, lineno, column)
+        self.type = None
+
+
+class BinOp(Expr):
+    """Operación binaria. op es el nombre del operador en la gramática:
+        Plus, Minus, Mult, Equal, NEqual, Less, Leq, Greater, Geq, And, Or.
+    """
+    __slots__ = ("op", "left", "right")
+    _fields = ("left", "right")
+
+    def __init__(self, op, left, right, lineno=0, column=0):
+        Expr.__init__(self, lineno, column)
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def label(self):
+        return self.op
+
+
+class UnaryOp(Expr):
+    """Operación unaria. op es Not o Minus."""
+    __slots__ = ("op", "operand")
+    _fields = ("operand",)
+
+    def __init__(self, op, operand, lineno=0, column=0):
+        Expr.__init__(self, lineno, column)
+        self.op = op
+        self.operand = operand
+
+    def label(self):
+        return self.op
+
+
+class App(Expr):
+    """Acceso a una función: function.index"""
+    __slots__ = ("function", "index")
+    _fields = ("function", "index")
+
+    def __init__(self, function, index, lineno=0, column=0):
+        Expr.__init__(self, lineno, column)
+        self.function = function
+        self.index = index
+
+
+class WriteFunction(Expr):
+    """Modificación funcional F(a:b)(c:d)... de una función."""
+    __slots__ = ("function", "updates")
+    _fields = ("function", "updates")
+
+    def __init__(self, function, updates, lineno=0, column=0):
+        Expr.__init__(self, lineno, column)
+        self.function = function  # Ident
+        self.updates = updates    # lista de TwoPoints
+
+
+class Literal(Expr):
+    """Literal entero o booleano."""
+    __slots__ = ("value",)
+
+    def __init__(self, value, lineno=0, column=0):
+        Expr.__init__(self, lineno, column)
+        self.value = value
+
+    def label(self):
+        if isinstance(self.value, bool):
+            return f"Literal: {'true' if self.value else 'false'}"
+        return f"Literal: {self.value}"
+
+
+class String(Expr):
+    __slots__ = ("value",)
+
+    def __init__(self, value, lineno=0, column=0):
+        Expr.__init__(self, lineno, column)
+        self.value = value
+
+    def label(self):
+        return f"String: \"{self.value}\""
+
+
+class Ident(Expr):
+    """Identificador. depth y slot son la dirección de la variable (la
+        profundidad del Block que la declara y su posición en él); los
+        completa resolver.py, y quedan en None si no fue declarada.
+    """
+    __slots__ = ("name", "depth", "slot")
+
+    def __init__(self, name, lineno=0, column=0):
+        Expr.__init__(self, lineno, column)
+        self.name = name
+        self.depth = None
+        self.slot = None
+
+    def label(self):
+        return f"Ident: {self.name}"
+
+
+def sequence(instructions):
+    """Devuelve la instrucción si es una sola, o un Secuencing con todas."""
+    if len(instructions) == 1:
+        return instructions[0]
+    first = instructions[0]
+    return Secuencing(instructions, first.lineno, first.column)
+
+
+def imprimir_ast(arbol, out=None, chunk_size=1 << 16):
+    """Imprime el árbol con un guión por cada nivel de profundidad.
+
+        Recorre el árbol con una pila explícita (la profundidad del árbol no
+        consume la pila de Python) y escribe la salida en bloques de
+        chunk_size caracteres.
+    """
+    if arbol is None:
+        return
+    if out is None:
+        out = sys.stdout
+
+    dashes = [""]  # dashes[n] es "-"*n, se construye una vez por nivel
+    buffer = []
+    size = 0
+    stack = [(arbol, 0)]
+    while stack:
+        node, depth = stack.pop()
+        while len(dashes) <= depth:
+            dashes.append(dashes[-1] + "-")
+        line = dashes[depth] + node.label() + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            out.write("".join(buffer))
+            buffer.clear()
+            size = 0
+
+        children = node.children()
+        depth += 1
+        for i in range(len(children) - 1, -1, -1):
+            stack.append((children[i], depth))
+    out.write("".join(buffer))
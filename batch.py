@@ -0,0 +1,111 @@
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Description: Análisis de muchos archivos .imperat en paralelo.
+#
+#   Este proceso construye el lexer, el parser y sus tablas una sola vez y
+#   crea con fork un pool de procesos que los heredan ya construidos (como
+#   daemon.py). Los archivos se reparten del más grande al más chico, así los
+#   más largos no quedan para el final con los demás procesos sin trabajo. La
+#   salida de cada archivo es la misma que la del programa correspondiente, y
+#   se escribe en el orden de entrada apenas están listos los anteriores.
+#
+#   Uso: python batch.py [-j N] {lex,parse,run,check} archivos o directorios
+#                        [opciones del comando, con =: --format=jsonl]
+
+import argparse
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from lexer import imperat_files
+from daemon import run_command, warm
+from client import COMMANDS
+
+
+def run_file(command, options, index, path, cwd):
+    """Ejecuta command sobre un archivo, en un proceso del pool."""
+    return index, run_command(command, options + [path], cwd)
+
+
+def by_size(files):
+    """Índices de files del archivo más grande al más chico (los que no
+        existen al final; su error se reporta igual)."""
+    def size(index):
+        try:
+            return os.path.getsize(files[index])
+        except OSError:
+            return -1
+    return sorted(range(len(files)), key=size, reverse=True)
+
+
+def run_batch(command, files, options=(), jobs=None, out=None, err=None):
+    """Ejecuta command sobre cada archivo de files en un pool de jobs
+        procesos y escribe las salidas en out (y los mensajes de error en
+        err) en el orden de files. Devuelve el mayor código de salida.
+    """
+    if out is None:
+        out = sys.stdout
+    if err is None:
+        err = sys.stderr
+    jobs = jobs or os.cpu_count() or 1
+    options = list(options)
+    # como lexer.py: cada archivo con su nombre, salvo en los formatos jsonl y
+    # tsv, que ya lo llevan en cada línea
+    headers = len(files) > 1 and not any(
+        option.startswith("--format=") and option != "--format=text" for option in options)
+    cwd = os.getcwd()
+    status = 0
+    done = {}
+    following = 0
+
+    pool = ProcessPoolExecutor(max_workers=jobs,
+                               mp_context=multiprocessing.get_context("fork"))
+    try:
+        # los procesos se crean ahora, con el lexer y el parser ya construidos
+        list(pool.map(warm, range(jobs)))
+        futures = [pool.submit(run_file, command, options, index, files[index], cwd)
+                   for index in by_size(files)]
+        for future in as_completed(futures):
+            index, result = future.result()
+            done[index] = result
+            # se escriben los resultados que ya siguen en el orden de entrada
+            while following in done:
+                result = done.pop(following)
+                if headers:
+                    out.write(f"==> {files[following]} <==\n")
+                out.write(result["stdout"] or ("\n" if headers else ""))
+                err.write(result["stderr"])
+                status = max(status, result["status"])
+                following += 1
+    finally:
+        pool.shutdown(cancel_futures=True)
+    return status
+
+
+def main():
+    argparser = argparse.ArgumentParser(add_help=True)
+    argparser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    argparser.add_argument("command", choices=COMMANDS)
+    argparser.add_argument("paths", nargs="*")
+    # las opciones desconocidas se pasan al comando; deben llevar su valor
+    # con = (--format=jsonl), si no el valor se tomaría como un archivo
+    args, options = argparser.parse_known_args()
+
+    if not args.paths:
+        print("Error: Por favor proporcione un archivo .imperat como argumento")
+        print("Uso: python batch.py [-j N] comando archivos")
+        sys.exit(1)
+
+    for path in args.paths:
+        if not os.path.isdir(path) and not path.endswith('.imperat'):
+            print("Error: El archivo debe tener extensión .imperat")
+            sys.exit(1)
+
+    files = imperat_files(args.paths)
+    if not files:
+        return
+    sys.exit(run_batch(args.command, files, options, args.jobs))
+
+
+if __name__ == "__main__":
+    main()
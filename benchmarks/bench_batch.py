@@ -0,0 +1,72 @@
+# Description: Benchmark de batch.py. Genera un corpus de programas de
+# generador.py de tamaños muy distintos y compara el tiempo de analizarlo con
+# un proceso por archivo (como un script que llama a parse.py por cada uno)
+# contra batch.py con 1, 2, 4... procesos, hasta la cantidad de núcleos.
+#
+# Uso: python benchmarks/bench_batch.py [archivos] [comando]
+
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from batch import run_batch
+from generador import generar, FORMAS
+
+# archivos, repartidos en el corpus, que se analizan con un proceso por archivo
+# (el tiempo del corpus completo se extrapola)
+MUESTRA = 20
+
+
+def corpus(directorio, n, rng):
+    """n programas; la mayoría chicos y unos pocos grandes, como un
+        repositorio real."""
+    archivos = []
+    for i in range(n):
+        forma = rng.choice(list(FORMAS))
+        tamano = int(rng.paretovariate(1.2) * 10)
+        path = os.path.join(directorio, f"programa{i:05}.imperat")
+        with open(path, "w") as file:
+            file.write(generar(forma, tamano, i))
+        archivos.append(path)
+    return archivos
+
+
+def un_proceso_por_archivo(archivos, comando):
+    # check no tiene un programa propio; parse.py es lo más cercano
+    programa = {"lex": "lexer.py", "run": "vm.py"}.get(comando, "parse.py")
+    muestra = archivos[::max(1, len(archivos) // MUESTRA)]
+    t = time.perf_counter()
+    for path in muestra:
+        subprocess.run([sys.executable, os.path.join(ROOT, programa), path],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - t) / len(muestra) * len(archivos)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    comando = sys.argv[2] if len(sys.argv) > 2 else "parse"
+    nucleos = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as directorio, open(os.devnull, "w") as nulo:
+        archivos = corpus(directorio, n, random.Random(0))
+        kb = sum(os.path.getsize(path) for path in archivos) / 1024
+        print(f"{n} archivos, {kb:.0f} KB, comando {comando}, {nucleos} núcleos")
+        print(f"  un proceso por archivo  {un_proceso_por_archivo(archivos, comando):8.2f} s"
+              f" (extrapolado de {MUESTRA})")
+        base = None
+        for procesos in sorted({2 ** i for i in range(nucleos.bit_length())} | {nucleos}):
+            t = time.perf_counter()
+            run_batch(comando, archivos, jobs=procesos, out=nulo, err=nulo)
+            tiempo = time.perf_counter() - t
+            base = base or tiempo
+            print(f"  batch.py -j {procesos:<3}          {tiempo:8.2f} s"
+                  f"  x{base / tiempo:.2f} ({base / tiempo / procesos:.0%} de lo lineal)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Description: Benchmark de daemon.py. Compara el tiempo de analizar un archivo
+# con un proceso nuevo (python lexer.py), con el cliente liviano contra el
+# daemon (python client.py) y con peticiones concurrentes al socket, que es
+# lo que haría un editor o un hook con la conexión abierta.
+#
+# Uso: python benchmarks/bench_daemon.py [peticiones]
+
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from client import encode_frame, decode_frame, frame_size, HEADER
+
+ARCHIVO = os.path.join(ROOT, "TestCases", "Tests", "prueba3.imperat")
+
+
+def procesos(programa, n, entorno):
+    t = time.perf_counter()
+    for _ in range(n):
+        subprocess.run([sys.executable, os.path.join(ROOT, programa), ARCHIVO],
+                       stdout=subprocess.DEVNULL, check=True, env=entorno)
+    return (time.perf_counter() - t) / n
+
+
+async def concurrentes(socket, n, clientes):
+    """n peticiones repartidas en clientes conexiones simultáneas."""
+    async def cliente(peticiones):
+        reader, writer = await asyncio.open_unix_connection(socket)
+        for i in range(peticiones):
+            writer.write(encode_frame({"id": i, "command": "lex",
+                                       "argv": [ARCHIVO], "cwd": ROOT}))
+        await writer.drain()
+        for _ in range(peticiones):
+            header = await reader.readexactly(HEADER.size)
+            decode_frame(await reader.readexactly(frame_size(header)))
+        writer.close()
+
+    t = time.perf_counter()
+    await asyncio.gather(*(cliente(n // clientes) for _ in range(clientes)))
+    return (time.perf_counter() - t) / n
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    socket = os.path.join(tempfile.mkdtemp(), "imperat.sock")
+    entorno = dict(os.environ, IMPERAT_SOCKET=socket)
+    daemon = subprocess.Popen([sys.executable, os.path.join(ROOT, "daemon.py"),
+                               "--socket", socket], stderr=subprocess.DEVNULL)
+    try:
+        while not os.path.exists(socket):
+            time.sleep(0.05)
+        print(f"Tiempo por archivo ({n} archivos)")
+        print(f"  python lexer.py    {procesos('lexer.py', n, entorno) * 1000:7.1f} ms")
+        print(f"  python client.py   {procesos('client.py', n, entorno) * 1000:7.1f} ms")
+        for clientes in (1, 8):
+            tiempo = asyncio.run(concurrentes(socket, n * 10, clientes))
+            print(f"  socket, {clientes} conexiones {tiempo * 1000:7.2f} ms")
+    finally:
+        daemon.terminate()
+        daemon.wait()
+
+
+if __name__ == "__main__":
+    main()
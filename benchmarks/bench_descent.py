@@ -0,0 +1,135 @@
+# Description: Compara el parser de descent.py con el LALR de PLY.
+#
+#   1. Prueba diferencial: ambos deben producir el mismo árbol (clase, fila,
+#      columna y atributos de cada nodo) y los mismos errores sobre cada caso
+#      de TestCases, sobre los programas de generador.py y sobre entradas
+#      aleatorias: mutaciones de los casos de prueba e instrucciones con
+#      expresiones que mezclan todos los operadores, los prefijos y los
+#      paréntesis. Termina con 1 ante la primera diferencia.
+#   2. Velocidad: tiempo de cada uno sobre los tokens ya leídos de los mismos
+#      programas.
+#
+# Uso: python benchmarks/bench_descent.py [casos aleatorios] [semilla]
+
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import TokenBuffer
+from parse import parse_source, parse_buffer
+from ast_nodes import Node
+from generador import generar, FORMAS
+from entradas import casos_de_prueba, mutar
+
+# piezas con las que se mutan los casos de prueba
+PIEZAS = ["{", "}", ".", ",", "(", ")", ":=", ":", ";", ";;", "-->", "-", "[]",
+          "[..", "]", "+", "*", "!", "<", "<=", "<>", ">", ">=", "==", " and ",
+          " or ", "x", "F", "if ", " fi", " end", "while ", "int ", "print ",
+          "skip", "1", "true", "\"a\"", "F(1:2)", "F.x"]
+
+OPERADORES = ["+", "-", "*", "and", "or", "==", "<>", "<", "<=", ">", ">=", "."]
+ATOMOS = ["x", "F", "2", "true", "false", "\"s\""]
+
+
+def nodos(arbol):
+    """El árbol en preorden como lista de tuplas, con una pila explícita."""
+    resultado = []
+    pila = [arbol]
+    while pila:
+        valor = pila.pop()
+        if isinstance(valor, list):
+            resultado.append(("lista", len(valor)))
+            pila.extend(reversed(valor))
+        elif isinstance(valor, Node):
+            resultado.append((type(valor).__name__, valor.lineno, valor.column))
+            hijos = [getattr(valor, nombre) for clase in type(valor).__mro__
+                     for nombre in getattr(clase, "__slots__", ())
+                     if nombre not in ("lineno", "column")]
+            pila.extend(reversed(hijos))
+        else:
+            resultado.append((type(valor).__name__, valor))
+    return resultado
+
+
+def analizar(source, backend):
+    errores = []
+    arbol = parse_source(source, errores, backend)
+    return nodos(arbol), errores
+
+
+def expresion(rng, nivel):
+    if nivel == 0 or rng.random() < 0.3:
+        return rng.choice(ATOMOS)
+    r = rng.random()
+    if r < 0.2:
+        return rng.choice(["-", "!"]) + expresion(rng, nivel - 1)
+    if r < 0.3:
+        return "(" + expresion(rng, nivel - 1) + ")"
+    return (expresion(rng, nivel - 1) + " " + rng.choice(OPERADORES) + " "
+            + expresion(rng, nivel - 1))
+
+
+def instrucciones(rng):
+    """Un programa válido para la gramática (no para los tipos) con
+        expresiones aleatorias en cada posición donde van."""
+    e = lambda: expresion(rng, 5)
+    return ("{ function[..3] F; int x;\n"
+            f"  x := {e()};\n"
+            f"  while {e()} --> print {e()};; end;\n"
+            f"  if {e()} --> skip [] {e()} --> x := F({e()}:{e()})(1:{e()}) fi\n"
+            "}")
+
+
+def diferencial(base, rng, n):
+    entradas = list(base)
+    entradas += [(f"generador {forma}", generar(forma, tamano, semilla))
+                 for forma in FORMAS for tamano in (1, 40, 400) for semilla in range(2)]
+    entradas += [(f"mutación {i}", mutar(rng.choice(base)[1], rng, PIEZAS, 3)) for i in range(n)]
+    entradas += [(f"expresiones {i}", instrucciones(rng)) for i in range(n)]
+    validas = 0
+    for nombre, source in entradas:
+        esperado = analizar(source, "yacc")
+        obtenido = analizar(source, "descent")
+        if esperado != obtenido:
+            print(f"Diferencia en {nombre}: {source!r}")
+            for parte, a, b in zip(("árbol", "errores"), esperado, obtenido):
+                if a != b:
+                    print(f"  {parte}:\n    yacc    {a}\n    descent {b}")
+            sys.exit(1)
+        validas += esperado[0] != [("NoneType", None)]
+    print(f"Prueba diferencial: {len(entradas)} entradas ({validas} con árbol),"
+          f" mismos árboles y errores")
+
+
+def velocidad():
+    print(f"\n{'programa':<10} {'tokens':>8} {'yacc':>9} {'descent':>9} {'razón':>6}")
+    for forma in FORMAS:
+        # bloques anidados más allá de la pila de Python pasan a PLY
+        buffer = TokenBuffer.from_source(generar(forma, 200 if forma == "bloques" else 400))
+        medidas = {}
+        for backend in ("yacc", "descent"):
+            mejor = None
+            for _ in range(3):
+                t = time.perf_counter()
+                parse_buffer(buffer, [], backend)
+                tiempo = time.perf_counter() - t
+                mejor = tiempo if mejor is None else min(mejor, tiempo)
+            medidas[backend] = mejor
+        print(f"{forma:<10} {len(buffer):8} {medidas['yacc'] * 1000:7.1f}ms"
+              f" {medidas['descent'] * 1000:7.1f}ms"
+              f" {medidas['yacc'] / medidas['descent']:5.2f}x")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    semilla = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    diferencial(casos_de_prueba(), random.Random(semilla), n)
+    velocidad()
+
+
+if __name__ == "__main__":
+    main()
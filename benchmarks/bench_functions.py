@@ -0,0 +1,73 @@
+# Description: Benchmark de los valores function[..N] (functions.py).
+# Compara la representación persistente con copiar una lista completa en
+# cada modificación: memoria retenida tras k modificaciones encadenadas
+# (cada versión intermedia sigue viva) y tiempo de lectura y modificación.
+#
+# Uso: python benchmarks/bench_functions.py [modificaciones]
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from functions import FunctionValue
+
+
+def versiones_lista(n, cambios):
+    version = [0] * n
+    versiones = [version]
+    for index, value in cambios:
+        version = list(version)
+        version[index] = value
+        versiones.append(version)
+    return versiones
+
+
+def versiones_persistentes(n, cambios):
+    version = FunctionValue(n)
+    versiones = [version]
+    for index, value in cambios:
+        version = version.update([(index, value)])
+        versiones.append(version)
+    return versiones
+
+
+def medir(construir, n, cambios):
+    """Devuelve (MB retenidos, segundos) de construir todas las versiones."""
+    tracemalloc.start()
+    t = time.perf_counter()
+    versiones = construir(n, cambios)
+    tiempo = time.perf_counter() - t
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del versiones
+    return memoria / 2**20, tiempo
+
+
+def main():
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    random.seed(0)
+
+    print(f"{k} modificaciones encadenadas, todas las versiones vivas")
+    print(f"{'N':>9} {'lista MB':>10} {'persist. MB':>12} {'lista s':>9} {'persist. s':>11}")
+    for n in (100, 10000, 100000, 1000000):
+        cambios = [(random.randrange(n), i) for i in range(k)]
+        lista = medir(versiones_lista, n, cambios) if n * k <= 10**8 else (float("nan"),) * 2
+        persistente = medir(versiones_persistentes, n, cambios)
+        print(f"{n:>9} {lista[0]:10.2f} {persistente[0]:12.2f} {lista[1]:9.3f} {persistente[1]:11.3f}")
+
+    n = 1000000
+    funcion = FunctionValue(n).update((i, i) for i in range(0, n, 7))
+    indices = [random.randrange(n) for _ in range(200000)]
+    t = time.perf_counter()
+    for i in indices:
+        funcion.get(i)
+    print(f"\nLectura F.i con N={n}: {(time.perf_counter() - t) / len(indices) * 1e9:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Description: Benchmark de incremental.Document. Sobre un programa sintético
+# de bloques anidados mide el tiempo de analizarlo completo y el de aplicar
+# ediciones pequeñas dentro de un bloque interno, y verifica que el
+# resultado final es igual al de analizar el texto completo, con las mismas
+# filas y columnas. Agregar o quitar líneas corre la fila de los nodos
+# siguientes, pero eso se hace una vez, al pedir el árbol al final.
+#
+# Uso: python benchmarks/bench_incremental.py [bloques]
+
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import tokenize, lex_text
+from parse import run_parser, imprimir_ast
+from incremental import Document
+
+
+class Texto():
+    def __init__(self):
+        self.partes = []
+
+    def write(self, texto):
+        self.partes.append(texto)
+
+
+def impreso(arbol):
+    salida = Texto()
+    imprimir_ast(arbol, salida)
+    return "".join(salida.partes)
+
+
+def posiciones(arbol):
+    """Clase, fila y columna de cada nodo, en preorden."""
+    resultado = []
+    pila = [arbol]
+    while pila:
+        nodo = pila.pop()
+        resultado.append((type(nodo).__name__, nodo.lineno, nodo.column))
+        pila.extend(reversed(nodo.children()))
+    return resultado
+
+
+def programa(bloques):
+    """Bloque con bloques internos de tres niveles, cada uno con asignaciones."""
+    def bloque(nivel):
+        if nivel == 0:
+            return "x := x + 1;\nprint x"
+        return "{\n" + ";\n".join(bloque(nivel - 1) for _ in range(3)) + "\n}"
+    return "{\nint x;\n" + ";\n".join(bloque(3) for _ in range(bloques)) + "\n}\n"
+
+
+def main():
+    bloques = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    source = programa(bloques)
+
+    t = time.perf_counter()
+    documento = Document(source)
+    completo = time.perf_counter() - t
+    lineas = len(documento.lines)
+    print(f"Programa: {lineas} líneas, análisis completo {completo * 1000:.1f} ms")
+
+    random.seed(0)
+    # dentro de una línea (x + 1 -> x + 2) y agregando una línea nueva
+    ediciones = (("misma línea", "x + 1", 4, 1, "2"),
+                 ("línea nueva", "print x", 0, 0, "x := 2;\n"))
+    for nombre, buscar, desde, quitar, insertar in ediciones:
+        tiempos = []
+        for _ in range(50):
+            texto = documento.source
+            offset = texto.index(buscar, random.randrange(len(texto) // 2)) + desde
+            t = time.perf_counter()
+            documento.edit(offset, quitar, insertar)
+            tiempos.append(time.perf_counter() - t)
+        tiempos.sort()
+        print(f"Edición en {nombre}: mediana {tiempos[len(tiempos) // 2] * 1000:.2f} ms,"
+              f" máximo {tiempos[-1] * 1000:.2f} ms"
+              f" ({documento.relexed_lines} líneas y {documento.reparsed_tokens}"
+              f" tokens analizados en la última)")
+
+    t = time.perf_counter()
+    arbol = documento.tree
+    print(f"Árbol con las filas corridas: {(time.perf_counter() - t) * 1000:.1f} ms")
+
+    errores = []
+    esperado = run_parser(tokenize(documento.source), errores)
+    assert impreso(arbol) == impreso(esperado)
+    assert posiciones(arbol) == posiciones(esperado)
+    assert documento.lex_output() == lex_text(documento.source)
+
+
+if __name__ == "__main__":
+    main()
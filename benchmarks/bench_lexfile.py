@@ -0,0 +1,73 @@
+# Description: Benchmark de memoria de lexer.py sobre archivos grandes.
+# Mide el pico de memoria residente (RSS) de analizar archivos de tamaño
+# creciente leyéndolos completos (modo normal) y con --mmap. Con --mmap el
+# pico debe mantenerse casi constante. Cada medición se hace en un proceso
+# nuevo y la salida se descarta.
+#
+# Uso: python benchmarks/bench_lexfile.py [megabytes máximos]
+
+import glob
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def bloque():
+    """Concatenación de los casos de prueba sin errores léxicos."""
+    import lexer
+    programas = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "TestCases", "**", "*.imperat"),
+                                 recursive=True)):
+        with open(path) as file:
+            source = file.read()
+        errors = []
+        for _ in lexer.tokenize(source, errors):
+            pass
+        if not errors:
+            programas.append(source)
+    return "\n".join(programas) + "\n"
+
+
+def medir(argumentos):
+    """Ejecuta lexer.main con argumentos en este proceso y devuelve el pico
+        de RSS en KB."""
+    import lexer
+    sys.argv = ["lexer.py"] + argumentos
+    with open(os.devnull, "w") as salida:
+        sys.stdout = salida
+        lexer.main()
+        sys.stdout = sys.__stdout__
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--medir":
+        print(medir(sys.argv[2:]))
+        return
+
+    maximo = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    texto = bloque()
+    print("Pico de RSS de lexer.py (MB)")
+    print(f"  {'entrada':>8}  {'normal':>8}  {'--mmap':>8}")
+    megabytes = 1
+    while megabytes <= maximo:
+        with tempfile.NamedTemporaryFile("w", suffix=".imperat") as archivo:
+            archivo.write(texto * (megabytes * (1 << 20) // len(texto)))
+            archivo.flush()
+            picos = []
+            for extra in ([], ["--mmap"]):
+                salida = subprocess.run(
+                    [sys.executable, __file__, "--medir"] + extra + [archivo.name],
+                    capture_output=True, text=True, check=True)
+                picos.append(int(salida.stdout.split()[-1]) / 1024)
+        print(f"  {megabytes:>6} MB  {picos[0]:8.1f}  {picos[1]:8.1f}")
+        megabytes *= 4
+
+
+if __name__ == "__main__":
+    main()
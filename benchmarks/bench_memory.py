@@ -0,0 +1,144 @@
+# Description: Benchmark de memoria del AST. Compara el pico de memoria
+# residente (RSS) de un programa sintético de N instrucciones representado
+# con listas anidadas (la forma que construía parse.py) y con los nodos de
+# ast_nodes.py. Como los nodos guardan la fila y columna de cada elemento,
+# también se mide una variante de listas que guarda las mismas posiciones.
+# Cada forma se mide en un proceso nuevo.
+#
+# Uso: python benchmarks/bench_memory.py [instrucciones]
+
+import os
+import resource
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Las tres instrucciones que se repiten en el programa sintético
+INSTRUCCIONES = [
+    "x := x + 1 * y",
+    "if x < y --> x := y [] x >= y --> skip fi",
+    "print F.x",
+]
+
+
+def programa(n):
+    """Devuelve el texto de un programa de n instrucciones."""
+    cuerpo = ";\n".join(INSTRUCCIONES[i % 3] for i in range(n))
+    return "{\nint x, y;\nfunction[..2] F;\n" + cuerpo + "\n}"
+
+
+def arbol_listas(n):
+    """Construye el árbol con listas anidadas, como las reglas originales."""
+    def instruccion(i):
+        if i % 3 == 0:
+            return ["x", ":=", ["+", "x", ["*", 1, "y"]]]
+        if i % 3 == 1:
+            return ["if", ["<", "x", "y"], "-->", ["x", ":=", "y"],
+                    ["[]", [">=", "x", "y"], "-->", "skip"], "fi"]
+        return ["print", [".", "F", "x"]]
+
+    secuencia = instruccion(0)
+    for i in range(1, n):
+        secuencia = ["Secuencing", secuencia, instruccion(i)]
+    declaraciones = ["Declare", ["Secuencing", ["int", "x", [",", "y"]],
+                                 ["WriteFunction", "F", "function", "[", "..", 2, "]"]]]
+    return ["Block", declaraciones, secuencia]
+
+
+def arbol_listas_posiciones(n):
+    """Como arbol_listas, pero cada lista y cada hoja guardan fila y columna."""
+    def instruccion(i, fila):
+        if i % 3 == 0:
+            return [["x", fila, 1], ":=",
+                    ["+", ["x", fila, 6], ["*", [1, fila, 10], ["y", fila, 14], fila, 12],
+                     fila, 8], fila, 1]
+        if i % 3 == 1:
+            return ["if", ["<", ["x", fila, 4], ["y", fila, 8], fila, 6], "-->",
+                    [["x", fila, 14], ":=", ["y", fila, 19], fila, 14],
+                    ["[]", [">=", ["x", fila, 24], ["y", fila, 29], fila, 26], "-->",
+                     ["skip", fila, 35], fila, 21], "fi", fila, 1]
+        return ["print", [".", ["F", fila, 7], ["x", fila, 9], fila, 8], fila, 1]
+
+    secuencia = instruccion(0, 4)
+    for i in range(1, n):
+        secuencia = ["Secuencing", secuencia, instruccion(i, i + 4), 4, 1]
+    declaraciones = ["Declare", ["Secuencing", ["int", ["x", 2, 5], [",", ["y", 2, 8]], 2, 1],
+                                 ["WriteFunction", ["F", 3, 15], "function", "[", "..",
+                                  [2, 3, 12], "]", 3, 1], 2, 1], 2, 1]
+    return ["Block", declaraciones, secuencia, 1, 1]
+
+
+def arbol_nodos(n):
+    """Construye el mismo árbol con los nodos de ast_nodes."""
+    from ast_nodes import (Block, DeclareSection, Declare, Secuencing, Asig,
+                           If, Guard, Print, Skip, BinOp, App, Literal, Ident)
+
+    def instruccion(i, fila):
+        if i % 3 == 0:
+            return Asig(Ident("x", fila, 1),
+                        BinOp("Plus", Ident("x", fila, 6),
+                              BinOp("Mult", Literal(1, fila, 10), Ident("y", fila, 14),
+                                    fila, 12), fila, 8), fila, 1)
+        if i % 3 == 1:
+            return If([Guard(BinOp("Less", Ident("x", fila, 4), Ident("y", fila, 8), fila, 6),
+                             Asig(Ident("x", fila, 14), Ident("y", fila, 19), fila, 14),
+                             fila, 4),
+                       Guard(BinOp("Geq", Ident("x", fila, 24), Ident("y", fila, 29), fila, 26),
+                             Skip(fila, 35), fila, 24)], fila, 1)
+        return Print(App(Ident("F", fila, 7), Ident("x", fila, 9), fila, 8), fila, 1)
+
+    secuencia = Secuencing([instruccion(i, i + 4) for i in range(n)], 4, 1)
+    declaraciones = DeclareSection(
+        [Declare("int", [Ident("x", 2, 5), Ident("y", 2, 8)], None, 2, 1),
+         Declare("function", [Ident("F", 3, 15)], Literal(2, 3, 12), 3, 1)], 2, 1)
+    return Block(declaraciones, secuencia, 1, 1)
+
+
+def arbol_parse(n):
+    """Construye el árbol de nodos analizando el texto con parse.py."""
+    from parse import parse_source
+    return parse_source(programa(n))
+
+
+FORMAS = {
+    "listas": arbol_listas,
+    "listas + posiciones": arbol_listas_posiciones,
+    "nodos": arbol_nodos,
+    "nodos (parse.py)": arbol_parse,
+}
+
+
+def medir(forma, n):
+    """Construye el árbol en este proceso y devuelve el pico de RSS en KB
+        que agregó su construcción."""
+    if forma == "nodos (parse.py)":
+        import parse  # construir las tablas antes de la medición base
+    inicio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    arbol = FORMAS[forma](n)
+    fin = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return fin - inicio
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--medir":
+        print(medir(sys.argv[2], int(sys.argv[3])))
+        return
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"Pico de RSS del AST para {n} instrucciones")
+    resultados = {}
+    for forma in FORMAS:
+        salida = subprocess.run([sys.executable, __file__, "--medir", forma, str(n)],
+                                capture_output=True, text=True, check=True)
+        resultados[forma] = int(salida.stdout.split()[-1])
+        print(f"  {forma:<21} {resultados[forma] / 1024:9.1f} MB")
+    print()
+    for forma in ("listas", "listas + posiciones"):
+        razon = resultados["nodos"] / resultados[forma]
+        print(f"  nodos / {forma:<21} {razon:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Description: Benchmark de imprimir_ast. Mide el tiempo de imprimir árboles
+# de distintos tamaños (debe crecer linealmente) y verifica que un árbol
+# muy profundo se imprime sin agotar la pila de Python.
+#
+# Uso: python benchmarks/bench_print.py [nodos]
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ast_nodes import Block, Secuencing, Asig, BinOp, Ident, Literal
+from parse import imprimir_ast
+
+
+class Descarte():
+    """Salida que solo cuenta los caracteres y las escrituras recibidas."""
+    def __init__(self):
+        self.caracteres = 0
+        self.escrituras = 0
+
+    def write(self, texto):
+        self.caracteres += len(texto)
+        self.escrituras += 1
+
+
+def arbol_ancho(nodos):
+    """Bloque con una secuencia plana de asignaciones x := x + 1 (5 nodos c/u)."""
+    instrucciones = [Asig(Ident("x"), BinOp("Plus", Ident("x"), Literal(1)))
+                     for _ in range(max(2, (nodos - 2) // 5))]
+    return Block(None, Secuencing(instrucciones))
+
+
+def arbol_profundo(niveles):
+    """Bloques anidados niveles veces."""
+    arbol = Block(None, Asig(Ident("x"), Literal(0)))
+    for _ in range(niveles):
+        arbol = Block(None, arbol)
+    return arbol
+
+
+def medir(arbol):
+    salida = Descarte()
+    t = time.perf_counter()
+    imprimir_ast(arbol, salida)
+    return time.perf_counter() - t, salida
+
+
+def main():
+    nodos = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    print("Árbol ancho (secuencia plana)")
+    for n in (nodos // 4, nodos // 2, nodos):
+        tiempo, salida = medir(arbol_ancho(n))
+        print(f"  {n:>9} nodos  {tiempo:7.3f} s  {tiempo / n * 1e9:6.0f} ns/nodo"
+              f"  {salida.escrituras} escrituras")
+
+    # Con recursión, más de ~1000 niveles agotan la pila de Python
+    niveles = 10000
+    tiempo, salida = medir(arbol_profundo(niveles))
+    print(f"\nÁrbol profundo ({niveles} niveles)  {tiempo:7.3f} s"
+          f"  {salida.caracteres} caracteres")
+
+
+if __name__ == "__main__":
+    main()
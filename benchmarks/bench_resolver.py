@@ -0,0 +1,94 @@
+# Description: Benchmark de resolver.py. Mide el tiempo de resolver los
+# nombres de dos formas de programa que crecen con n:
+#   - declaraciones: un bloque con n variables y un uso de cada una.
+#   - anidados: n bloques anidados, cada uno declara una variable y usa la
+#     del bloque más externo.
+# y lo compara con buscar cada nombre en la cadena de ámbitos (una lista de
+# diccionarios, del bloque más interno al más externo), como lo hacía vm.py.
+# El tiempo por identificador del resolver no debe crecer con n.
+#
+# Uso: python benchmarks/bench_resolver.py [n máximo]
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from parse import parse_source
+from resolver import Resolver
+from ast_nodes import Block, Ident
+
+
+def declaraciones(n):
+    nombres = [f"v{i}" for i in range(n)]
+    usos = ";\n".join(f"    {nombre} := {nombre} + 1" for nombre in nombres)
+    return "{\n    int " + ", ".join(nombres) + ";\n" + usos + "\n}\n"
+
+
+def anidados(n):
+    lineas = ["{ int x;"]
+    for i in range(n):
+        lineas.append(f"{{ int y{i}; y{i} := x;")
+    lineas.append("print x")
+    lineas.append("}" * n + " }")
+    return "\n".join(lineas) + "\n"
+
+
+def cadena(tree):
+    """Resolución buscando cada nombre en la cadena de ámbitos."""
+    scopes = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if type(node) is Ident:
+            for scope in reversed(scopes):
+                if node.name in scope:
+                    break
+        elif type(node) is Block:
+            scope = {}
+            if node.declare is not None:
+                for declare in node.declare.declarations:
+                    for ident in declare.names:
+                        scope[ident.name] = len(scope)
+            scopes.append(scope)
+            stack.append(None)
+            if node.body is not None:
+                stack.append(node.body)
+        elif node is None:
+            scopes.pop()
+        else:
+            stack.extend(reversed(node.children()))
+
+
+def medir(funcion, tree):
+    mejor = None
+    for _ in range(3):
+        t = time.perf_counter()
+        funcion(tree)
+        tiempo = time.perf_counter() - t
+        mejor = tiempo if mejor is None else min(mejor, tiempo)
+    return mejor
+
+
+def main():
+    maximo = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    print(f"{'programa':<14} {'n':>6} {'idents':>7} {'resolver':>10} {'µs/ident':>9}"
+          f" {'cadena':>10} {'µs/ident':>9}")
+    for forma in (declaraciones, anidados):
+        n = 500
+        while n <= maximo:
+            tree = parse_source(forma(n), [])
+            resolucion = Resolver().resolve(tree)
+            usos = resolucion.uses
+            tiempo = medir(lambda arbol: Resolver().resolve(arbol), tree)
+            referencia = medir(cadena, tree)
+            print(f"{forma.__name__:<14} {n:6} {usos:7} {tiempo * 1000:8.2f}ms"
+                  f" {tiempo / usos * 1e6:9.3f} {referencia * 1000:8.2f}ms"
+                  f" {referencia / usos * 1e6:9.3f}")
+            n *= 2
+
+
+if __name__ == "__main__":
+    main()
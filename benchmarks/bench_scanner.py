@@ -0,0 +1,90 @@
+# Description: Compara el autómata de scanner.py con el lexer de PLY.
+#
+#   1. Prueba diferencial: ambos deben producir exactamente los mismos tokens
+#      (tipo, valor, fila, posición y columna) y los mismos errores sobre cada
+#      caso de TestCases, sobre los programas de generador.py y sobre entradas
+#      aleatorias: mutaciones de los casos de prueba y texto armado con los
+#      caracteres que más casos distintos producen (símbolos incompletos,
+#      strings sin cerrar o con escapes inválidos, \r, letras y dígitos fuera
+#      de ASCII). Termina con 1 ante la primera diferencia.
+#   2. Velocidad: tokens por segundo de cada uno sobre los mismos programas.
+#
+# Uso: python benchmarks/bench_scanner.py [casos aleatorios] [semilla]
+
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import tokenize, new_lexer
+from generador import generar, FORMAS
+from entradas import casos_de_prueba, mutar
+
+# piezas con las que se arman las entradas aleatorias
+PIEZAS = ["{", "}", "..", ".", ",", "(", ")", ":=", ":", ";", "-->", "--", "-",
+          "[]", "[", "]", "+", "*", "!", "<", "<=", "<>", ">", ">=", "==", "=",
+          "/", "//", " ", "\t", "\n", "\n\n", "\r\n", "\r", "x", "if", "fi", "int",
+          "function", "print", "_a1", "n", "0", "123", "٣", "x٣", "é", "\"", "\\",
+          "\\n", "\\\"", "\\x", "\"hola\"", "\"a\\nb\"", "#", "?", "\x00"]
+
+
+def tokens(source, scanner):
+    errors = []
+    lexer = new_lexer(scanner=scanner)
+    resultado = [(tok.type, tok.value, tok.lineno, tok.lexpos, tok.column)
+                 for tok in tokenize(source, errors, lexer)]
+    return resultado, errors, lexer.lineno
+
+
+def aleatorio(rng):
+    return "".join(rng.choice(PIEZAS) for _ in range(rng.randint(0, 200)))
+
+
+def diferencial(base, rng, n):
+    entradas = list(base)
+    entradas += [(f"generador {forma}", generar(forma, 40, semilla))
+                 for forma in FORMAS for semilla in range(3)]
+    entradas += [(f"mutación {i}", mutar(rng.choice(base)[1], rng, PIEZAS)) for i in range(n)]
+    entradas += [(f"aleatorio {i}", aleatorio(rng)) for i in range(n)]
+    for nombre, source in entradas:
+        esperado = tokens(source, "ply")
+        obtenido = tokens(source, "dfa")
+        if esperado != obtenido:
+            print(f"Diferencia en {nombre}: {source!r}")
+            for parte, a, b in zip(("tokens", "errores", "fila final"), esperado, obtenido):
+                if a != b:
+                    print(f"  {parte}:\n    ply {a}\n    dfa {b}")
+            sys.exit(1)
+    print(f"Prueba diferencial: {len(entradas)} entradas, mismos tokens y errores")
+
+
+def velocidad():
+    print(f"\n{'programa':<10} {'tokens':>8} {'ply tokens/s':>13} {'dfa tokens/s':>13} {'razón':>6}")
+    for forma in FORMAS:
+        source = generar(forma, 400)
+        medidas = {}
+        for scanner in ("ply", "dfa"):
+            lexer = new_lexer(scanner=scanner)
+            mejor = None
+            for _ in range(3):
+                t = time.perf_counter()
+                total = sum(1 for _ in tokenize(source, None, lexer))
+                tiempo = time.perf_counter() - t
+                mejor = tiempo if mejor is None else min(mejor, tiempo)
+            medidas[scanner] = total / mejor
+        print(f"{forma:<10} {total:8} {medidas['ply']:13.0f} {medidas['dfa']:13.0f}"
+              f" {medidas['dfa'] / medidas['ply']:5.2f}x")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    semilla = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    diferencial(casos_de_prueba(), random.Random(semilla), n)
+    velocidad()
+
+
+if __name__ == "__main__":
+    main()
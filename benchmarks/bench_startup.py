@@ -0,0 +1,76 @@
+# Description: Benchmark de arranque del lexer. Compara la construcción por
+# reflexión (lo que hacía cada ejecución de lexer.py) contra la carga desde
+# las tablas lextab guardadas y la copia del lexer base.
+#
+# Uso: python benchmarks/bench_startup.py [repeticiones]
+
+import os
+import subprocess
+import sys
+import time
+from statistics import median
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cada medición corre en un proceso nuevo para que el arranque sea en frío
+# (sin expresiones regulares compiladas en la caché de re)
+MEDICIONES = {
+    "reflexion (Lex.lex)": "Lex.lex(module=lexer)",
+    "tablas (build_lexer)": "lexer.build_lexer()",
+    "copia (new_lexer)": "lexer.new_lexer()",
+}
+
+PLANTILLA = """
+import re, sys, time
+sys.path.insert(0, {root!r})
+import ply.lex as Lex
+import lexer
+re.purge()
+t = time.perf_counter()
+{codigo}
+print(time.perf_counter() - t)
+"""
+
+
+def medir(codigo, repeticiones):
+    """Devuelve la mediana en segundos de ejecutar codigo en procesos nuevos."""
+    script = PLANTILLA.format(root=ROOT, codigo=codigo)
+    tiempos = []
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, "-c", script],
+                                capture_output=True, text=True, check=True)
+        tiempos.append(float(salida.stdout.split()[-1]))
+    return median(tiempos)
+
+
+def medir_proceso(argumentos, repeticiones):
+    """Devuelve la mediana del tiempo de pared de un proceso completo."""
+    tiempos = []
+    for _ in range(repeticiones):
+        t = time.perf_counter()
+        subprocess.run([sys.executable] + argumentos, cwd=ROOT,
+                       capture_output=True, check=True)
+        tiempos.append(time.perf_counter() - t)
+    return median(tiempos)
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    # La primera importación genera las tablas si no existen
+    subprocess.run([sys.executable, "-c", "import lexer"], cwd=ROOT, check=True)
+
+    print(f"Construcción del lexer (mediana de {repeticiones} procesos)")
+    for nombre, codigo in MEDICIONES.items():
+        print(f"  {nombre:<24} {medir(codigo, repeticiones) * 1000:8.3f} ms")
+
+    prueba = os.path.join("TestCases", "Tests", "prueba3.imperat")
+    total = medir_proceso(["lexer.py", prueba], repeticiones)
+    interprete = medir_proceso(["-c", "import ply.lex"], repeticiones)
+    print(f"\nProceso completo (mediana de {repeticiones})")
+    print(f"  {'python lexer.py prueba3':<24} {total * 1000:8.3f} ms")
+    print(f"  {'python + import ply':<24} {interprete * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# Description: Suite de benchmarks del lexer y el parser sobre los programas
+# sintéticos de generador.py. Para cada forma reporta tokens/s del lexer,
+# nodos/s del parser, el pico de memoria de cada etapa y el tiempo de
+# arranque (importar lexer.py y parse.py, con y sin tablas guardadas).
+#
+# Con --json los resultados se guardan en un archivo, y con --comparar se
+# comparan contra los de otra corrida (por ejemplo, de otro commit).
+#
+# Uso: python benchmarks/bench_suite.py [--escala F] [--json salida.json]
+#                                       [--comparar anterior.json]
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import tokenize, TokenBuffer
+from parse import run_parser, parse_buffer
+from optimizer import contar_nodos
+from generador import generar
+
+# tamaño de cada forma con escala 1 (de decenas a cientos de KB de texto)
+TAMANOS = {
+    "bloques": 3000,
+    "guardias": 2000,
+    "ciclos": 800,
+    "funciones": 60,
+    "strings": 200,
+    "mixto": 2000,
+}
+
+REPETICIONES = 3
+
+
+def mejor_tiempo(funcion, *args):
+    """Menor tiempo de REPETICIONES ejecuciones, y el último resultado."""
+    mejor = None
+    for _ in range(REPETICIONES):
+        t = time.perf_counter()
+        resultado = funcion(*args)
+        tiempo = time.perf_counter() - t
+        mejor = tiempo if mejor is None else min(mejor, tiempo)
+    return mejor, resultado
+
+
+def pico(funcion, *args):
+    """Pico de memoria (bytes) reservada por funcion, según tracemalloc."""
+    tracemalloc.start()
+    resultado = funcion(*args)
+    maximo = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del resultado
+    return maximo
+
+
+def contar_tokens(source):
+    total = 0
+    for _ in tokenize(source):
+        total += 1
+    return total
+
+
+def parsear(source):
+    return run_parser(tokenize(source), [])
+
+
+def medir_programa(forma, n):
+    source = generar(forma, n)
+    tiempo_lexer, tokens = mejor_tiempo(contar_tokens, source)
+    buffer = TokenBuffer.from_source(source)
+    tiempo_parser, arbol = mejor_tiempo(parse_buffer, buffer, [])
+    tiempo_total, _ = mejor_tiempo(parsear, source)
+    nodos = contar_nodos(arbol)
+    return {
+        "forma": forma,
+        "n": n,
+        "bytes": len(source),
+        "tokens": tokens,
+        "nodos": nodos,
+        "lexer": {
+            "segundos": tiempo_lexer,
+            "tokens_por_segundo": tokens / tiempo_lexer,
+            "pico_bytes": pico(TokenBuffer.from_source, source),
+        },
+        "parser": {
+            "segundos": tiempo_parser,
+            "nodos_por_segundo": nodos / tiempo_parser,
+            "pico_bytes": pico(parse_buffer, buffer, []),
+        },
+        "lexer_y_parser": {
+            "segundos": tiempo_total,
+            "pico_bytes": pico(parsear, source),
+        },
+    }
+
+
+def tiempo_import(modulo, sin_tablas=False):
+    """Tiempo de un proceso que solo importa modulo. Con sin_tablas, cada
+        proceso usa un directorio de caché vacío y construye las tablas."""
+    mejor = None
+    for _ in range(REPETICIONES):
+        with tempfile.TemporaryDirectory() as vacio:
+            entorno = dict(os.environ)
+            if sin_tablas:
+                entorno["IMPERAT_CACHE_DIR"] = vacio
+            t = time.perf_counter()
+            subprocess.run([sys.executable, "-c", f"import {modulo}"], cwd=ROOT,
+                           env=entorno, check=True)
+            tiempo = time.perf_counter() - t
+        mejor = tiempo if mejor is None else min(mejor, tiempo)
+    return mejor
+
+
+def medir_arranque():
+    resultado = {"python": tiempo_import("sys")}
+    for modulo in ("lexer", "parse"):
+        resultado[modulo] = tiempo_import(modulo)
+        resultado[modulo + "_sin_tablas"] = tiempo_import(modulo, sin_tablas=True)
+    return resultado
+
+
+def commit():
+    try:
+        salida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        return salida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def imprimir(resultados):
+    arranque = resultados["arranque"]
+    print("Arranque (s): " + ", ".join(f"{k} {v:.3f}" for k, v in arranque.items()))
+    print(f"\n{'forma':<10} {'KB':>6} {'tokens':>8} {'nodos':>8} {'tokens/s':>10}"
+          f" {'nodos/s':>10} {'pico lexer':>11} {'pico parser':>12}")
+    for programa in resultados["programas"]:
+        print(f"{programa['forma']:<10} {programa['bytes'] / 1024:6.0f}"
+              f" {programa['tokens']:8} {programa['nodos']:8}"
+              f" {programa['lexer']['tokens_por_segundo']:10.0f}"
+              f" {programa['parser']['nodos_por_segundo']:10.0f}"
+              f" {programa['lexer']['pico_bytes'] / (1 << 20):9.1f}MB"
+              f" {programa['parser']['pico_bytes'] / (1 << 20):10.1f}MB")
+
+
+def comparar(resultados, anterior):
+    """Imprime la razón actual / anterior de las velocidades y los picos."""
+    previos = {programa["forma"]: programa for programa in anterior["programas"]}
+    print(f"\nComparación contra {anterior.get('commit')} (actual / anterior)")
+    for programa in resultados["programas"]:
+        previo = previos.get(programa["forma"])
+        if previo is None:
+            continue
+        razones = (
+            programa["lexer"]["tokens_por_segundo"] / previo["lexer"]["tokens_por_segundo"],
+            programa["parser"]["nodos_por_segundo"] / previo["parser"]["nodos_por_segundo"],
+            programa["lexer"]["pico_bytes"] / previo["lexer"]["pico_bytes"],
+            programa["parser"]["pico_bytes"] / previo["parser"]["pico_bytes"],
+        )
+        print(f"{programa['forma']:<10} tokens/s x{razones[0]:.2f}  nodos/s x{razones[1]:.2f}"
+              f"  pico lexer x{razones[2]:.2f}  pico parser x{razones[3]:.2f}")
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--escala", type=float, default=1.0)
+    argparser.add_argument("--json")
+    argparser.add_argument("--comparar")
+    args = argparser.parse_args()
+
+    resultados = {
+        "commit": commit(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "escala": args.escala,
+        "arranque": medir_arranque(),
+        "programas": [medir_programa(forma, max(1, int(n * args.escala)))
+                      for forma, n in TAMANOS.items()],
+    }
+    imprimir(resultados)
+
+    if args.comparar:
+        with open(args.comparar) as file:
+            comparar(resultados, json.load(file))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(resultados, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
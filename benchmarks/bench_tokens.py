@@ -0,0 +1,74 @@
+# Description: Benchmark de memoria por token. Compara lo que queda en memoria
+# tras analizar léxicamente una entrada grande de tres formas:
+#   - líneas: la lista de tokens ya formateados (lo que guardaba lex_text).
+#   - LexToken: la lista de objetos LexToken de PLY.
+#   - TokenBuffer: las columnas de lexer.TokenBuffer.
+#
+# Uso: python benchmarks/bench_tokens.py [megabytes]
+
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import tokenize, format_token, TokenBuffer
+
+
+def entrada(megabytes):
+    """Concatena los casos de prueba sin errores léxicos hasta megabytes."""
+    programas = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "TestCases", "**", "*.imperat"),
+                                 recursive=True)):
+        with open(path) as file:
+            source = file.read()
+        errors = []
+        for _ in tokenize(source, errors):
+            pass
+        if not errors:
+            programas.append(source)
+    bloque = "\n".join(programas) + "\n"
+    return bloque * max(1, int(megabytes * (1 << 20) / len(bloque)))
+
+
+def lineas(source):
+    return [format_token(tok) for tok in tokenize(source)]
+
+
+def lextokens(source):
+    return list(tokenize(source))
+
+
+def columnas(source):
+    return TokenBuffer.from_source(source)
+
+
+def medir(funcion, source):
+    tracemalloc.start()
+    t = time.perf_counter()
+    resultado = funcion(source)
+    tiempo = time.perf_counter() - t
+    retenido = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return resultado, tiempo, retenido
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    source = entrada(megabytes)
+    cantidad = len(TokenBuffer.from_source(source))
+    print(f"Entrada: {len(source) / (1 << 20):.1f} MB, {cantidad} tokens\n")
+
+    for nombre, funcion in (("líneas", lineas), ("LexToken", lextokens),
+                            ("TokenBuffer", columnas)):
+        resultado, tiempo, retenido = medir(funcion, source)
+        print(f"  {nombre:<12} {retenido / (1 << 20):8.1f} MB"
+              f"  {retenido / cantidad:6.1f} bytes/token  {tiempo:6.2f} s")
+        del resultado
+
+
+if __name__ == "__main__":
+    main()
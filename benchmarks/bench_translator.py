@@ -0,0 +1,80 @@
+# Description: Benchmark de translator.py. Compara, en los programas de
+# bench_vm.py, el tiempo de ejecutar el bytecode de vm.py contra el código de
+# Python traducido. Después mide el tiempo total de python translator.py sobre
+# un programa generado grande, en frío (lexer, parser y traducción) y con el
+# objeto de código en la caché, contra python vm.py.
+#
+# Uso: python benchmarks/bench_translator.py [iteraciones] [tamaño]
+
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from statistics import median
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from parse import parse_source
+from vm import compilar, ejecutar
+from translator import traducir, ejecutar as ejecutar_python
+from bench_vm import PROGRAMAS
+from generador import generar
+
+REPETICIONES = 5
+
+
+def proceso(programa, path, entorno, opciones=()):
+    """Segundos que tarda python programa path en un proceso nuevo."""
+    t = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(ROOT, programa), *opciones, path],
+                   stdout=subprocess.DEVNULL, env=entorno, check=True)
+    return time.perf_counter() - t
+
+
+def main():
+    iteraciones = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    tamano = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    print(f"{'programa':<20} {'vm.py':>9} {'traducido':>10} {'aceleración':>12}")
+    for nombre, (fuente, factor) in PROGRAMAS.items():
+        texto = fuente % {"n": int(iteraciones * factor)}
+        salida = io.StringIO()
+        t = time.perf_counter()
+        ejecutar(compilar(parse_source(texto)), salida)
+        bytecode = time.perf_counter() - t
+
+        traducida = io.StringIO()
+        t = time.perf_counter()
+        ejecutar_python(traducir(parse_source(texto))[0], traducida)
+        python = time.perf_counter() - t
+        assert salida.getvalue() == traducida.getvalue(), nombre
+        print(f"{nombre:<20} {bytecode:8.3f}s {python:9.3f}s {bytecode / python:11.2f}x")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        path = os.path.join(directorio, "programa.imperat")
+        with open(path, "w") as file:
+            file.write(generar("mixto", tamano, 0))
+        entorno = dict(os.environ, IMPERAT_CACHE_DIR=directorio)
+        # las tablas de PLY ya construidas, como en cualquier ejecución normal
+        proceso("translator.py", path, entorno, ["--no-cache"])
+
+        kb = os.path.getsize(path) / 1024
+        print(f"\nprograma mixto de {kb:.0f} KB, mediana de {REPETICIONES} procesos")
+        vm = median(proceso("vm.py", path, entorno) for _ in range(REPETICIONES))
+        frio = median(proceso("translator.py", path, entorno, ["--no-cache"])
+                      for _ in range(REPETICIONES))
+        proceso("translator.py", path, entorno)
+        caliente = median(proceso("translator.py", path, entorno)
+                          for _ in range(REPETICIONES))
+        print(f"  vm.py                    {vm * 1000:8.1f} ms")
+        print(f"  translator.py sin caché  {frio * 1000:8.1f} ms")
+        print(f"  translator.py con caché  {caliente * 1000:8.1f} ms"
+              f"  ({frio / caliente:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
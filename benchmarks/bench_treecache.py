@@ -0,0 +1,76 @@
+# Description: Benchmark de treecache.py. Para programas de generador.py de
+# cada forma compara el tiempo de analizar el texto (lexer y parser de PLY)
+# con el de leer la entrada de la caché y reconstruir el árbol, y muestra el
+# tamaño de la entrada junto al del programa. Al final mide python parse.py
+# completo sin la entrada y con ella.
+#
+# Uso: python benchmarks/bench_treecache.py [tamaño]
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import tokenize, TokenBuffer
+from parse import run_parser, recorded
+from treecache import TreeCache
+from generador import generar, FORMAS
+
+
+def mejor(funcion, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        t = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - t)
+    return min(tiempos), resultado
+
+
+def analizar(texto):
+    errores = []
+    buffer = TokenBuffer()
+    arbol = run_parser(recorded(tokenize(texto, errores), buffer), errores)
+    return arbol, errores, buffer
+
+
+def proceso(path, entorno):
+    t = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(ROOT, "parse.py"), path],
+                   stdout=subprocess.DEVNULL, env=entorno, check=True)
+    return time.perf_counter() - t
+
+
+def main():
+    tamano = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    with tempfile.TemporaryDirectory() as directorio:
+        cache = TreeCache(directorio)
+        print(f"{'forma':<10} {'programa':>9} {'entrada':>9} {'analizar':>10}"
+              f" {'caché':>9} {'aceleración':>12}")
+        for forma in FORMAS:
+            texto = generar(forma, tamano, 0)
+            analisis, (arbol, errores, buffer) = mejor(lambda: analizar(texto))
+            cache.put(texto, arbol, errores, buffer)
+            lectura, _ = mejor(lambda: cache.get(texto))
+            entrada = os.path.getsize(cache.path(texto))
+            print(f"{forma:<10} {len(texto) / 1024:7.0f}KB {entrada / 1024:7.0f}KB"
+                  f" {analisis * 1000:8.1f}ms {lectura * 1000:7.1f}ms"
+                  f" {analisis / lectura:11.1f}x")
+
+        path = os.path.join(directorio, "programa.imperat")
+        with open(path, "w") as file:
+            file.write(generar("mixto", tamano, 1))
+        entorno = dict(os.environ, IMPERAT_CACHE_DIR=directorio)
+        fallo = proceso(path, entorno)
+        acierto = min(proceso(path, entorno) for _ in range(3))
+        print(f"\npython parse.py (mixto): sin entrada {fallo * 1000:.0f}ms,"
+              f" con entrada {acierto * 1000:.0f}ms")
+        aciertos = TreeCache(os.path.join(directorio, "trees")).stats()
+        print(f"contadores: {aciertos}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# Description: Benchmark de rendimiento de la máquina virtual (vm.py).
+# Ejecuta programas con ciclos basados en los casos de prueba y reporta
+# instrucciones de bytecode por segundo.
+#
+# Uso: python benchmarks/bench_vm.py [iteraciones]
+
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from parse import parse_source
+from vm import compilar, ejecutar
+
+
+# Suma simple
+SUMA = """{
+    int i, s;
+    i := 0;
+    while i < %(n)d -->
+        s := s + i * 2;
+        i := i + 1
+    end;
+    print s
+}"""
+
+# El ciclo de prueba5.imperat (máximo de F) repetido n veces
+MAXIMO = """{
+    int max_, _, k;
+    function[..5] F;
+    F := F(0:4)(1:8)(2:15)(3:16)(4:23)(5:42);
+    k := 0;
+    while k < %(n)d -->
+        max_ := F.0;
+        _ := 1;
+        while _ <= 5 -->
+           if max_ < F._ -->
+              max_ := F._
+           [] max_ >= F._ -->
+              skip
+           fi;
+           _ := _ + 1;
+        end;
+        k := k + 1
+    end;
+    print max_
+}"""
+
+# El if con guardias de prueba3.imperat, rotando los valores de F
+GUARDIAS = """{
+    int min, max, k, t;
+    function[..2] F;
+    F := F(0:3)(1:1)(2:2);
+    k := 0;
+    while k < %(n)d -->
+        if F.0 < F.1 and F.1 < F.2 -->
+           min := F.0;
+           max := F.2
+        [] F.0 < F.2 and F.2 < F.1 -->
+           min := F.0;
+           max := F.1
+        [] F.1 < F.0 and F.0 < F.2 -->
+           min := F.1;
+           max := F.2
+        [] F.1 < F.2 and F.2 < F.0 -->
+           min := F.1;
+           max := F.0
+        [] F.2 < F.0 and F.0 < F.1 -->
+           min := F.2;
+           max := F.1
+        [] F.2 < F.1 and F.1 < F.0 -->
+           min := F.2;
+           max := F.0
+        fi;
+        t := F.0;
+        F := F(0:F.1)(1:F.2)(2:t);
+        k := k + 1
+    end;
+    print min + max
+}"""
+
+PROGRAMAS = {
+    "suma": (SUMA, 1),
+    "maximo (prueba5)": (MAXIMO, 1 / 10),
+    "guardias (prueba3)": (GUARDIAS, 1 / 10),
+}
+
+
+def main():
+    iteraciones = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    print(f"{'programa':<20} {'instrucciones':>14} {'compilar':>10} {'ejecutar':>10} {'instr/s':>12}")
+    for nombre, (fuente, factor) in PROGRAMAS.items():
+        arbol = parse_source(fuente % {"n": int(iteraciones * factor)})
+        t = time.perf_counter()
+        programa = compilar(arbol)
+        compilacion = time.perf_counter() - t
+
+        t = time.perf_counter()
+        pasos = ejecutar(programa, io.StringIO())
+        ejecucion = time.perf_counter() - t
+        print(f"{nombre:<20} {pasos:>14} {compilacion * 1000:8.2f}ms {ejecucion:9.3f}s"
+              f" {pasos / ejecucion:12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# Description: Entradas de las pruebas diferenciales de bench_scanner.py y
+# bench_descent.py: los casos de TestCases y mutaciones aleatorias de ellos.
+# Cada prueba pasa sus propias piezas: caracteres sueltos para el lexer,
+# fragmentos de instrucciones para el parser.
+
+import glob
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def casos_de_prueba():
+    """(nombre, texto) de cada caso .imperat de TestCases, en orden."""
+    casos = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "TestCases", "**", "*.imperat"),
+                                 recursive=True)):
+        with open(path) as file:
+            casos.append((os.path.relpath(path, ROOT), file.read()))
+    return casos
+
+
+def mutar(source, rng, piezas, cambios=8):
+    """Inserta, borra o reemplaza entre 1 y cambios fragmentos de source;
+        lo insertado es una de las piezas."""
+    texto = list(source)
+    for _ in range(rng.randint(1, cambios)):
+        i = rng.randrange(len(texto) + 1)
+        operacion = rng.randrange(3)
+        if operacion == 0:
+            texto[i:i] = rng.choice(piezas)
+        elif operacion == 1:
+            del texto[i:i + rng.randint(1, 4)]
+        else:
+            texto[i:i + 1] = rng.choice(piezas)
+    return "".join(texto)
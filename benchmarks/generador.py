@@ -0,0 +1,148 @@
+# Description: Generador de programas .imperat sintéticos y válidos (pasan el
+# lexer, el parser y el compilador de vm.py), de tamaño y forma configurables:
+#
+#   bloques    Block anidados n niveles.
+#   guardias   un if con n guardias, como prueba3.
+#   ciclos     n ciclos while con un if adentro, como prueba5.
+#   funciones  declaraciones function[..n] de muchas variables y cadenas de
+#              modificaciones F(i:v)(j:w)...
+#   strings    print de n strings largos, con secuencias de escape.
+#   mixto      un poco de cada forma.
+#
+# Uso: python benchmarks/generador.py forma n [semilla] > programa.imperat
+
+import random
+import sys
+
+SANGRIA = "    "
+
+
+def sangria(nivel):
+    # acotada, para que el tamaño del texto no crezca con el cuadrado de n
+    return SANGRIA * min(nivel, 8)
+
+
+def bloques(n, rng):
+    """Block anidados n niveles; cada nivel suma a x y el más interno la
+        imprime."""
+    lineas = ["{", SANGRIA + "int x;", SANGRIA + "x := 0;"]
+    for nivel in range(1, n + 1):
+        lineas.append(sangria(nivel) + "{")
+        lineas.append(sangria(nivel + 1) + f"x := x + {rng.randint(1, 9)};")
+    lineas.append(sangria(n + 1) + "print x")
+    for nivel in range(n, 0, -1):
+        lineas.append(sangria(nivel) + "}")
+    lineas.append("}")
+    return "\n".join(lineas) + "\n"
+
+
+def comparacion(rng, tamano):
+    a, b, c = (rng.randrange(tamano + 1) for _ in range(3))
+    op1, op2 = rng.choice("<>"), rng.choice(["<", ">", "<=", ">=", "==", "<>"])
+    return f"F.{a} {op1} F.{b} and F.{b} {op2} F.{c}"
+
+
+def guardias(n, rng):
+    """Un if con n guardias que comparan elementos de F, como prueba3."""
+    lineas = ["{", SANGRIA + "int min, max;", SANGRIA + "function[..2] F;"]
+    for i in range(n):
+        prefijo = "if " if i == 0 else "[] "
+        lineas.append(SANGRIA + prefijo + comparacion(rng, 2) + " -->")
+        lineas.append(SANGRIA * 2 + f"min := F.{rng.randrange(3)};")
+        lineas.append(SANGRIA * 2 + f"max := F.{rng.randrange(3)}")
+    lineas.append(SANGRIA + "[] true --> skip")
+    lineas.append(SANGRIA + "fi")
+    lineas.append("}")
+    return "\n".join(lineas) + "\n"
+
+
+def ciclos(n, rng):
+    """n ciclos que buscan el máximo de F, como prueba5."""
+    lineas = ["{", SANGRIA + "int max_, _;", SANGRIA + "function[..5] F;"]
+    cuerpo = []
+    for _ in range(n):
+        cuerpo.append("\n".join([
+            SANGRIA + "max_ := F.0;",
+            SANGRIA + "_ := 1;",
+            SANGRIA + f"while _ <= {rng.randint(1, 5)} -->",
+            SANGRIA * 2 + "if max_ < F._ -->",
+            SANGRIA * 3 + "max_ := F._",
+            SANGRIA * 2 + "[] max_ >= F._ -->",
+            SANGRIA * 3 + "skip",
+            SANGRIA * 2 + "fi;",
+            SANGRIA * 2 + "_ := _ + 1",
+            SANGRIA + "end",
+        ]))
+    return "\n".join(lineas) + "\n" + ";\n".join(cuerpo) + "\n}\n"
+
+
+def funciones(n, rng, variables=50):
+    """Declaración function[..n] de muchas variables y una cadena de n
+        modificaciones sobre cada una."""
+    nombres = [f"F{i}" for i in range(variables)]
+    lineas = ["{", SANGRIA + f"function[..{n}] " + ", ".join(nombres) + ";"]
+    asignaciones = []
+    for nombre in nombres:
+        cadena = "".join(f"({rng.randint(0, n)}:{rng.randint(0, 999)})"
+                         for _ in range(n))
+        asignaciones.append(SANGRIA + f"{nombre} := {nombre}{cadena}")
+    lineas.append(";\n".join(asignaciones))
+    lineas.append("}")
+    return "\n".join(lineas) + "\n"
+
+
+def texto(largo, rng):
+    """Contenido de un string de largo caracteres, con escapes."""
+    partes = []
+    total = 0
+    while total < largo:
+        palabra = rng.choice(["hola", "mundo", "imperat", "\\n", "\\\"", "\\\\", "x"])
+        partes.append(palabra)
+        total += len(palabra) + 1
+    return " ".join(partes)
+
+
+def strings(n, rng, largo=1000):
+    """n instrucciones print con strings de unos largo caracteres."""
+    lineas = ["{", SANGRIA + "int x;", SANGRIA + "x := 1;"]
+    prints = [SANGRIA + f"print \"{texto(largo, rng)}\" + x" for _ in range(n)]
+    lineas.append(";\n".join(prints))
+    lineas.append("}")
+    return "\n".join(lineas) + "\n"
+
+
+def mixto(n, rng):
+    """Un bloque con una parte de cada forma."""
+    partes = [bloques(max(1, n // 10), rng), guardias(max(1, n // 4), rng),
+              ciclos(max(1, n // 8), rng), funciones(max(1, n // 20), rng, 10),
+              strings(max(1, n // 20), rng, 200)]
+    return "{\n" + ";\n".join(parte.rstrip("\n") for parte in partes) + "\n}\n"
+
+
+FORMAS = {
+    "bloques": bloques,
+    "guardias": guardias,
+    "ciclos": ciclos,
+    "funciones": funciones,
+    "strings": strings,
+    "mixto": mixto,
+}
+
+
+def generar(forma, n, semilla=0):
+    """Devuelve el texto de un programa de la forma y tamaño dados. La misma
+        semilla produce siempre el mismo programa."""
+    return FORMAS[forma](n, random.Random(semilla))
+
+
+def main():
+    if len(sys.argv) not in (3, 4) or sys.argv[1] not in FORMAS:
+        print("Uso: python benchmarks/generador.py forma n [semilla]")
+        print("Formas: " + ", ".join(FORMAS))
+        sys.exit(1)
+    semilla = int(sys.argv[3]) if len(sys.argv) == 4 else 0
+    sys.stdout.write(generar(sys.argv[1], int(sys.argv[2]), semilla))
+
+
+if __name__ == "__main__":
+    main()
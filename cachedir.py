@@ -0,0 +1,16 @@
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Description: Directorio donde se guardan los archivos generados: las tablas
+#   del lexer y del parser (lextab, parsetab), la caché de árboles de
+#   treecache.py y los objetos de código de translator.py. Se puede cambiar
+#   con la variable de entorno IMPERAT_CACHE_DIR.
+#
+#   Está aparte de lexer.py porque importar lexer.py importa PLY y construye
+#   el lexer; los caminos que leen la caché sin analizar nada (treecache.py,
+#   translator.py) importan solo este módulo.
+
+import os
+
+
+CACHE_DIR = os.environ.get(
+    "IMPERAT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__"))
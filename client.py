@@ -0,0 +1,112 @@
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Description: Cliente liviano de daemon.py. Envía la línea de comando al
+#   daemon, que ya tiene el lexer y el parser construidos, e imprime la
+#   respuesta con el mismo código de salida que el programa original:
+#
+#       python client.py archivo.imperat          igual a python lexer.py archivo.imperat
+#       python client.py parse archivo.imperat    igual a python parse.py archivo.imperat
+#       python client.py run archivo.imperat      igual a python vm.py archivo.imperat
+#       python client.py check archivo.imperat    errores léxicos, sintácticos y de
+#                                                 compilación, sin ejecutar
+#
+#   Si el daemon no está corriendo, el comando se ejecuta en este proceso.
+#   Este módulo no importa el lexer ni PLY, para arrancar rápido.
+#
+#   Protocolo: cada mensaje es un entero de 4 bytes (big endian) con el largo,
+#   seguido de un objeto JSON en UTF-8. Petición: {"id", "command", "argv",
+#   "cwd"}; respuesta: {"id", "stdout", "stderr", "status"}.
+
+import json
+import os
+import socket
+import struct
+import sys
+
+# socket del daemon, se puede cambiar con la variable de entorno IMPERAT_SOCKET
+SOCKET_PATH = os.environ.get("IMPERAT_SOCKET",
+                             f"/tmp/imperat-{os.getuid()}.sock")
+
+COMMANDS = ("lex", "parse", "run", "check")
+
+HEADER = struct.Struct(">I")
+MAX_FRAME = 1 << 28  # 256 MB
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def encode_frame(message):
+    data = json.dumps(message).encode()
+    return HEADER.pack(len(data)) + data
+
+
+def decode_frame(data):
+    return json.loads(data.decode())
+
+
+def frame_size(header):
+    size = HEADER.unpack(header)[0]
+    if size > MAX_FRAME:
+        raise ProtocolError(f"Mensaje demasiado grande: {size} bytes")
+    return size
+
+
+def recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ProtocolError("Conexión cerrada por el daemon")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def request(command, argv, path=SOCKET_PATH):
+    """Envía una petición al daemon y devuelve su respuesta. Lanza OSError si
+        el daemon no está corriendo."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(encode_frame({"id": 0, "command": command, "argv": argv,
+                                   "cwd": os.getcwd()}))
+        size = frame_size(recv_exact(sock, HEADER.size))
+        return decode_frame(recv_exact(sock, size))
+
+
+def run_local(command, argv):
+    """Ejecuta el comando en este proceso, como si no hubiera daemon."""
+    sys.argv = [command + ".py"] + argv
+    if command == "lex":
+        from lexer import main
+    elif command == "parse":
+        from parse import main
+    elif command == "run":
+        from vm import main
+    else:
+        from daemon import check_main as main
+    main()
+
+
+def main():
+    argv = sys.argv[1:]
+    command = "lex"
+    if argv and argv[0] in COMMANDS:
+        command = argv.pop(0)
+
+    try:
+        response = request(command, argv)
+    except (FileNotFoundError, ConnectionRefusedError):
+        run_local(command, argv)
+        return
+    except (OSError, ProtocolError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    sys.exit(response["status"])
+
+
+if __name__ == "__main__":
+    main()
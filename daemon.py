@@ -0,0 +1,222 @@
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Description: Daemon que mantiene construidos el lexer y el parser y atiende
+#   peticiones lex/parse/run/check de muchos clientes a la vez, por un socket
+#   Unix o por la entrada estándar. El protocolo está descrito en client.py.
+#
+#   El lexer, el parser y sus tablas se construyen una vez en este proceso, y
+#   los procesos del pool de trabajo se crean con fork, así que los heredan
+#   ya construidos. El lazo de asyncio solo lee y escribe mensajes; cada
+#   petición se ejecuta en el pool.
+#
+#   Uso: python daemon.py [--socket RUTA | --stdio] [-j N]
+
+import argparse
+import asyncio
+import io
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout, redirect_stderr
+
+import lexer
+import parse
+import vm
+from optimizer import optimizar
+from resolver import resolver
+from typechecker import verificar_tipos
+from client import (SOCKET_PATH, COMMANDS, HEADER, ProtocolError,
+                    encode_frame, decode_frame, frame_size)
+
+
+def check_main():
+    """Reporta los errores léxicos, sintácticos y de compilación de los
+        archivos dados, sin ejecutarlos. Termina con 1 si hubo alguno.
+    """
+    if len(sys.argv) < 2:
+        print("Error: Por favor proporcione un archivo .imperat como argumento")
+        print("Uso: python client.py check archivo.imperat")
+        sys.exit(1)
+
+    status = 0
+    for path in sys.argv[1:]:
+        if not path.endswith('.imperat'):
+            print("Error: El archivo debe tener extensión .imperat")
+            sys.exit(1)
+        try:
+            with open(path, 'r') as file:
+                input_data = file.read()
+        except FileNotFoundError:
+            print(f"Error: No se encontró el archivo {path}")
+            status = 1
+            continue
+        except Exception as e:
+            print(f"Error al leer el archivo: {str(e)}")
+            status = 1
+            continue
+
+        errors = []
+        tree = parse.parse_source(input_data, errors)
+        if tree is not None and not errors:
+            # todos los nombres no declarados o repetidos y todos los errores
+            # de tipos, no solo el primero
+            resolver(tree, errors)
+            verificar_tipos(tree, errors)
+        if tree is not None and not errors:
+            try:
+                vm.compilar(optimizar(tree)[0])
+            except vm.CompileError as e:
+                errors.append(str(e))
+        for error in errors:
+            print(error)
+        if errors or tree is None:
+            status = 1
+    sys.exit(status)
+
+
+# programa de cada comando: (nombre para sys.argv[0], función main)
+MAINS = {
+    "lex": ("lexer.py", lexer.main),
+    "parse": ("parse.py", parse.main),
+    "run": ("vm.py", vm.main),
+    "check": ("check", check_main),
+}
+
+
+def run_command(command, argv, cwd):
+    """Ejecuta el main de command con argv desde el directorio cwd, en un
+        proceso del pool, y devuelve su salida y código de salida.
+    """
+    name, main = MAINS[command]
+    stdout, stderr = io.StringIO(), io.StringIO()
+    status = 0
+    sys.argv = [name] + argv
+    try:
+        os.chdir(cwd)
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            main()
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            status = e.code or 0
+        else:
+            stderr.write(f"{e.code}\n")
+            status = 1
+    except Exception as e:
+        stderr.write(f"Error: {type(e).__name__}: {e}\n")
+        status = 1
+    return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(),
+            "status": status}
+
+
+def warm(_):
+    return os.getpid()
+
+
+class Daemon():
+    """Atiende conexiones y reparte las peticiones en el pool."""
+
+    def __init__(self, jobs):
+        self.pool = ProcessPoolExecutor(max_workers=jobs)
+        # los procesos se crean ahora, antes de iniciar el lazo de asyncio
+        list(self.pool.map(warm, range(jobs)))
+        self.requests = 0
+
+    async def read_frame(self, reader):
+        """Lee un mensaje; devuelve None si la conexión se cerró."""
+        try:
+            header = await reader.readexactly(HEADER.size)
+        except asyncio.IncompleteReadError as e:
+            if e.partial:
+                raise ProtocolError("Mensaje incompleto")
+            return None
+        return decode_frame(await reader.readexactly(frame_size(header)))
+
+    async def answer(self, message):
+        """Ejecuta una petición y devuelve la respuesta."""
+        command = message.get("command")
+        if command == "ping":
+            response = {"stdout": "", "stderr": "", "status": 0}
+        elif command not in COMMANDS:
+            response = {"stdout": "", "stderr": f"Error: Comando desconocido {command}\n",
+                        "status": 1}
+        else:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                self.pool, run_command, command, list(message.get("argv", [])),
+                message.get("cwd", os.getcwd()))
+        self.requests += 1
+        response["id"] = message.get("id")
+        return response
+
+    async def serve(self, reader, writer):
+        """Atiende una conexión. Las peticiones de una misma conexión se
+            ejecutan en paralelo y cada respuesta lleva el id de su petición.
+        """
+        lock = asyncio.Lock()
+        pending = set()
+
+        async def reply(message):
+            response = await self.answer(message)
+            async with lock:
+                writer.write(encode_frame(response))
+                await writer.drain()
+
+        try:
+            while True:
+                message = await self.read_frame(reader)
+                if message is None:
+                    break
+                task = asyncio.create_task(reply(message))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        except (ProtocolError, ValueError, ConnectionError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+        finally:
+            writer.close()
+
+    async def serve_socket(self, path):
+        if os.path.exists(path):
+            os.unlink(path)  # socket de un daemon anterior
+        server = await asyncio.start_unix_server(self.serve, path=path)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        print(f"Daemon escuchando en {path}", file=sys.stderr)
+        async with server:
+            await stop.wait()
+        os.unlink(path)
+
+    async def serve_stdio(self):
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader),
+                                     sys.stdin.buffer)
+        transport, protocol = await loop.connect_write_pipe(
+            asyncio.streams.FlowControlMixin, sys.stdout.buffer)
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        await self.serve(reader, writer)
+
+
+def main():
+    argparser = argparse.ArgumentParser(add_help=True)
+    channel = argparser.add_mutually_exclusive_group()
+    channel.add_argument("--socket", default=SOCKET_PATH)
+    channel.add_argument("--stdio", action="store_true")
+    argparser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    args = argparser.parse_args()
+
+    daemon = Daemon(args.jobs)
+    try:
+        if args.stdio:
+            asyncio.run(daemon.serve_stdio())
+        else:
+            asyncio.run(daemon.serve_socket(args.socket))
+    finally:
+        daemon.pool.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Description: Parser alternativo al LALR de PLY: descenso recursivo para las
+#   instrucciones y precedencia de operadores (Pratt) para las expresiones.
+#
+#   El parser de PLY llama a una función de Python por cada reducción, también
+#   en las cadenas que no construyen nada: expression -> relacion -> suma ->
+#   termino -> factor -> Literal por cada número, y Plus : TkPlus, Less :
+#   TkLess, ... por cada operador. Aquí:
+#
+#   - Cada instrucción se reconoce por su primer token (Ident, while, if,
+#     print, skip, {) y se construye con una llamada.
+#   - Las expresiones se analizan con un solo lazo que consulta el nivel de
+#     cada operador en la tabla precedence de parse.py, así que un número o
+#     un identificador no pasa por los cinco niveles de la gramática.
+#   - Los tokens se leen primero en una lista; el token actual es un índice.
+#
+#   Los árboles, con sus filas y columnas, son los mismos que los de parse.py
+#   (benchmarks/bench_descent.py lo verifica). Ante un error sintáctico no
+#   reporta nada: el análisis se repite con el parser de PLY, que produce los
+#   mismos mensajes y la misma recuperación de errores. Lo mismo ocurre si el
+#   anidamiento excede la pila de Python. Se elige con
+#   python parse.py --parser descent, o con parse.run_parser(backend="descent").
+
+from ply.lex import LexToken
+from ast_nodes import (Block, DeclareSection, Declare, Asig, WriteFunction,
+                       TwoPoints, If, Guard, While, Print, Skip, BinOp,
+                       UnaryOp, App, Literal, String, Ident, sequence)
+
+
+# operadores prefijos: token -> nombre de su nivel en la tabla (%prec)
+PREFIX = {"TkNot": "TkNot", "TkMinus": "UMinus"}
+
+# tokens con los que empieza una instrucción y una declaración
+INSTRUCTION_START = ("TkId", "TkWhile", "TkIf", "TkPrint", "TkSkip", "TkOBlock")
+DECLARE_START = ("TkInt", "TkBool", "TkFunction")
+
+# tipo del token que se agrega al final de la entrada
+END = "$end"
+
+
+class Unexpected(Exception):
+    """El token actual no puede seguir; el análisis lo repite PLY."""
+
+
+class DescentParser():
+    """Parser de descenso recursivo. precedence es la tabla de parse.py:
+        cada operador binario recibe (nivel, nivel mínimo de su operando
+        derecho) y cada prefijo el nivel mínimo de su operando.
+    """
+
+    def __init__(self, precedence):
+        self.infix = {}
+        levels = {}
+        for level, (assoc, *names) in enumerate(precedence, 1):
+            for name in names:
+                levels[name] = level
+                if name not in PREFIX.values():
+                    right = level if assoc == "right" else level + 1
+                    self.infix[name] = (level, right)
+        self.prefix = {token: levels[name] for token, name in PREFIX.items()}
+        self.tokens = []
+        self.types = []
+        self.pos = 0
+
+    def parse(self, tokens):
+        """Devuelve el AST de la lista de tokens, o lanza Unexpected (o
+            RecursionError) si no es un programa válido."""
+        end = LexToken()
+        end.type, end.value, end.lineno, end.lexpos, end.column = END, None, 0, 0, 0
+        self.tokens = tokens + [end]
+        self.types = [tok.type for tok in self.tokens]
+        self.pos = 0
+        try:
+            tree = self.block()
+            self.expect(END)
+        finally:
+            self.tokens = self.types = []
+        return tree
+
+    def expect(self, kind):
+        """Consume el token actual, que debe ser de tipo kind, y lo devuelve."""
+        pos = self.pos
+        if self.types[pos] != kind:
+            raise Unexpected()
+        self.pos = pos + 1
+        return self.tokens[pos]
+
+    #------------------------------------------------
+    # Instrucciones
+    #------------------------------------------------
+
+    def block(self):
+        start = self.expect("TkOBlock")
+        declare = body = None
+        if self.types[self.pos] in DECLARE_START:
+            declare = self.declare_section()
+            if self.types[self.pos] == "TkCBlock":
+                self.pos += 1
+                return Block(declare, None, start.lineno, start.column)
+        body = sequence(self.secuencing())
+        self.expect("TkCBlock")
+        return Block(declare, body, start.lineno, start.column)
+
+    def secuencing(self):
+        """Lista de instrucciones separadas por ; (se admiten ; de más al
+            final, como en la gramática)."""
+        types = self.types
+        instructions = [self.instruction()]
+        while types[self.pos] == "TkSemicolon":
+            self.pos += 1
+            if types[self.pos] in INSTRUCTION_START:
+                instructions.append(self.instruction())
+        return instructions
+
+    def instruction(self):
+        tok = self.tokens[self.pos]
+        kind = tok.type
+        if kind == "TkId":
+            return self.asig(tok)
+        if kind == "TkOBlock":
+            return self.block()
+        if kind == "TkSkip":
+            self.pos += 1
+            return Skip(tok.lineno, tok.column)
+        if kind == "TkPrint":
+            self.pos += 1
+            return Print(self.expression(), tok.lineno, tok.column)
+        if kind == "TkIf":
+            self.pos += 1
+            guards = [self.guard()]
+            while self.types[self.pos] == "TkGuard":
+                self.pos += 1
+                guards.append(self.guard())
+            self.expect("TkFi")
+            return If(guards, tok.lineno, tok.column)
+        if kind == "TkWhile":
+            self.pos += 1
+            condition = self.expression()
+            self.expect("TkArrow")
+            body = sequence(self.secuencing())
+            self.expect("TkEnd")
+            return While(condition, body, tok.lineno, tok.column)
+        raise Unexpected()
+
+    def guard(self):
+        condition = self.expression()
+        self.expect("TkArrow")
+        body = sequence(self.secuencing())
+        return Guard(condition, body, condition.lineno, condition.column)
+
+    def asig(self, tok):
+        target = Ident(tok.value, tok.lineno, tok.column)
+        self.pos += 1
+        self.expect("TkAsig")
+        pos = self.pos
+        # Ident seguido de ( solo puede ser una modificación F(a:b)...
+        if self.types[pos] == "TkId" and self.types[pos + 1] == "TkOpenPar":
+            value = self.write_function(self.tokens[pos])
+        else:
+            value = self.expression()
+        return Asig(target, value, tok.lineno, tok.column)
+
+    def write_function(self, tok):
+        function = Ident(tok.value, tok.lineno, tok.column)
+        self.pos += 1
+        updates = []
+        while self.types[self.pos] == "TkOpenPar":
+            self.pos += 1
+            index = self.expression()
+            colon = self.expect("TkTowPoints")
+            value = self.expression()
+            self.expect("TkClosePar")
+            updates.append(TwoPoints(index, value, colon.lineno, colon.column))
+        return WriteFunction(function, updates, tok.lineno, tok.column)
+
+    #------------------------------------------------
+    # Declaraciones
+    #------------------------------------------------
+
+    def declare_section(self):
+        declarations = []
+        while self.types[self.pos] in DECLARE_START:
+            declarations.append(self.declare())
+            self.expect("TkSemicolon")
+        first = declarations[0]
+        return DeclareSection(declarations, first.lineno, first.column)
+
+    def declare(self):
+        tok = self.tokens[self.pos]
+        self.pos += 1
+        size = None
+        if tok.type == "TkFunction":
+            self.expect("TkOBracket")
+            self.expect("TkSoForth")
+            size = self.literal(self.tokens[self.pos])
+            self.expect("TkCBracket")
+        return Declare(tok.value, self.ident_list(), size, tok.lineno, tok.column)
+
+    def ident_list(self):
+        tok = self.expect("TkId")
+        names = [Ident(tok.value, tok.lineno, tok.column)]
+        while self.types[self.pos] == "TkComma":
+            self.pos += 1
+            tok = self.expect("TkId")
+            names.append(Ident(tok.value, tok.lineno, tok.column))
+        return names
+
+    def literal(self, tok):
+        kind = tok.type
+        if kind == "TkNum":
+            value = tok.value
+        elif kind == "TkTrue" or kind == "TkFalse":
+            value = kind == "TkTrue"
+        else:
+            raise Unexpected()
+        self.pos += 1
+        return Literal(value, tok.lineno, tok.column)
+
+    #------------------------------------------------
+    # Expresiones
+    #------------------------------------------------
+
+    def expression(self, min_level=0):
+        """Expresión cuyos operadores binarios tienen nivel min_level o
+            mayor. Los de un mismo nivel se agrupan a izquierda (o a derecha,
+            según la tabla)."""
+        tokens = self.tokens
+        tok = tokens[self.pos]
+        kind = tok.type
+        operand_level = self.prefix.get(kind)
+        if operand_level is not None:
+            self.pos += 1
+            operand = self.expression(operand_level)
+            left = UnaryOp(kind[2:], operand, tok.lineno, tok.column)
+        else:
+            left = self.primary(tok)
+
+        infix = self.infix
+        while True:
+            tok = tokens[self.pos]
+            levels = infix.get(tok.type)
+            if levels is None or levels[0] < min_level:
+                return left
+            self.pos += 1
+            right = self.expression(levels[1])
+            if tok.type == "TkApp":
+                left = App(left, right, tok.lineno, tok.column)
+            else:
+                left = BinOp(tok.type[2:], left, right, tok.lineno, tok.column)
+
+    def primary(self, tok):
+        kind = tok.type
+        if kind == "TkId":
+            self.pos += 1
+            return Ident(tok.value, tok.lineno, tok.column)
+        if kind == "TkOpenPar":
+            self.pos += 1
+            value = self.expression()
+            self.expect("TkClosePar")
+            return value
+        if kind == "TkString":
+            self.pos += 1
+            return String(tok.value, tok.lineno, tok.column)
+        return self.literal(tok)
+
+
+def replay(tokens, marks, lexical, errors):
+    """Los tokens de nuevo, devolviendo a errors cada error léxico justo
+        antes del token que lo siguió (marks[i] es la cantidad de errores
+        léxicos que había al leer tokens[i]), como al leerlos la primera vez.
+    """
+    reported = 0
+    for tok, mark in zip(tokens, marks):
+        if mark > reported:
+            errors.extend(lexical[reported:mark])
+            reported = mark
+        yield tok
+    errors.extend(lexical[reported:])
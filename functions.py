@@ -0,0 +1,111 @@
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Description: Representación persistente de los valores function[..N].
+#
+#   Un valor es un árbol de prefijos (trie) de ancho 32: las hojas guardan
+#   hasta 32 elementos y los nodos internos hasta 32 hijos. Un hijo None
+#   representa un subárbol con todos sus elementos en 0, así que
+#   function[..N] recién declarada no reserva memoria proporcional a N.
+#
+#   Los valores nunca se modifican. F(a:b)(c:d) copia solo los nodos del
+#   camino hacia cada índice modificado y comparte el resto con F; todos los
+#   pares de una misma cadena se aplican en un solo lote, copiando cada nodo
+#   a lo sumo una vez. Leer F.i cuesta O(log32 N).
+
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+
+
+class FunctionValue():
+    """Valor inmutable de tipo function[..N], con dominio 0..size-1."""
+    __slots__ = ("size", "shift", "root")
+
+    def __init__(self, size, shift=None, root=None):
+        if shift is None:
+            # profundidad mínima para que el árbol cubra size elementos
+            shift = 0
+            while WIDTH << shift < size:
+                shift += BITS
+        self.size = size
+        self.shift = shift
+        self.root = root
+
+    def __len__(self):
+        return self.size
+
+    def get(self, index):
+        """Devuelve el elemento index. Lanza IndexError fuera del dominio."""
+        if not 0 <= index < self.size:
+            raise IndexError(index, self.size)
+        node = self.root
+        shift = self.shift
+        while shift and node is not None:
+            node = node[(index >> shift) & MASK]
+            shift -= BITS
+        if node is None:
+            return 0
+        return node[index & MASK]
+
+    def update(self, pairs):
+        """Devuelve un nuevo valor con los pares (índice, valor) aplicados en
+            orden. Lanza IndexError si algún índice está fuera del dominio.
+        """
+        leaf_width = min(self.size, WIDTH)
+        owned = set()  # nodos creados en este lote, se pueden modificar
+
+        def own(node, leaf):
+            if node is None:
+                node = [0] * leaf_width if leaf else [None] * WIDTH
+            else:
+                node = list(node)
+            owned.add(id(node))
+            return node
+
+        root = own(self.root, self.shift == 0)
+        for index, value in pairs:
+            if not 0 <= index < self.size:
+                raise IndexError(index, self.size)
+            node = root
+            shift = self.shift
+            while shift:
+                slot = (index >> shift) & MASK
+                child = node[slot]
+                if child is None or id(child) not in owned:
+                    child = own(child, shift == BITS)
+                    node[slot] = child
+                node = child
+                shift -= BITS
+            node[index & MASK] = value
+        return FunctionValue(self.size, self.shift, root)
+
+    def __iter__(self):
+        """Recorre todos los elementos en orden."""
+        stack = [(self.root, self.shift, self.size)]
+        while stack:
+            node, shift, count = stack.pop()
+            if node is None:
+                yield from [0] * count
+            elif shift == 0:
+                yield from node[:count]
+            else:
+                span = 1 << shift
+                children = []
+                for child in node:
+                    if count <= 0:
+                        break
+                    children.append((child, shift - BITS, min(span, count)))
+                    count -= span
+                stack.extend(reversed(children))
+
+    def nodes(self):
+        """Cantidad de nodos reservados (para medir memoria compartida)."""
+        total = 0
+        stack = [(self.root, self.shift)]
+        while stack:
+            node, shift = stack.pop()
+            if node is None:
+                continue
+            total += 1
+            if shift:
+                stack.extend((child, shift - BITS) for child in node)
+        return total
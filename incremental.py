@@ -0,0 +1,358 @@
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Description: Análisis léxico y sintáctico incremental de un programa que se
+#   edita (editores, hooks que vuelven a analizar en cada cambio).
+#
+#   Document guarda el texto, los tokens de cada línea y el árbol. Una
+#   edición (offset, largo eliminado, texto insertado) se aplica así:
+#
+#   - Ningún token ocupa más de una línea, así que el comienzo de una línea
+#     es un punto seguro para reiniciar el lexer. Solo se vuelven a analizar
+#     las líneas tocadas por la edición; los tokens de las demás líneas no
+#     cambian (solo su fila), así que se resincronizan al final de la última
+#     línea editada.
+#   - Si las llaves de las líneas editadas están balanceadas, antes y después
+#     de la edición, se busca el Block más interno que las contiene y se
+#     vuelve a analizar solo ese bloque, reemplazándolo en el árbol. En otro
+#     caso (o si el árbol tenía errores) se analiza todo de nuevo.
+#
+#   - Agregar o quitar líneas corre la fila de todos los nodos siguientes.
+#     El corrimiento no se aplica en la edición: se anota, y se aplica a
+#     todos los nodos de una vez cuando se pide el árbol (Document.tree),
+#     así que una edición cuesta lo mismo en cualquier parte del texto.
+#
+#   El resultado es siempre igual al de analizar el texto completo.
+
+from bisect import bisect_right
+from ply.lex import LexToken
+from lexer import new_lexer, tokenize, FORMATS
+from parse import run_parser
+from ast_nodes import Block, Secuencing, If, Guard, While, Declare
+
+
+class Line():
+    """Tokens de una línea del texto.
+
+        tokens es una tupla de (tipo, valor, columna). errors son los mensajes
+        de error léxico, generados cuando la línea era la fila row.
+    """
+    __slots__ = ("text", "tokens", "errors", "row")
+
+    def __init__(self, text, tokens, errors, row):
+        self.text = text
+        self.tokens = tokens
+        self.errors = errors
+        self.row = row
+
+
+def balanced(lines):
+    """True si las llaves de las líneas forman bloques completos."""
+    depth = 0
+    for line in lines:
+        for kind, _, _ in line.tokens:
+            if kind == "TkOBlock":
+                depth += 1
+            elif kind == "TkCBlock":
+                depth -= 1
+                if depth < 0:
+                    return False
+    return depth == 0
+
+
+def moved(row, shifts):
+    """Fila row después de los corrimientos shifts, en orden: cada uno
+        (after, delta) suma delta a las filas mayores que after."""
+    for after, delta in shifts:
+        if row > after:
+            row += delta
+    return row
+
+
+def find_block(tree, position, shifts=(), placed=None):
+    """Busca el Block que comienza en position (fila, columna) bajando solo
+        por las instrucciones que pueden contenerlo.
+
+        Las filas de los nodos son las de antes de los corrimientos shifts,
+        salvo en los bloques de placed (id -> (bloque, n)), que ya tienen
+        los n primeros.
+
+        Devuelve (contenedor, clave, bloque), donde contenedor[clave] o
+        getattr(contenedor, clave) es el bloque, o None si no se encuentra.
+    """
+    placed = placed or {}
+
+    def epoch_of(node, epoch):
+        entry = placed.get(id(node))
+        return entry[1] if entry is not None else epoch
+
+    def start_of(node, epoch):
+        return (moved(node.lineno, shifts[epoch_of(node, epoch):]), node.column)
+
+    container, key, node, epoch = None, None, tree, 0
+    while node is not None:
+        epoch = epoch_of(node, epoch)
+        kind = type(node)
+        if kind is Block and start_of(node, epoch) == position:
+            return container, key, node
+        if kind is Secuencing:
+            # las instrucciones están en orden, se elige la última que
+            # comienza antes de position
+            i = bisect_right(node.instructions, position,
+                             key=lambda instruction: start_of(instruction, epoch)) - 1
+            if i < 0:
+                return None
+            container, key, node = node.instructions, i, node.instructions[i]
+        elif kind is If:
+            # la posición de una guardia es la de su condición, que puede ser
+            # la del operador; se compara con el comienzo de su cuerpo
+            guards = node.guards
+            i = bisect_right(guards, position,
+                             key=lambda guard: start_of(guard.body, epoch)) - 1
+            if i < 0:
+                return None
+            container, key, node = guards[i], "body", guards[i].body
+        elif kind is Block or kind is Guard or kind is While:
+            container, key, node = node, "body", node.body
+        else:
+            return None
+    return None
+
+
+def shift_rows(tree, shifts, placed):
+    """Aplica a los nodos de tree los corrimientos de filas shifts, salvo
+        los que ya tienen los bloques de placed (id -> (bloque, n): sus
+        nodos ya tienen los n primeros).
+
+        Los hijos de un nodo están en el orden del texto, así que si un hijo
+        comienza en una fila que ningún corrimiento mueve, tampoco mueven
+        los nodos de los hijos anteriores, y no se visitan.
+    """
+    # lowest[n] es la menor fila after de shifts[n:]: una fila <= lowest[n]
+    # no cambia con ellos
+    lowest = [after for after, _ in shifts]
+    for n in range(len(shifts) - 2, -1, -1):
+        lowest[n] = min(lowest[n], lowest[n + 1])
+
+    # fila nueva de cada (fila, n): los nodos de una misma línea la comparten
+    rows = {}
+    stack = [(tree, 0)]
+    while stack:
+        node, epoch = stack.pop()
+        entry = placed.get(id(node))
+        if entry is not None:
+            epoch = entry[1]
+        if epoch == len(shifts):
+            continue  # bloque analizado después del último corrimiento
+        row = rows.get((node.lineno, epoch))
+        if row is None:
+            row = rows[node.lineno, epoch] = moved(node.lineno, shifts[epoch:])
+        node.lineno = row
+        children = node.children()
+        if type(node) is Declare:
+            # los nombres y el tamaño no son hijos para imprimir el árbol
+            children = node.names + ([node.size] if node.size is not None else [])
+        for child in reversed(children):
+            stack.append((child, epoch))
+            # la fila de un bloque de placed es de otro momento; no se compara
+            if child.lineno <= lowest[epoch] and id(child) not in placed:
+                break
+
+
+class Document():
+    """Texto de un programa con sus tokens por línea y su árbol sintáctico.
+
+        tree y syntax_errors son los de parse.run_parser sobre el texto
+        completo; lex_output() es la salida de lexer.lex_text.
+
+        root es el árbol sin los corrimientos de filas pendientes: shifts,
+        en orden, y placed, los bloques que se insertaron en root después de
+        algunos de ellos (ver shift_rows). tree los aplica.
+    """
+
+    def __init__(self, source):
+        self.lexer = new_lexer()
+        self.source = source
+        self.lines = [self.lex_line(text, row)
+                      for row, text in enumerate(source.split("\n"), 1)]
+        self.error_lines = sum(1 for line in self.lines if line.errors)
+        # trabajo hecho en la última edición, para medir
+        self.relexed_lines = len(self.lines)
+        self.reparsed_tokens = 0
+        self.parse_all()
+
+    def lex_line(self, text, row):
+        errors = []
+        tokens = tuple((tok.type, tok.value, tok.column)
+                       for tok in tokenize(text, errors, self.lexer, row))
+        return Line(text, tokens, errors, row)
+
+    #------------------------------------------------
+    # tokens y salida del lexer
+    #------------------------------------------------
+
+    def tokens(self, first=(0, 0), last=None):
+        """Genera los tokens como LexToken, desde first hasta last
+            (inclusive), dados como (línea, índice del token en la línea).
+        """
+        line_index, token_index = first
+        stop_line, stop_token = last if last is not None else (len(self.lines) - 1, None)
+        lines = self.lines
+        while line_index <= stop_line:
+            line_tokens = lines[line_index].tokens
+            stop = stop_token + 1 if line_index == stop_line and stop_token is not None else None
+            for kind, value, column in line_tokens[token_index:stop]:
+                tok = LexToken()
+                tok.type = kind
+                tok.value = value
+                tok.lineno = line_index + 1
+                tok.column = column
+                tok.lexpos = -1
+                yield tok
+            line_index += 1
+            token_index = 0
+
+    def lex_errors(self):
+        """Errores léxicos del texto, en orden."""
+        errors = []
+        for row, line in enumerate(self.lines, 1):
+            if line.errors:
+                if line.row != row:
+                    # la línea se movió; sus mensajes llevan la fila anterior
+                    self.lines[row - 1] = line = self.lex_line(line.text, row)
+                errors.extend(line.errors)
+        return errors
+
+    def lex_output(self, format="text", path=None):
+        """Igual a lexer.lex_text(self.source, format, path)."""
+        token_format, error_format = FORMATS[format]
+        if self.error_lines:
+            return "\n".join(error_format(error, path) for error in self.lex_errors())
+        return "\n".join(token_format(tok, path) for tok in self.tokens())
+
+    #------------------------------------------------
+    # edición
+    #------------------------------------------------
+
+    @property
+    def tree(self):
+        if self.shifts:
+            shift_rows(self.root, self.shifts, self.placed)
+            self.shifts = []
+            self.placed = {}
+        return self.root
+
+    def edit(self, offset, removed, inserted):
+        """Reemplaza los removed caracteres desde offset por inserted y
+            actualiza los tokens y el árbol.
+        """
+        source = self.source
+        if not 0 <= offset <= offset + removed <= len(source):
+            raise ValueError(f"Edición fuera del texto: {offset}, {removed}")
+
+        # líneas first..last tocadas por la edición, y dónde comienzan y
+        # terminan en el texto
+        first = source.count("\n", 0, offset)
+        last = first + source.count("\n", offset, offset + removed)
+        begin = source.rfind("\n", 0, offset) + 1
+        end = source.find("\n", offset + removed)
+        if end < 0:
+            end = len(source)
+
+        self.source = source[:offset] + inserted + source[offset + removed:]
+        texts = self.source[begin:end + len(inserted) - removed].split("\n")
+
+        old_lines = self.lines[first:last + 1]
+        new_lines = [self.lex_line(text, row)
+                     for row, text in enumerate(texts, first + 1)]
+        self.lines[first:last + 1] = new_lines
+        self.error_lines += (sum(1 for line in new_lines if line.errors)
+                             - sum(1 for line in old_lines if line.errors))
+        self.relexed_lines = len(new_lines)
+
+        self.reparse(first, last, old_lines, new_lines)
+
+    def parse_all(self):
+        self.syntax_errors = []
+        self.root = run_parser(self.tokens(), self.syntax_errors)
+        self.shifts = []
+        self.placed = {}
+        self.reparsed_tokens = sum(len(line.tokens) for line in self.lines)
+
+    def reparse(self, first, last, old_lines, new_lines):
+        """Vuelve a analizar el Block más interno que contiene las líneas
+            editadas (old_lines, que eran first..last, reemplazadas por
+            new_lines). Si no se puede, analiza todo el texto.
+        """
+        if self.root is None or not balanced(old_lines) or not balanced(new_lines):
+            return self.parse_all()
+
+        opening = self.enclosing_block(first)
+        if opening is None:
+            return self.parse_all()
+        closing = self.matching_close(opening)
+        new_last = first + len(new_lines) - 1
+        if closing is None or closing[0] <= new_last:
+            return self.parse_all()
+
+        open_line, open_token = opening
+        position = (open_line + 1, self.lines[open_line].tokens[open_token][2])
+        found = find_block(self.root, position, self.shifts, self.placed)
+        if found is None:
+            return self.parse_all()
+        container, key, old_block = found
+
+        errors = []
+        block = run_parser(self.tokens(opening, closing), errors)
+        if block is None or errors:
+            # los mensajes deben ser los del análisis completo
+            return self.parse_all()
+        self.reparsed_tokens = sum(len(line.tokens)
+                                   for line in self.lines[open_line:closing[0] + 1])
+
+        # las filas de los nodos siguientes se corren cuando se pida el árbol
+        delta = len(new_lines) - len(old_lines)
+        if delta:
+            self.shifts.append((last + 1, delta))
+        if self.shifts:
+            self.placed[id(block)] = (block, len(self.shifts))
+        if container is None:
+            self.root = block
+            self.shifts = []
+            self.placed = {}
+        elif isinstance(container, list):
+            container[key] = block
+        else:
+            setattr(container, key, block)
+
+    def enclosing_block(self, first):
+        """Busca hacia atrás, desde la línea anterior a first, la llave {
+            que no se cierra antes. Devuelve (línea, índice) o None.
+        """
+        depth = 0
+        for line_index in range(first - 1, -1, -1):
+            tokens = self.lines[line_index].tokens
+            for token_index in range(len(tokens) - 1, -1, -1):
+                kind = tokens[token_index][0]
+                if kind == "TkCBlock":
+                    depth += 1
+                elif kind == "TkOBlock":
+                    if depth == 0:
+                        return line_index, token_index
+                    depth -= 1
+        return None
+
+    def matching_close(self, opening):
+        """Devuelve (línea, índice) de la llave } que cierra opening."""
+        depth = 0
+        line_index, token_index = opening
+        for line_index in range(line_index, len(self.lines)):
+            tokens = self.lines[line_index].tokens
+            for token_index in range(token_index, len(tokens)):
+                kind = tokens[token_index][0]
+                if kind == "TkOBlock":
+                    depth += 1
+                elif kind == "TkCBlock":
+                    depth -= 1
+                    if depth == 0:
+                        return line_index, token_index
+            token_index = 0
+        return None
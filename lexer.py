@@ -1,202 +1,638 @@
 # Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
 # Date: 19-05-2025
-# Description: Proyecto Etapa1 CI-3725 Traductores e Interpretadores 
+# Description: Proyecto Etapa1 CI-3725 Traductores e Interpretadores
 
+from stats import STATS, no_phase, stats_flag  # primero, para medir el arranque
 import ply.yacc as Yacc
 import ply.lex as Lex
 import sys
+import time
+import os
+import json
+import hashlib
+import argparse
+import importlib.util
+import mmap
+import shutil
+import tempfile
+from array import array
+from bisect import bisect_right
+
+
+# Directorio donde se guardan las tablas generadas (lextab, parsetab)
+from cachedir import CACHE_DIR
+
+
+# palabras reservadas del lenguaje
+reserved = {
+    "if" : "TkIf",
+    "fi" : "TkFi",
+    "end" : "TkEnd",
+    "while" : "TkWhile",
+    "or" : "TkOr",
+    "bool" : "TkBool",
+    "true" : "TkTrue",
+    "false" : "TkFalse",
+    "skip" : "TkSkip",
+    "int" : "TkInt",
+    "function" : "TkFunction",
+    "print" : "TkPrint",
+    "and" : "TkAnd"
+}
+
+tokens = [
+    "TkOBlock" ,
+    "TkCBlock" ,
+    "TkSoForth" ,
+    "TkComma" ,
+    "TkOpenPar" ,
+    "TkClosePar" ,
+    "TkAsig" ,
+    "TkSemicolon" ,
+    "TkArrow" ,
+    "TkGuard" ,
+    "TkPlus" ,
+    "TkMinus" ,
+    "TkMult" ,
+    "TkNot" ,
+    "TkLess" ,
+    "TkLeq" ,
+    "TkGeq" ,
+    "TkGreater" ,
+    "TkEqual" ,
+    "TkNEqual" ,
+    "TkOBracket" ,
+    "TkCBracket" ,
+    "TkTowPoints" ,
+    "TkApp",
+    "TkNum",
+    "TkString",
+    "TkId"
+
+] + list(reserved.values())
+
+
+
+# tokens sencillos
+
+t_TkOBlock = r"\{"
+t_TkCBlock = r"\}"
+t_TkSoForth = r"\. \."
+t_TkComma = r"\,"
+t_TkOpenPar = r"\("
+t_TkClosePar = r"\)"
+t_TkAsig = r"\:\="
+t_TkSemicolon = r"\;"
+t_TkArrow = r"\-\-\>"
+t_TkGuard = r"\[\]"
+t_TkPlus = r"\+"
+t_TkMinus = r"\-"
+t_TkMult = r"\*"
+t_TkNot = r"\!"
+t_TkLess = r"\<"
+t_TkLeq = r"\<\="
+t_TkGeq = r"\>\="
+t_TkGreater = r"\>"
+t_TkEqual = r"\=\="
+t_TkNEqual = r"\<\>"
+t_TkOBracket = r"\["
+t_TkCBracket = r"\]"
+t_TkTowPoints = r"\:"
+t_TkApp = r"\."
+
+# tokens especiales
+
+def t_COMMENT(t):
+    r'//.*'
+    pass  # No retorna nada - ignora los comentarios
+
+def t_TkId(t):
+    r"[a-zA-Z_][a-zA-Z_0-9]*"
+    t.type = reserved.get(t.value, "TkId")
+    return t
+
+def t_TkString(t):
+    r'"[^"\\\n]*(?:\\[n"\\][^"\\\n]*)*"'
+    t.value = t.value[1:-1]  # Remover las comillas
+    return t
+
+def t_TkNum(t):
+    r"\d+"
+    t.value = int(t.value)
+    return t
+
+# manejo de errores
+
+def t_error(t):
+    # El índice de inicios de línea se construye una sola vez, con el
+    # primer error, y luego se consulta con búsqueda binaria
+    lexer = t.lexer
+    if STATS.active:
+        start = time.perf_counter()
+    if lexer.line_index is None:
+        lexer.line_index = line_starts(lexer.lexdata)
+    line_start = lexer.line_index[bisect_right(lexer.line_index, t.lexpos) - 1]
+    column = t.lexpos - line_start + 1
+    if STATS.active:
+        STATS.add_time("columnas_de_error", time.perf_counter() - start)
+    lexer.errors.append(f"Error: Unexpected character \"{t.value[0]}\" in row {t.lineno}, column {column}")
+    t.lexer.skip(1)
+
+# tokens ignorados
+
+t_ignore = " \t"
+
+# conteo de lineas
+
+def t_newline( t ):
+    r"\n+"
+    t.lexer.lineno += len(t.value)
+    # inicio de la línea actual, para calcular columnas sin buscar hacia atrás
+    t.lexer.line_start = t.lexpos + len(t.value)
+
+
+def line_starts(source):
+    """Devuelve la lista de posiciones donde comienza cada línea de source."""
+    starts = [0]
+    find = source.find
+    pos = find('\n')
+    while pos >= 0:
+        starts.append(pos + 1)
+        pos = find('\n', pos + 1)
+    return starts
+
+
+def rules_hash():
+    """Devuelve un hash del conjunto de reglas del lexer: tokens, palabras
+        reservadas, expresiones regulares de las reglas t_ y versión de PLY.
+        Cualquier cambio en las reglas invalida las tablas guardadas.
+    """
+    h = hashlib.sha1()
+    h.update(Lex.__version__.encode())
+    h.update(repr(tokens).encode())
+    h.update(repr(sorted(reserved.items())).encode())
+    rules = globals()
+    for name in sorted(rules):
+        if name.startswith("t_"):
+            rule = rules[name]
+            h.update(name.encode())
+            h.update(repr(rule.__doc__ if callable(rule) else rule).encode())
+    return h.hexdigest()[:16]
+
+
+def build_lexer():
+    """Construye el lexer base del módulo.
+
+        Si existe una tabla lextab para el hash actual de las reglas se carga
+        directamente (sin reflexión ni validación). Si no, se construye el
+        lexer con reflexión y se intenta guardar la tabla en CACHE_DIR.
+    """
+    module = sys.modules[__name__]
+    tabname = "lextab_" + rules_hash()
+    tabfile = os.path.join(CACHE_DIR, tabname + ".py")
+
+    if os.path.exists(tabfile):
+        try:
+            spec = importlib.util.spec_from_file_location(tabname, tabfile)
+            lextab = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(lextab)
+            return Lex.lex(module=module, optimize=True, lextab=lextab)
+        except Exception:
+            pass  # tabla dañada o incompatible, se regenera
+
+    lexer = Lex.lex(module=module)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        lexer.writetab(tabname, CACHE_DIR)
+    except OSError:
+        pass  # directorio de solo lectura, se trabaja sin tablas
+    return lexer
 
 
-def main():
-    """El algoritmo recibe como algoritmo de línea de comando el archivo.
-        Hace un análisis de caracteres del archivo, reconoce los tokens
-        del lenguaje e indica medinate errores por terminal cuando un 
-        caracter que no pertenece a la gramática es introducido.
+# llamada al contructor lexico, una sola vez por proceso
+with STATS.phase("construccion_lexer"):
+    base_lexer = build_lexer()
+
+
+def reset_lexer(lexer, errors=None, lineno=1):
+    """Prepara lexer para una entrada nueva, sin crear otro objeto."""
+    lexer.errors = errors if errors is not None else []
+    lexer.lineno = lineno
+    lexer.line_start = 0
+    lexer.line_index = None
+    return lexer
+
+
+# analizadores léxicos disponibles: el de PLY y el autómata de scanner.py
+SCANNERS = ("ply", "dfa")
+
+# el autómata se construye la primera vez que se pide
+dfa_lexer = None
+
+
+def new_lexer(errors=None, scanner="ply"):
+    """Devuelve una copia del lexer base lista para recibir una entrada.
+        Con scanner="dfa" es un scanner.DFALexer, que produce los mismos
+        tokens y errores.
     """
-    # Verificar que se proporcionó un archivo como argumento
-    if len(sys.argv) != 2:
-        print("Error: Por favor proporcione un archivo .imperat como argumento")
-        print("Uso: python lexer.py archivo.imperat")
-        sys.exit(1)
+    global dfa_lexer
+    if scanner == "dfa":
+        if dfa_lexer is None:
+            from scanner import DFALexer
+            dfa_lexer = DFALexer(SYMBOLS, reserved)
+        return reset_lexer(dfa_lexer.clone(), errors)
+    return reset_lexer(base_lexer.clone(), errors)
+
+
+def tokenize(source, errors=None, lexer=None, lineno=1):
+    """Generador de tokens del lenguaje sobre source.
+
+        Cada token se produce a medida que se reconoce y lleva su columna
+        en el atributo column. Los errores léxicos se agregan a la lista
+        errors (si se proporciona) a medida que aparecen. Si se pasa un
+        lexer (de new_lexer) se reutiliza en lugar de crear uno nuevo.
+        lineno es la fila de la primera línea de source.
+    """
+    if lexer is None:
+        lexer = base_lexer.clone()
+    reset_lexer(lexer, errors, lineno)
 
-    # Verificar que el archivo tenga la extensión correcta
-    if not sys.argv[1].endswith('.imperat'):
-        print("Error: El archivo debe tener extensión .imperat")
-        sys.exit(1)
+    # entrada de la data
+    lexer.input(source)
 
-    # Intentar abrir y leer el archivo
-    try:
-        with open(sys.argv[1], 'r') as file:
-            input_data = file.read()
-    except FileNotFoundError:
-        print(f"Error: No se encontró el archivo {sys.argv[1]}")
-        sys.exit(1)
-    except Exception as e:
-        print(f"Error al leer el archivo: {str(e)}")
-        sys.exit(1)
+    for tok in lexer:
+        tok.column = tok.lexpos - lexer.line_start + 1
+        yield tok
+
+
+def format_token(tok, path=None):
+    """Devuelve la representación textual de un token: TkId("x") fila columna"""
+    if (tok.type == "TkNum"):
+        return f"{tok.type}({tok.value}) {tok.lineno} {tok.column}"
+    elif (tok.type == "TkId"):
+        return f"{tok.type}(\"{tok.value}\") {tok.lineno} {tok.column}"
+    elif (tok.type == "TkString"):
+        return f"{tok.type}(\"{tok.value}\") {tok.lineno} {tok.column}"
+    else:
+        return f"{tok.type} {tok.lineno} {tok.column}"
 
-    # palabras reservadas del lenguaje
-    reserved = {
-        "if" : "TkIf",
-        "fi" : "TkFi",
-        "end" : "TkEnd",
-        "while" : "TkWhile",
-        "or" : "TkOr",
-        "bool" : "TkBool",
-        "true" : "TkTrue",
-        "false" : "TkFalse",
-        "skip" : "TkSkip",
-        "int" : "TkInt",
-        "function" : "TkFunction",
-        "print" : "TkPrint",
-        "and" : "TkAnd"
-    }
-
-    tokens = [
-        "TkOBlock" ,
-        "TkCBlock" ,
-        "TkSoForth" ,
-        "TkComma" ,
-        "TkOpenPar" ,
-        "TkClosePar" ,
-        "TkAsig" ,
-        "TkSemicolon" ,
-        "TkArrow" ,
-        "TkGuard" ,
-        "TkPlus" ,
-        "TkMinus" ,
-        "TkMult" ,
-        "TkNot" ,
-        "TkLess" ,
-        "TkLeq" ,
-        "TkGeq" ,
-        "TkGreater" ,
-        "TkEqual" ,
-        "TkNEqual" ,
-        "TkOBracket" ,
-        "TkCBracket" ,
-        "TkTowPoints" ,
-        "TkApp",
-        "TkNum",
-        "TkString",
-        "TkId"
-
-    ] + list(reserved.values())
-
-
-
-    # tokens sencillos
-
-    t_TkOBlock = r"\{"
-    t_TkCBlock = r"\}"
-    t_TkSoForth = r"\. \."   
-    t_TkComma = r"\,"       
-    t_TkOpenPar = r"\("
-    t_TkClosePar = r"\)"
-    t_TkAsig = r"\:\="
-    t_TkSemicolon = r"\;"
-    t_TkArrow = r"\-\-\>"
-    t_TkGuard = r"\[\]"
-    t_TkPlus = r"\+"
-    t_TkMinus = r"\-"
-    t_TkMult = r"\*"
-    t_TkNot = r"\!"
-    t_TkLess = r"\<"
-    t_TkLeq = r"\<\="
-    t_TkGeq = r"\>\="
-    t_TkGreater = r"\>"
-    t_TkEqual = r"\=\="
-    t_TkNEqual = r"\<\>"
-    t_TkOBracket = r"\["
-    t_TkCBracket = r"\]"
-    t_TkTowPoints = r"\:"
-    t_TkApp = r"\."
-
-    # tokens especiales
-
-    def t_COMMENT(t):
-        r'//.*'
-        pass  # No retorna nada - ignora los comentarios
-        
-    def t_TkId(t):
-        r"[a-zA-Z_][a-zA-Z_0-9]*"
-        t.type = reserved.get(t.value, "TkId")
-        return t
-
-    def t_TkString(t):
-        r'"[^"\\\n]*(?:\\[n"\\][^"\\\n]*)*"'
-        t.value = t.value[1:-1]  # Remover las comillas
-        return t
-
-    def t_TkNum(t):
-        r"\d+"
-        t.value = int(t.value)
-        return t
-
-    # manejo de errores 
-    errors = []  # Lista para almacenar errores
 
-    def t_error(t):
-        column = t.lexpos - t.lexer.lexdata.rfind('\n', 0, t.lexpos)
-        if column <= 0:
-            column = t.lexpos + 1
-        errors.append(f"Error: Unexpected character \"{t.value[0]}\" in row {t.lineno}, column {column}")
-        t.lexer.skip(1)
+def format_error(error, path=None):
+    return error
 
-    # Actualizar la posición de la columna
-    def find_column(input, token):
-        last_cr = input.rfind('\n', 0, token.lexpos)
-        if last_cr < 0:
-            last_cr = -1
-        column = (token.lexpos - last_cr)
-        return column
 
-    # tokens ignorados
+# tokens que llevan un valor (número, identificador o texto)
+VALUED = ("TkNum", "TkId", "TkString")
 
-    t_ignore = " \t"
+def format_token_json(tok, path=None):
+    """Token como objeto JSON en una línea (formato jsonl)."""
+    value = tok.value if tok.type in VALUED else None
+    return json.dumps({"file": path, "type": tok.type, "value": value,
+                       "line": tok.lineno, "column": tok.column})
 
-    # conteo de lineas 
-    
-    def t_newline( t ):
-        r"\n+"
-        t.lexer.lineno += len(t.value)
 
+def format_error_json(error, path=None):
+    return json.dumps({"file": path, "error": error})
 
-    # llamada al contructor lexico
 
-    lexer = Lex.lex()
+def format_token_tsv(tok, path=None):
+    """Token separado por tabuladores: archivo tipo valor fila columna."""
+    value = tok.value if tok.type in VALUED else ""
+    if tok.type == "TkString":
+        value = value.replace("\t", "\\t")
+    return f"{path}\t{tok.type}\t{value}\t{tok.lineno}\t{tok.column}"
 
 
+def format_error_tsv(error, path=None):
+    return f"{path}\tError\t{error}"
 
-    # entrada de la data
 
-    lexer.input(input_data)
+# formatos de salida: (formato de token, formato de error)
+FORMATS = {
+    "text": (format_token, format_error),
+    "jsonl": (format_token_json, format_error_json),
+    "tsv": (format_token_tsv, format_error_tsv),
+}
 
-    # Lista para almacenar tokens
-    tokens_found = []
-    
-    # procesamiento del dato
-    for tok in lexer:
-        column = find_column(input_data, tok)
-        if (tok.type == "TkNum"):
-            tokens_found.append(f"{tok.type}({tok.value}) {tok.lineno} {column}")
-        elif (tok.type == "TkId"):
-            tokens_found.append(f"{tok.type}(\"{tok.value}\") {tok.lineno} {column}")
-        elif (tok.type == "TkString"):
-            tokens_found.append(f"{tok.type}(\"{tok.value}\") {tok.lineno} {column}")
+
+# identificador numérico de cada tipo de token
+TYPE_IDS = {name: i for i, name in enumerate(tokens)}
+
+# texto de los tokens sin valor propio (palabras reservadas y símbolos)
+LEXEMES = {name: word for word, name in reserved.items()}
+LEXEMES.update((name[2:], rule.replace("\\", "").replace(" ", ""))
+               for name, rule in list(globals().items())
+               if name.startswith("t_Tk") and isinstance(rule, str))
+
+# símbolos del lenguaje: texto -> tipo de token
+SYMBOLS = {word: name for name, word in LEXEMES.items() if name not in reserved.values()}
+
+
+class TokenBuffer():
+    """Secuencia de tokens guardada en columnas paralelas (arreglos).
+
+        types: identificador del tipo (índice en tokens).
+        lines, columns: posición del token.
+        values: el número para TkNum; para TkId y TkString, el índice del
+            texto en la tabla strings, donde cada texto aparece una sola vez.
+            Un TkNum que no cabe en 64 bits se guarda en big_numbers y su
+            valor es -(índice + 1).
+    """
+    __slots__ = ("types", "lines", "columns", "values", "strings",
+                 "string_index", "big_numbers")
+
+    def __init__(self):
+        self.types = array("B")
+        self.lines = array("I")
+        self.columns = array("I")
+        self.values = array("q")
+        self.strings = []
+        self.string_index = {}
+        self.big_numbers = []
+
+    @classmethod
+    def from_source(cls, source, errors=None, lexer=None):
+        buffer = cls()
+        for tok in tokenize(source, errors, lexer):
+            buffer.append(tok)
+        return buffer
+
+    def intern(self, text):
+        index = self.string_index.get(text)
+        if index is None:
+            index = self.string_index[text] = len(self.strings)
+            self.strings.append(text)
+        return index
+
+    def append(self, tok):
+        kind = tok.type
+        if kind == "TkNum":
+            value = tok.value
+            if value >= 1 << 63:
+                self.big_numbers.append(value)
+                value = -len(self.big_numbers)
+        elif kind == "TkId" or kind == "TkString":
+            value = self.intern(tok.value)
+        else:
+            value = 0
+        self.types.append(TYPE_IDS[kind])
+        self.lines.append(tok.lineno)
+        self.columns.append(tok.column)
+        self.values.append(value)
+
+    def __len__(self):
+        return len(self.types)
+
+    def type(self, i):
+        return tokens[self.types[i]]
+
+    def value(self, i):
+        kind = tokens[self.types[i]]
+        value = self.values[i]
+        if kind == "TkNum":
+            return value if value >= 0 else self.big_numbers[-value - 1]
+        if kind == "TkId" or kind == "TkString":
+            return self.strings[value]
+        return LEXEMES[kind]
+
+    def token(self, i):
+        """Reconstruye el token i como un LexToken (para el parser)."""
+        tok = Lex.LexToken()
+        tok.type = tokens[self.types[i]]
+        tok.value = self.value(i)
+        tok.lineno = self.lines[i]
+        tok.column = self.columns[i]
+        tok.lexpos = -1
+        return tok
+
+    def __iter__(self):
+        for i in range(len(self.types)):
+            yield self.token(i)
+
+    def format_lines(self, token_format, path=None):
+        """Genera cada token formateado con token_format. Se reutiliza un
+            solo LexToken, pues la línea no lo conserva.
+        """
+        tok = Lex.LexToken()
+        tok.lexpos = -1
+        for i in range(len(self.types)):
+            tok.type = tokens[self.types[i]]
+            tok.value = self.value(i)
+            tok.lineno = self.lines[i]
+            tok.column = self.columns[i]
+            yield token_format(tok, path)
+
+
+def imperat_files(paths):
+    """Devuelve los archivos a analizar: los archivos dados y, por cada
+        directorio, sus archivos .imperat (recursivamente, en orden).
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            found = []
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                found.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.endswith('.imperat'))
+            files.extend(found)
         else:
-            tokens_found.append(f"{tok.type} {tok.lineno} {column}")
+            files.append(path)
+    return files
 
-    # Si hay errores, solo mostrar los errores
-    if errors:
-        for error in errors:
-            print(error)
-    else:
+
+def main():
+    """El algoritmo recibe como algoritmo de línea de comando el archivo.
+        Hace un análisis de caracteres del archivo, reconoce los tokens
+        del lenguaje e indica medinate errores por terminal cuando un
+        caracter que no pertenece a la gramática es introducido.
+
+        También acepta varios archivos o directorios, que se analizan en un
+        solo proceso con un mismo lexer, y --format para elegir la salida.
+        Con --mmap cada archivo se analiza con lex_file, en memoria acotada.
+    """
+    # --stats o --stats=json puede ir en cualquier posición, como en parse.py
+    argv, stats_format = stats_flag(sys.argv[1:])
+    if stats_format not in (None, "text", "json"):
+        print("Error: El formato de --stats debe ser text o json")
+        sys.exit(1)
+
+    argparser = argparse.ArgumentParser(add_help=True)
+    argparser.add_argument("paths", nargs="*")
+    argparser.add_argument("--format", choices=sorted(FORMATS), default="text")
+    # lectura con mmap y salida por archivos temporales, para entradas grandes
+    argparser.add_argument("--mmap", action="store_true")
+    # analizador léxico: el de PLY o el autómata de scanner.py
+    argparser.add_argument("--scanner", choices=SCANNERS, default="ply")
+    args = argparser.parse_args(argv)
+
+    # Verificar que se proporcionó un archivo como argumento
+    if not args.paths:
+        print("Error: Por favor proporcione un archivo .imperat como argumento")
+        print("Uso: python lexer.py archivo.imperat")
+        sys.exit(1)
+
+    # Verificar que los archivos tengan la extensión correcta
+    for path in args.paths:
+        if not os.path.isdir(path) and not path.endswith('.imperat'):
+            print("Error: El archivo debe tener extensión .imperat")
+            sys.exit(1)
+
+    files = imperat_files(args.paths)
+    # con varios archivos y salida de texto se separa cada uno con su nombre
+    headers = args.format == "text" and (len(args.paths) > 1 or os.path.isdir(args.paths[0]))
+    lexer = new_lexer(scanner=args.scanner)
+    status = 0
+    # mediciones por fase en stderr (ver stats.py)
+    stats = None
+    if stats_format:
+        stats = STATS
+        stats.start()
+
+    for path in files:
+        header = f"==> {path} <==" if headers else None
+        if args.mmap:
+            try:
+                with stats.phase("lex_file") if stats else no_phase(None):
+                    lex_file(path, sys.stdout, args.format, lexer, header)
+            except FileNotFoundError:
+                print(f"Error: No se encontró el archivo {path}")
+                status = 1
+            except Exception as e:
+                print(f"Error al leer el archivo: {str(e)}")
+                status = 1
+            continue
+
+        # Intentar abrir y leer el archivo
+        try:
+            with open(path, 'r') as file:
+                input_data = file.read()
+        except FileNotFoundError:
+            print(f"Error: No se encontró el archivo {path}")
+            status = 1
+            continue
+        except Exception as e:
+            print(f"Error al leer el archivo: {str(e)}")
+            status = 1
+            continue
+
+        output = lex_text(input_data, args.format, path, lexer, stats)
+        if header:
+            output = f"{header}\n{output}"
+        # una sola escritura por archivo
+        if output:
+            sys.stdout.write(output + "\n")
+
+    if stats:
+        sys.stdout.flush()
+        stats.report(stats_format)
+    if status:
+        sys.exit(status)
+
+
+def lex_text(source, format="text", path=None, lexer=None, stats=None):
+    """Devuelve la salida del lexer para source, una línea por elemento:
+        los errores léxicos si los hay, o si no los tokens.
+
+        Con stats (un stats.Stats) se miden la tokenización y el formato, y
+        se cuentan los tokens de cada tipo.
+    """
+    token_format, error_format = FORMATS[format]
+    errors = []  # Lista para almacenar errores
+    phase = stats.phase if stats is not None else no_phase
+
+    # Los tokens se guardan en columnas hasta saber si hubo errores. Al
+    # aparecer el primer error ya no se mostrará ningún token, así que se
+    # deja de acumularlos
+    buffer = TokenBuffer()
+
+    # procesamiento del dato
+    stream = tokenize(source, errors, lexer)
+    if stats is not None:
+        stream = stats.count_tokens(stream)
+    with phase("tokenizacion"):
+        for tok in stream:
+            if not errors:
+                buffer.append(tok)
+
+    with phase("formato"):
+        # Si hay errores, solo mostrar los errores
+        if errors:
+            return "\n".join(error_format(error, path) for error in errors)
         # Si no hay errores, mostrar los tokens
-        for token in tokens_found:
-            print(token)
+        return "\n".join(buffer.format_lines(token_format, path))
 
 
+def lex_file(path, out, format="text", lexer=None, header=None,
+             chunk_size=1 << 20):
+    """Analiza el archivo path sin cargarlo completo y escribe la salida en out
+        (la misma que lex_text). Devuelve la cantidad de errores léxicos.
+
+        El archivo se recorre con mmap en bloques de unas chunk_size bytes
+        que terminan en un salto de línea; ningún token ocupa más de una
+        línea, así que cada bloque se analiza por separado continuando la
+        cuenta de filas. Mientras no se sepa si hubo errores, los tokens
+        formateados se vuelcan a un archivo temporal; los errores también,
+        a otro. Al final se copia a out el que corresponda, por lo que la
+        memoria usada no depende del tamaño de la entrada.
+    """
+    token_format, error_format = FORMATS[format]
+    if lexer is None:
+        lexer = new_lexer()
+    errors = []
+    error_count = 0
+    lineno = 1
+
+    with open(path, "rb") as file, \
+            tempfile.TemporaryFile("w+") as token_spill, \
+            tempfile.TemporaryFile("w+") as error_spill:
+        size = os.fstat(file.fileno()).st_size
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        try:
+            start = released = 0
+            while start < size:
+                end = data.find(b"\n", start + chunk_size - 1)
+                end = size if end < 0 else end + 1
+                chunk = data[start:end].decode()
+                if "\r" in chunk:
+                    # mismos saltos de línea que open() en modo texto
+                    chunk = chunk.replace("\r\n", "\n").replace("\r", "\n")
+                # las páginas ya leídas se liberan para que no se acumulen
+                # en la memoria residente del proceso
+                done = end - end % mmap.PAGESIZE
+                if done > released and hasattr(data, "madvise"):
+                    data.madvise(mmap.MADV_DONTNEED, released, done - released)
+                    released = done
+                start = end
+
+                lines = []
+                for tok in tokenize(chunk, errors, lexer, lineno):
+                    # tras el primer error ya no se mostrará ningún token
+                    if not error_count and not errors:
+                        lines.append(token_format(tok, path))
+                lineno = lexer.lineno
+
+                if errors:
+                    error_count += len(errors)
+                    error_spill.writelines(error_format(error, path) + "\n"
+                                           for error in errors)
+                    errors.clear()
+                elif lines:
+                    token_spill.writelines(line + "\n" for line in lines)
+        finally:
+            if size:
+                data.close()
+
+        spill = error_spill if error_count else token_spill
+        if header:
+            out.write(header + "\n")
+        if spill.tell():
+            spill.seek(0)
+            shutil.copyfileobj(spill, out)
+        elif header:
+            out.write("\n")
+    return error_count
+
 
 if __name__ == "__main__":
     main()
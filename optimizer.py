@@ -0,0 +1,228 @@
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Description: Pase de optimización sobre el AST, entre el análisis
+#   sintáctico y cualquier etapa posterior (vm.py).
+#
+#   - Pliega las subexpresiones formadas solo por literales enteros y
+#     booleanos: 1 + 2 * 3 -> 7, !true -> false.
+#   - Elimina las guardias [] cuya condición se pliega a false, y las que
+#     siguen a una guardia que se pliega a true (nunca se eligen).
+#   - Elimina los while cuya condición se pliega a false.
+#
+#   Uso: python optimizer.py archivo.imperat
+
+import sys
+from ast_nodes import Skip, Literal
+
+
+# operaciones plegables según el tipo de sus operandos
+INT_OPS = {
+    "Plus": lambda a, b: a + b,
+    "Minus": lambda a, b: a - b,
+    "Mult": lambda a, b: a * b,
+    "Less": lambda a, b: a < b,
+    "Leq": lambda a, b: a <= b,
+    "Greater": lambda a, b: a > b,
+    "Geq": lambda a, b: a >= b,
+    "Equal": lambda a, b: a == b,
+    "NEqual": lambda a, b: a != b,
+}
+
+BOOL_OPS = {
+    "And": lambda a, b: a and b,
+    "Or": lambda a, b: a or b,
+    "Equal": lambda a, b: a == b,
+    "NEqual": lambda a, b: a != b,
+}
+
+
+def literal_type(node):
+    """Devuelve int o bool si node es un literal de ese tipo, si no None."""
+    if type(node) is Literal:
+        return type(node.value)
+    return None
+
+
+def contar_nodos(node):
+    """Cantidad de nodos del subárbol node."""
+    total = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        total += 1
+        stack.extend(current.children())
+    return total
+
+
+class Optimizer():
+    """Aplica el pase de optimización y cuenta los nodos eliminados."""
+
+    def __init__(self):
+        self.removed = 0
+
+    def optimize(self, tree):
+        before = contar_nodos(tree)
+        tree = self.statement(tree)
+        self.removed = before - contar_nodos(tree)
+        return tree
+
+    # instrucciones: cada método devuelve la instrucción optimizada, o None
+    # si la instrucción no hace nada y se puede quitar
+
+    def statement(self, node):
+        method = getattr(self, "statement_" + type(node).__name__, None)
+        return method(node) if method is not None else node
+
+    def body(self, node, owner):
+        """Optimiza el cuerpo de un bloque, guardia o ciclo. Un cuerpo vacío
+            se reemplaza por skip."""
+        node = self.statement(node)
+        if node is None:
+            return Skip(owner.lineno, owner.column)
+        return node
+
+    def statement_Block(self, node):
+        if node.body is not None:
+            node.body = self.statement(node.body)
+        return node
+
+    def statement_Secuencing(self, node):
+        instructions = []
+        for instruction in node.instructions:
+            instruction = self.statement(instruction)
+            if instruction is not None:
+                instructions.append(instruction)
+        if not instructions:
+            return None
+        if len(instructions) == 1:
+            return instructions[0]
+        node.instructions = instructions
+        return node
+
+    def statement_Asig(self, node):
+        node.value = self.expression(node.value)
+        return node
+
+    def statement_Print(self, node):
+        node.value = self.expression(node.value)
+        return node
+
+    def statement_If(self, node):
+        guards = []
+        for guard in node.guards:
+            guard.condition = self.expression(guard.condition)
+            condition = guard.condition
+            if literal_type(condition) is bool and not condition.value:
+                continue
+            guard.body = self.body(guard.body, guard)
+            guards.append(guard)
+            if literal_type(condition) is bool and condition.value:
+                break  # las guardias siguientes nunca se eligen
+        # un if sin guardias se conserva: al ejecutarse aborta
+        node.guards = guards
+        return node
+
+    def statement_While(self, node):
+        node.condition = self.expression(node.condition)
+        if literal_type(node.condition) is bool and not node.condition.value:
+            return None
+        node.body = self.body(node.body, node)
+        return node
+
+    def statement_Skip(self, node):
+        return None
+
+    # expresiones
+
+    def expression(self, node):
+        method = getattr(self, "expression_" + type(node).__name__, None)
+        return method(node) if method is not None else node
+
+    def expression_BinOp(self, node):
+        node.left = self.expression(node.left)
+        left_type = literal_type(node.left)
+
+        # cortocircuito: false and X -> false, true or X -> true
+        if left_type is bool and (node.op == "And") != node.left.value:
+            return Literal(node.left.value, node.lineno, node.column)
+
+        node.right = self.expression(node.right)
+        right_type = literal_type(node.right)
+        if left_type is None or left_type is not right_type:
+            return node
+
+        ops = INT_OPS if left_type is int else BOOL_OPS
+        if node.op not in ops:
+            return node
+        value = ops[node.op](node.left.value, node.right.value)
+        return Literal(value, node.lineno, node.column)
+
+    def expression_UnaryOp(self, node):
+        node.operand = self.expression(node.operand)
+        operand_type = literal_type(node.operand)
+        if node.op == "Not" and operand_type is bool:
+            return Literal(not node.operand.value, node.lineno, node.column)
+        if node.op == "Minus" and operand_type is int:
+            return Literal(-node.operand.value, node.lineno, node.column)
+        return node
+
+    def expression_App(self, node):
+        node.function = self.expression(node.function)
+        node.index = self.expression(node.index)
+        return node
+
+    def expression_WriteFunction(self, node):
+        for update in node.updates:
+            update.index = self.expression(update.index)
+            update.value = self.expression(update.value)
+        return node
+
+
+def optimizar(tree):
+    """Optimiza el AST (modificándolo) y devuelve (árbol, nodos eliminados)."""
+    optimizer = Optimizer()
+    tree = optimizer.optimize(tree)
+    return tree, optimizer.removed
+
+
+def main():
+    # Verificar que se proporcionó un archivo como argumento
+    if len(sys.argv) != 2:
+        print("Error: Por favor proporcione un archivo .imperat como argumento")
+        print("Uso: python optimizer.py archivo.imperat")
+        sys.exit(1)
+
+    # Verificar que el archivo tenga la extensión correcta
+    if not sys.argv[1].endswith('.imperat'):
+        print("Error: El archivo debe tener extensión .imperat")
+        sys.exit(1)
+
+    # Intentar abrir y leer el archivo
+    try:
+        with open(sys.argv[1], 'r') as file:
+            input_data = file.read()
+    except FileNotFoundError:
+        print(f"Error: No se encontró el archivo {sys.argv[1]}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error al leer el archivo: {str(e)}")
+        sys.exit(1)
+
+    from parse import parse_source, imprimir_ast
+
+    errors = []
+    tree = parse_source(input_data, errors)
+    if errors:
+        for error in errors:
+            print(error)
+        sys.exit(1)
+    if tree is None:
+        sys.exit(1)
+
+    before = contar_nodos(tree)
+    tree, removed = optimizar(tree)
+    imprimir_ast(tree)
+    print(f"Nodos eliminados: {removed} de {before}")
+
+
+if __name__ == "__main__":
+    main()
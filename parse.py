@@ -1,478 +1,633 @@
-# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
-# Date: 
-# Description: Proyecto Etapa2 CI-3725 Traductores e Interpretadores 
-
-import ply.yacc as Yacc
-import ply.lex as Lex
-import sys
-
-
-def main():
-    # Verificar que se proporcionó un archivo como argumento
-    if len(sys.argv) != 2:
-        print("Error: Por favor proporcione un archivo .imperat como argumento")
-        print("Uso: python lexer.py archivo.imperat")
-        sys.exit(1)
-
-    # Verificar que el archivo tenga la extensión correcta
-    if not sys.argv[1].endswith('.imperat'):
-        print("Error: El archivo debe tener extensión .imperat")
-        sys.exit(1)
-
-    # Intentar abrir y leer el archivo
-    try:
-        with open(sys.argv[1], 'r') as file:
-            input_data = file.read()
-    except FileNotFoundError:
-        print(f"Error: No se encontró el archivo {sys.argv[1]}")
-        sys.exit(1)
-    except Exception as e:
-        print(f"Error al leer el archivo: {str(e)}")
-        sys.exit(1)
-
-    # palabras reservadas del lenguaje
-    reserved = {
-        "if" : "TkIf",
-        "fi" : "TkFi",
-        "end" : "TkEnd",
-        "while" : "TkWhile",
-        "or" : "TkOr",
-        "bool" : "TkBool",
-        "true" : "TkTrue",
-        "false" : "TkFalse",
-        "skip" : "TkSkip",
-        "int" : "TkInt",
-        "function" : "TkFunction",
-        "print" : "TkPrint",
-        "and" : "TkAnd"
-    }
-
-    tokens = [
-        "TkOBlock" ,
-        "TkCBlock" ,
-        "TkSoForth" ,
-        "TkComma" ,
-        "TkOpenPar" ,
-        "TkClosePar" ,
-        "TkAsig" ,
-        "TkSemicolon" ,
-        "TkArrow" ,
-        "TkGuard" ,
-        "TkPlus" ,
-        "TkMinus" ,
-        "TkMult" ,
-        "TkNot" ,
-        "TkLess" ,
-        "TkLeq" ,
-        "TkGeq" ,
-        "TkGreater" ,
-        "TkEqual" ,
-        "TkNEqual" ,
-        "TkOBracket" ,
-        "TkCBracket" ,
-        "TkTowPoints" ,
-        "TkApp",
-        "TkNum",
-        "TkString",
-        "TkId"
-
-    ] + list(reserved.values())
-
-
-
-    # tokens sencillos
-
-    t_TkOBlock = r"\{"
-    t_TkCBlock = r"\}"
-    t_TkSoForth = r"\. \."   
-    t_TkComma = r"\,"       
-    t_TkOpenPar = r"\("
-    t_TkClosePar = r"\)"
-    t_TkAsig = r"\:\="
-    t_TkSemicolon = r"\;"
-    t_TkArrow = r"\-\-\>"
-    t_TkGuard = r"\[\]"
-    t_TkPlus = r"\+"
-    t_TkMinus = r"\-"
-    t_TkMult = r"\*"
-    t_TkNot = r"\!"
-    t_TkLess = r"\<"
-    t_TkLeq = r"\<\="
-    t_TkGeq = r"\>\="
-    t_TkGreater = r"\>"
-    t_TkEqual = r"\=\="
-    t_TkNEqual = r"\<\>"
-    t_TkOBracket = r"\["
-    t_TkCBracket = r"\]"
-    t_TkTowPoints = r"\:"
-    t_TkApp = r"\."
-
-    # tokens especiales
-
-    def t_COMMENT(t):
-        r'//.*'
-        pass  # No retorna nada - ignora los comentarios
-        
-    def t_TkId(t):
-        r"[a-zA-Z_][a-zA-Z_0-9]*"
-        t.type = reserved.get(t.value, "TkId")
-        return t
-
-    def t_TkString(t):
-        r'"[^"\\\n]*(?:\\[n"\\][^"\\\n]*)*"'
-        t.value = t.value[1:-1]  # Remover las comillas
-        return t
-
-    def t_TkNum(t):
-        r"\d+"
-        t.value = int(t.value)
-        return t
-
-    # manejo de errores 
-    errors = []  # Lista para almacenar errores
-
-    def t_error(t):
-        column = t.lexpos - t.lexer.lexdata.rfind('\n', 0, t.lexpos)
-        if column <= 0:
-            column = t.lexpos + 1
-        errors.append(f"Error: Unexpected character \"{t.value[0]}\" in row {t.lineno}, column {column}")
-        t.lexer.skip(1)
-
-    # Actualizar la posición de la columna
-    def find_column(input, token):
-        last_cr = input.rfind('\n', 0, token.lexpos)
-        if last_cr < 0:
-            last_cr = -1
-        column = (token.lexpos - last_cr)
-        return column
-
-    # tokens ignorados
-
-    t_ignore = " \t"
-
-    # conteo de lineas 
-    
-    def t_newline( t ):
-        r"\n+"
-        t.lexer.lineno += len(t.value)
-
-
-    # llamada al contructor lexico
-
-    lexer = Lex.lex()
-
-    # entrada de la data para los tokens
-
-    lexer.input(input_data)
-
-    #------------------------------------------------
-    # Etapa2
-    #------------------------------------------------
-
-
-
-    class Block():
-        def __init__(self,type = None, lefson = None, rightson = None, op = None):
-            self.type = type
-            self.lefson = lefson
-            self.rightson = rightson
-            self.op = op
-
-    class Declare(Block): pass
-    class Secuencing(Block):pass
-    class Asig(Block): pass
-    class If(Block): pass
-    class Gruar(Block): pass
-    class While(Block): pass
-    class Literal(Block): pass
-    class Expr(Block): pass
-
-
-    class Binary_expressions(Expr):pass
-
-    # Se define la presedencia de los operadores
-    # Desde menor presedencia a mayor y agrupación a izquierda
-
-    precedence = (
-        ("left", "TkAnd", "TkOr"),
-        ("left", "TkNEqual", "TkEqual", "TkLeq", "TkLess", "TkGreater", "TkGeq"),
-        ("left", "TkPlus", "TkMinus"),
-        ("left", "TkMult"),
-        ("right", "UMinus", "TkNot")  # menos unario
-    )
-
-    # Se define símbolo inicial
-    start = "Block"
-    # Se definen las reglas de la gramatica
-    
-    def p_empty(p):
-        "empty :"
-        pass
-
-
-    def p_Block(p):
-        """
-        Block : TkOBlock Secuencing TkCBlock
-        """
-        p[0] = ["Block", p[2]]
-    # permite recurción
-    def p_Block_DeclareSection(p):
-        """
-        Block : TkOBlock DeclareSection Secuencing TkCBlock
-        """
-        p[0] = ["Block", p[2], p[3]]
-
-    def p_Block_DeclareSection_only(p):
-        """
-        Block : TkOBlock DeclareSection TkCBlock
-        """
-        p[0] = ["Block", p[2]]
-
-    def p_secuencing(p):
-        """
-        Secuencing : Secuencing TkSemicolon Instruction
-        """
-        p[0] = ["Secuencing", p[1], p[3]]
-
-    def p_secuencing(p):
-        """
-        Secuencing : Instruction
-        """
-        p[0] = p[1]
-
-    def p_instruction(p):
-        """
-        Instruction : Asig
-                    | While
-                    | If
-                    | Print
-                    | Skip
-                    | Block
-        """
-        p[0] = p[1]
-
-    def p_declare_section(p):
-        """
-        DeclareSection : SecuencingDeclare
-        """
-        p[0] = ["Declare", p[1]]
-
-    def p_secuencing_declare_recursivo(p):
-        """
-        SecuencingDeclare : Declare TkSemicolon SecuencingDeclare
-        """
-        p[0] = ["Secuencing", p[1], p[3]]
-
-    def p_secuencing_declare(p):
-        """
-        SecuencingDeclare : Declare TkSemicolon
-        """
-        p[0] = p[1]
-
-    def p_declare_int_bool(p):
-        """
-        Declare : TkBool Ident
-                | TkInt Ident
-        """
-        p[0] = [p[2], p[1]]
-
-
-    def p_declare_function(p):
-        """
-        Declare : TkFunction TkOBracket TkSoForth Literal TkCBracket Ident
-        """
-        p[0] = ["WriteFunction", p[6], p[1], p[2], p[3], p[4], p[5]]
-    # permite recursión
-    def p_declare_int_bool_with_comma(p):
-        """
-        Declare : TkBool Ident Comma
-                | TkInt Ident Comma
-        """
-        p[0] = [p[1], p[2]] + p[3]
-    # permite recursión
-    def p_declare_function_with_comma(p):
-        """
-        Declare : TkFunction TkOBracket TkSoForth Literal TkCBracket Ident Comma
-        """
-        p[0] = ["WriteFunction", p[6]] + p[7] + [p[1], p[2], p[3], p[4], p[5]] 
-    def p_comma(p):
-        """
-        Comma : TkComma Ident
-        """
-        p[0] = [p[1], p[2]]
-    # permite recursión
-    def p_comma_with_comma(p):
-        """
-        Comma : TkComma Ident Comma
-        """
-        p[0] = [p[1], p[2], p[3]]
-    def p_asig(p):
-        """
-        Asig : Ident TkAsig expression
-             | Ident TkAsig WriteFunction
-        """
-        p[0] = [p[1], p[2], p[3]]
-    def p_writefunction(p):
-        """
-        WriteFunction : Ident acceso
-        """
-        p[0] = [p[1], p[2]]
-    def p_acceso_funcion(p):
-        """
-        acceso : TkOpenPar expression TwoPoints expression TkClosePar
-        """
-        p[0] = [p[1], p[2], p[3], p[4], p[5]]
-
-    def p_acceso_funcion_recursivo(p):
-        """
-        acceso : TkOpenPar expression TwoPoints expression TkClosePar acceso
-        """
-        p[0] = [p[1], p[2], p[3], p[4], p[5], p[6]]
-
-    def p_if(p):
-        """
-        If : TkIf expression Then Instruction Guard TkFi
-        """
-        p[0] = [p[1], p[2], p[3], p[4], p[5], p[6]]
-    def p_while(p):
-        """
-        While : TkWhile expression Then Instruction TkEnd
-        """
-        p[0] = [p[1], p[2], p[3], p[4], p[5]]
-    def p_guard(p):
-        """
-        Guard : TkGuard expression Then Instruction
-        """
-        p[0] = [p[1], p[2], p[3], p[4]]
-    def p_guard_empty(p):
-        """
-        Guard : empty
-        """
-        p[0] = p[1]
-
-    def p_skip(p):
-        """
-        Skip : TkSkip
-        """
-        p[0] = p[1]
-
-    def p_print(p):
-        """
-        Print : TkPrint expression
-        """
-        p[0] = [p[0], p[2]]
-
-    # estudiar la forma como se expresa esta gramática
-    def p_binary_expressions(p):
-        """
-        expression : expression Plus termino
-                   | expression Minus termino
-                   | expression Equal termino 
-                   | expression NEqual termino
-                   | expression Leq termino
-                   | expression Less termino
-                   | expression Geq termino
-                   | expression Greater termino
-                   | expression And termino
-                   | expression Or termino
-                   | expression TkApp termino
-        termino : termino Mult factor
-        """
-        p[0] = [p[2], p[1], p[3]]
-        
-    def p_unary_expression(p):
-        """
-        factor : Not factor
-                | Minus factor %prec UMinus
-        """
-        p[0] = [p[1], p[2]]
-    def p_factor(p):
-        """
-        factor : TkOpenPar expression TkClosePar
-        """
-        p[0] = [p[1], p[2], p[3]]
-
-
-
-    def p_subtitutions(p):
-        """
-        expression : termino
-        termino : factor
-        factor : Literal
-               | Ident
-               | String
-        And : TkAnd
-        Or : TkOr
-        Mult : TkMult
-        NEqual : TkNEqual
-        Equal : TkEqual
-        Leq : TkLeq
-        Less : TkLess
-        Geq : TkGeq
-        Greater : TkGreater
-        Plus : TkPlus
-        Minus : TkMinus
-        Literal : TkNum
-                | TkTrue
-                | TkFalse
-        Ident : TkId
-        String : TkString
-        TwoPoints : TkTowPoints
-        Then : TkArrow
-        Not : TkNot
-        """
-        p[0] = p[1]
-
-    # manejo de errores sintaticos
-
-    def p_error(p):
-        print("Sintax error")
-
-
-    # constructor del parser
-    parser = Yacc.yacc()
-
-    prueba = """
-                {
-                    int b;
-                }
-                """
-    result = parser.parse(prueba)
-    
-    n = 0
-    
-    print(result)
-    print("-"*n+f"{result[0]}")
-    n += 1
-    print("-"*n+f"{result[1][0]}")
-    n += 1
-    
-
-
-    #print(current.rightson)
-    #imprimir_ast(result, 0)
-    
-
-
-    
-def imprimir_ast(arbol, n):
-
-    current = arbol
-    space = n
-    operation = None
-
-    if current != None:
-        print("-"*space+f"{current.type}")
-        rightson = current.rightson
-        leftson = current.leftson
-    
-        imprimir_ast(rightson, n+1)
-        imprimir_ast(leftson, n+1)
-
-
-
-
-
-
-if __name__ == "__main__":
-    main()
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Date: 
+# Description: Proyecto Etapa2 CI-3725 Traductores e Interpretadores 
+
+import sys
+
+# python parse.py archivo.imperat con el árbol en la caché (treecache.py) lo
+# imprime y termina aquí, sin importar PLY ni construir el lexer y el parser.
+# missed es el texto que se buscó sin encontrarlo; main no lo busca de nuevo.
+missed = None
+if __name__ == "__main__":
+    from treecache import main_cached
+    missed = main_cached(sys.argv[1:])
+
+import ply.yacc as Yacc
+import os
+import hashlib
+from ply.lex import LexToken
+from lexer import tokens, tokenize, CACHE_DIR, TokenBuffer
+from stats import STATS, stats_flag
+from treecache import TreeCache
+from descent import DescentParser, Unexpected, replay
+from ast_nodes import (Block, DeclareSection, Declare, Asig,
+                       WriteFunction, TwoPoints, If, Guard, While, Print, Skip,
+                       BinOp, UnaryOp, App, Literal, String, Ident,
+                       sequence, imprimir_ast)
+
+
+#------------------------------------------------
+# Etapa2
+#------------------------------------------------
+
+# Se define la presedencia de los operadores
+# Desde menor presedencia a mayor y agrupación a izquierda.
+# La gramática de expresiones está estratificada según esta tabla
+# (expression, relacion, suma, termino, factor), así que solo se usa
+# para el menos unario y el acceso a funciones. El parser de descent.py
+# obtiene de aquí el nivel de cada operador.
+
+precedence = (
+    ("left", "TkAnd", "TkOr"),
+    ("left", "TkNEqual", "TkEqual", "TkLeq", "TkLess", "TkGreater", "TkGeq"),
+    ("left", "TkPlus", "TkMinus"),
+    ("left", "TkMult"),
+    ("right", "UMinus", "TkNot"),  # menos unario
+    ("left", "TkApp")  # acceso a función F.i
+)
+
+# Se define símbolo inicial
+start = "Block"
+
+
+def position(p, i):
+    """Devuelve (fila, columna) donde comienza el símbolo i de la regla p."""
+    symbol = p.slice[i]
+    if isinstance(symbol, LexToken):
+        return symbol.lineno, symbol.column
+    return p[i].lineno, p[i].column
+
+# Se definen las reglas de la gramatica
+
+def p_Block(p):
+    """
+    Block : TkOBlock Secuencing TkCBlock
+    """
+    p[0] = Block(None, sequence(p[2]), *position(p, 1))
+# permite recurción
+def p_Block_DeclareSection(p):
+    """
+    Block : TkOBlock DeclareSection Secuencing TkCBlock
+    """
+    p[0] = Block(p[2], sequence(p[3]), *position(p, 1))
+
+def p_Block_DeclareSection_only(p):
+    """
+    Block : TkOBlock DeclareSection TkCBlock
+    """
+    p[0] = Block(p[2], None, *position(p, 1))
+
+# Las secuencias se acumulan en una sola lista plana, sin un nivel de
+# anidamiento por instrucción
+def p_secuencing(p):
+    """
+    Secuencing : Secuencing TkSemicolon Instruction
+    """
+    p[1].append(p[3])
+    p[0] = p[1]
+
+def p_secuencing_simple(p):
+    """
+    Secuencing : Instruction
+    """
+    p[0] = [p[1]]
+
+# permite un punto y coma al final de la secuencia
+def p_secuencing_semicolon(p):
+    """
+    Secuencing : Secuencing TkSemicolon
+    """
+    p[0] = p[1]
+
+def p_instruction(p):
+    """
+    Instruction : Asig
+                | While
+                | If
+                | Print
+                | Skip
+                | Block
+    """
+    p[0] = p[1]
+
+def p_declare_section(p):
+    """
+    DeclareSection : SecuencingDeclare
+    """
+    first = p[1][0]
+    p[0] = DeclareSection(p[1], first.lineno, first.column)
+
+def p_secuencing_declare_recursivo(p):
+    """
+    SecuencingDeclare : SecuencingDeclare Declare TkSemicolon
+    """
+    p[1].append(p[2])
+    p[0] = p[1]
+
+def p_secuencing_declare(p):
+    """
+    SecuencingDeclare : Declare TkSemicolon
+    """
+    p[0] = [p[1]]
+
+def p_declare_int_bool(p):
+    """
+    Declare : TkBool IdentList
+            | TkInt IdentList
+    """
+    p[0] = Declare(p[1], p[2], None, *position(p, 1))
+
+def p_declare_function(p):
+    """
+    Declare : TkFunction TkOBracket TkSoForth Literal TkCBracket IdentList
+    """
+    p[0] = Declare(p[1], p[6], p[4], *position(p, 1))
+
+def p_ident_list(p):
+    """
+    IdentList : Ident
+    """
+    p[0] = [p[1]]
+# permite recursión
+def p_ident_list_with_comma(p):
+    """
+    IdentList : IdentList TkComma Ident
+    """
+    p[1].append(p[3])
+    p[0] = p[1]
+
+def p_asig(p):
+    """
+    Asig : Ident TkAsig expression
+         | Ident TkAsig WriteFunction
+    """
+    p[0] = Asig(p[1], p[3], *position(p, 1))
+
+def p_writefunction(p):
+    """
+    WriteFunction : Ident acceso
+    """
+    p[0] = WriteFunction(p[1], p[2], *position(p, 1))
+
+def p_acceso_funcion(p):
+    """
+    acceso : TkOpenPar expression TwoPoints expression TkClosePar
+    """
+    p[0] = [TwoPoints(p[2], p[4], *position(p, 3))]
+# permite recursión
+def p_acceso_funcion_recursivo(p):
+    """
+    acceso : acceso TkOpenPar expression TwoPoints expression TkClosePar
+    """
+    p[1].append(TwoPoints(p[3], p[5], *position(p, 4)))
+    p[0] = p[1]
+
+def p_if(p):
+    """
+    If : TkIf GuardList TkFi
+    """
+    p[0] = If(p[2], *position(p, 1))
+
+def p_guard_list(p):
+    """
+    GuardList : Guard
+    """
+    p[0] = [p[1]]
+# permite recursión
+def p_guard_list_recursivo(p):
+    """
+    GuardList : GuardList TkGuard Guard
+    """
+    p[1].append(p[3])
+    p[0] = p[1]
+
+def p_guard(p):
+    """
+    Guard : expression Then Secuencing
+    """
+    p[0] = Guard(p[1], sequence(p[3]), *position(p, 1))
+
+def p_while(p):
+    """
+    While : TkWhile expression Then Secuencing TkEnd
+    """
+    p[0] = While(p[2], sequence(p[4]), *position(p, 1))
+
+def p_skip(p):
+    """
+    Skip : TkSkip
+    """
+    p[0] = Skip(*position(p, 1))
+
+def p_print(p):
+    """
+    Print : TkPrint expression
+    """
+    p[0] = Print(p[2], *position(p, 1))
+
+# El nombre del operador es el del no terminal que lo envuelve (Plus, Less, ...)
+def p_binary_expressions(p):
+    """
+    expression : expression And relacion
+               | expression Or relacion
+    relacion : relacion Equal suma
+             | relacion NEqual suma
+             | relacion Leq suma
+             | relacion Less suma
+             | relacion Geq suma
+             | relacion Greater suma
+    suma : suma Plus termino
+         | suma Minus termino
+    termino : termino Mult factor
+    """
+    p[0] = BinOp(p.slice[2].type, p[1], p[3], *position(p, 2))
+
+def p_unary_expression(p):
+    """
+    factor : Not factor %prec TkNot
+           | Minus factor %prec UMinus
+    """
+    p[0] = UnaryOp(p.slice[1].type, p[2], *position(p, 1))
+
+def p_app(p):
+    """
+    factor : factor TkApp factor
+    """
+    p[0] = App(p[1], p[3], *position(p, 2))
+
+def p_factor(p):
+    """
+    factor : TkOpenPar expression TkClosePar
+    """
+    p[0] = p[2]
+
+def p_ident(p):
+    """
+    Ident : TkId
+    """
+    p[0] = Ident(p[1], *position(p, 1))
+
+def p_literal(p):
+    """
+    Literal : TkNum
+            | TkTrue
+            | TkFalse
+    """
+    value = p[1]
+    if p.slice[1].type != "TkNum":
+        value = p.slice[1].type == "TkTrue"
+    p[0] = Literal(value, *position(p, 1))
+
+def p_string(p):
+    """
+    String : TkString
+    """
+    p[0] = String(p[1], *position(p, 1))
+
+# Los operadores conservan su token para poder ubicarlos en el código
+def p_operators(p):
+    """
+    And : TkAnd
+    Or : TkOr
+    Mult : TkMult
+    NEqual : TkNEqual
+    Equal : TkEqual
+    Leq : TkLeq
+    Less : TkLess
+    Geq : TkGeq
+    Greater : TkGreater
+    Plus : TkPlus
+    Minus : TkMinus
+    TwoPoints : TkTowPoints
+    Then : TkArrow
+    Not : TkNot
+    """
+    p[0] = p.slice[1]
+
+def p_subtitutions(p):
+    """
+    expression : relacion
+    relacion : suma
+    suma : termino
+    termino : factor
+    factor : Literal
+           | Ident
+           | String
+    """
+    p[0] = p[1]
+
+# manejo de errores sintaticos
+#
+# Recuperación en modo pánico: ante un error, el parser descarta estados de
+# la pila hasta uno donde se espera una instrucción, la reemplaza por el
+# símbolo error y descarta tokens hasta encontrar uno que pueda seguir a una
+# instrucción (; fi end } []). PLY no vuelve a llamar a p_error hasta que se
+# hayan leído tres tokens sin error, así que cada error se reporta una vez.
+
+# máxima cantidad de errores sintácticos que se reportan por archivo
+MAX_SYNTAX_ERRORS = 20
+
+
+class TooManyErrors(Exception):
+    """Se alcanzó MAX_SYNTAX_ERRORS; el análisis se detiene."""
+
+
+def p_instruction_error(p):
+    """
+    Instruction : error
+    """
+    tok = p[1]
+    # En LALR el token que sigue a la instrucción errónea puede ser válido
+    # después de una instrucción pero no en este contexto (un fi dentro de
+    # un while, por ejemplo). Entonces se vuelve a este mismo punto sin
+    # consumir nada; la segunda vez el token se convierte en error para que
+    # se descarte y el análisis avance.
+    if tok is p.parser.recovered_token:
+        tok.type = "error"
+    p.parser.recovered_token = tok
+    p[0] = Skip(getattr(tok, "lineno", 0), getattr(tok, "column", 0))
+
+def token_name(tok):
+    """Nombre de un token en los mensajes de error: TkId("x"), TkNum(3), TkFi"""
+    if tok.type == "TkNum":
+        return f"{tok.type}({tok.value})"
+    if tok.type == "TkId" or tok.type == "TkString":
+        return f"{tok.type}(\"{tok.value}\")"
+    return tok.type
+
+def p_error(p):
+    if p is None:
+        message = "Sintax error: Unexpected end of input"
+    else:
+        message = (f"Sintax error: Unexpected token {token_name(p)} "
+                   f"in row {p.lineno}, column {p.column}")
+    parser.syntax_errors.append(message)
+    parser.error_count += 1
+    if parser.error_count >= MAX_SYNTAX_ERRORS:
+        parser.syntax_errors.append(
+            f"Sintax error: Too many errors ({MAX_SYNTAX_ERRORS}), parsing stopped")
+        raise TooManyErrors()
+
+
+def grammar_hash():
+    """Devuelve un hash de la gramática: docstrings de las reglas p_,
+        tabla de precedencia, símbolo inicial, tokens y versión de PLY.
+        Cualquier cambio en la gramática invalida las tablas guardadas.
+    """
+    h = hashlib.sha1()
+    h.update(Yacc.__version__.encode())
+    h.update(repr(tokens).encode())
+    h.update(repr(precedence).encode())
+    h.update(start.encode())
+    rules = globals()
+    for name in sorted(rules):
+        if name.startswith("p_") and name != "p_error":
+            h.update(name.encode())
+            h.update(rules[name].__doc__.encode())
+    return h.hexdigest()[:16]
+
+
+def build_parser(cache_dir=None):
+    """Construye el parser LALR.
+
+        Las tablas se guardan en cache_dir (CACHE_DIR por defecto) en un
+        archivo cuyo nombre incluye el hash de la gramática. Si el archivo
+        existe se carga sin volver a validar ni generar la gramática. Nunca
+        se escribe parser.out, y si el directorio no admite escritura las
+        tablas se generan en memoria sin guardarse.
+    """
+    if cache_dir is None:
+        cache_dir = CACHE_DIR
+    module = sys.modules[__name__]
+    tabfile = os.path.join(cache_dir, f"parsetab_{grammar_hash()}.pickle")
+
+    if os.path.exists(tabfile):
+        try:
+            return Yacc.yacc(module=module, debug=False, optimize=True,
+                             write_tables=False, picklefile=tabfile)
+        except Exception:
+            pass  # tabla dañada o incompatible, se regenera
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        writable = os.access(cache_dir, os.W_OK)
+    except OSError:
+        writable = False
+
+    if not writable:
+        return Yacc.yacc(module=module, debug=False, write_tables=False)
+
+    # Se escribe en un archivo temporal y luego se renombra, para que otro
+    # proceso nunca lea una tabla a medio escribir
+    tmpfile = f"{tabfile}.{os.getpid()}.tmp"
+    parser = Yacc.yacc(module=module, debug=False, write_tables=True,
+                       picklefile=tmpfile)
+    try:
+        os.replace(tmpfile, tabfile)
+    except OSError:
+        pass
+    return parser
+
+
+# constructor del parser, una sola vez por proceso
+with STATS.phase("construccion_parser"):
+    parser = build_parser()
+# Sin reducciones por defecto, el estado Instruction : error . consulta el
+# siguiente token, y los que no pueden seguir a una instrucción se descartan
+parser.disable_defaulted_states()
+
+# parsers disponibles: el LALR de PLY y el de descenso recursivo de descent.py
+PARSERS = ("yacc", "descent")
+
+# parser de parse_source y de parse.py cuando no se pide otro; python
+# run_tests.py --parser=descent lo cambia para ejecutar todas las suites
+# (optimizer.py, vm.py, ...) con descent.py
+DEFAULT_PARSER = "yacc"
+
+# el parser de descenso recursivo se construye la primera vez que se pide
+descent_parser = None
+
+
+def parser_flag(argv):
+    """Separa --parser=nombre de los argumentos. Devuelve (argumentos,
+        nombre), con nombre DEFAULT_PARSER si no se pidió otro."""
+    rest = []
+    backend = DEFAULT_PARSER
+    for arg in argv:
+        if arg.startswith("--parser="):
+            backend = arg.split("=", 1)[1]
+        else:
+            rest.append(arg)
+    return rest, backend
+
+
+def main():
+    # --stats o --stats=json puede ir en cualquier posición
+    argv, stats_format = stats_flag(sys.argv[1:])
+    if stats_format not in (None, "text", "json"):
+        print("Error: El formato de --stats debe ser text o json")
+        sys.exit(1)
+    argv, backend = parser_flag(argv)
+    if backend not in PARSERS:
+        print(f"Error: El parser debe ser uno de: {', '.join(PARSERS)}")
+        sys.exit(1)
+
+    # Verificar que se proporcionó un archivo como argumento
+    if len(argv) != 1:
+        print("Error: Por favor proporcione un archivo .imperat como argumento")
+        print("Uso: python lexer.py archivo.imperat")
+        sys.exit(1)
+    path = argv[0]
+
+    # Verificar que el archivo tenga la extensión correcta
+    if not path.endswith('.imperat'):
+        print("Error: El archivo debe tener extensión .imperat")
+        sys.exit(1)
+
+    # Intentar abrir y leer el archivo
+    try:
+        with open(path, 'r') as file:
+            input_data = file.read()
+    except FileNotFoundError:
+        print(f"Error: No se encontró el archivo {path}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error al leer el archivo: {str(e)}")
+        sys.exit(1)
+
+    if stats_format:
+        main_stats(input_data, stats_format, backend)
+        return
+
+    # el árbol, los tokens y los errores se guardan en la caché de
+    # treecache.py, para no volver a analizar el mismo texto. Con otro
+    # parser que el de PLY el texto se analiza siempre (se pidió ese parser)
+    cache = TreeCache()
+    entry = None
+    if backend == "yacc" and input_data != missed:
+        entry = cache.get(input_data)
+    if entry is not None:
+        result, errors = entry.tree, entry.errors
+    else:
+        errors = []
+        buffer = TokenBuffer()
+        stream = tokenize(input_data, errors)
+        result = run_parser(recorded(stream, buffer), errors, backend)
+        # los tokens que el parser no llegó a leer (si se detuvo por
+        # demasiados errores) se guardan, pero no se reportan sus errores
+        reported = len(errors)
+        for tok in stream:
+            buffer.append(tok)
+        del errors[reported:]
+        cache.put(input_data, result, errors, buffer)
+
+    # Si hay errores léxicos, solo mostrar los errores
+    try:
+        if errors:
+            for error in errors:
+                print(error)
+        elif result is not None:
+            imprimir_ast(result)
+    finally:
+        # los contadores del acierto (put ya escribió los del fallo)
+        cache.flush()
+
+
+def main_stats(input_data, stats_format, backend="yacc"):
+    """Como main, midiendo cada fase por separado y contando las reducciones
+        de cada regla (solo con el parser de PLY). Las mediciones se escriben
+        en stderr.
+    """
+    STATS.start()
+    errors = []
+    # los tokens se leen a medida que el parser los pide, como en main
+    stream = STATS.timed_tokens(tokenize(input_data, errors))
+    with STATS.phase("analisis"), STATS.instrument(parser):
+        result = run_parser(stream, errors, backend)
+    # el tiempo del análisis incluye el del lexer, que ya está en tokenizacion
+    STATS.add_time("analisis", -STATS.phases["tokenizacion"]["segundos"])
+
+    with STATS.phase("impresion"):
+        if errors:
+            for error in errors:
+                print(error)
+        elif result is not None:
+            imprimir_ast(result)
+    sys.stdout.flush()
+    STATS.report(stats_format)
+
+
+def parse_source(source, errors=None, backend=None):
+    """Analiza source y devuelve el AST (None si hubo un error sintáctico).
+
+        Los errores léxicos y sintácticos se agregan a la lista errors.
+        backend es uno de PARSERS (DEFAULT_PARSER si no se indica).
+    """
+    stream = tokenize(source, errors)
+    return run_parser(stream, errors, backend or DEFAULT_PARSER)
+
+
+def recorded(stream, buffer):
+    """Los tokens de stream, que se agregan también al TokenBuffer buffer."""
+    for tok in stream:
+        buffer.append(tok)
+        yield tok
+
+
+def parse_buffer(buffer, errors=None, backend="yacc"):
+    """Analiza los tokens de un TokenBuffer ya construido y devuelve el AST."""
+    return run_parser(iter(buffer), errors, backend)
+
+
+def run_parser(stream, errors=None, backend="yacc"):
+    """Analiza la secuencia de tokens stream. Devuelve el AST, o None si hubo
+        errores sintácticos.
+
+        Los errores sintácticos (con su fila y columna) se agregan a la lista
+        errors; si no se proporciona, se imprimen. Con backend="descent" se
+        usa el parser de descent.py, que produce el mismo árbol.
+    """
+    if backend == "descent":
+        return run_descent(stream, errors)
+    parser.syntax_errors = errors if errors is not None else []
+    parser.error_count = 0
+    parser.recovered_token = None
+    try:
+        result = parser.parse(tokenfunc=lambda: next(stream, None))
+    except TooManyErrors:
+        result = None
+    if parser.error_count:
+        result = None
+        if errors is None:
+            for error in parser.syntax_errors:
+                print(error)
+    return result
+
+
+def run_descent(stream, errors=None):
+    """run_parser con el parser de descent.py. Si los tokens no forman un
+        programa válido, se le pasan al parser de PLY tal como llegaron
+        (con los errores léxicos en el mismo orden), que reporta los errores
+        sintácticos y se recupera de ellos.
+    """
+    global descent_parser
+    if descent_parser is None:
+        descent_parser = DescentParser(precedence)
+    lexical = errors if errors is not None else []
+    start = len(lexical)
+    tokens = []
+    marks = []
+    for tok in stream:
+        tokens.append(tok)
+        marks.append(len(lexical) - start)
+    try:
+        return descent_parser.parse(tokens)
+    except (Unexpected, RecursionError):
+        pass
+    found = lexical[start:]
+    del lexical[start:]
+    return run_parser(replay(tokens, marks, found, lexical), errors)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Description: Resolución de nombres sobre el AST, en una sola pasada.
+#
+#   Cada Block recibe su tabla de símbolos (Block.symbols) y cada variable
+#   una dirección (profundidad del Block que la declara, posición en él). Cada
+#   Ident del árbol, declaración o uso, queda anotado con esa dirección, así
+#   las etapas siguientes (vm.py) no buscan nombres en una cadena de ámbitos.
+#   Los identificadores no declarados y los declarados dos veces en un mismo
+#   bloque se reportan todos en la misma pasada.
+#
+#   Los nombres visibles se guardan en un solo diccionario nombre -> pila de
+#   direcciones: declarar apila, salir del bloque desapila y buscar es mirar
+#   el tope, sin recorrer los bloques que encierran al uso. El recorrido usa
+#   una pila explícita, así que el tiempo es lineal en el tamaño del árbol y
+#   la profundidad de los bloques no consume la pila de Python.
+#
+#   Uso: python resolver.py archivo.imperat
+
+import sys
+from ast_nodes import Block, Ident
+
+
+class SymbolTable():
+    """Variables declaradas en un Block.
+
+        names: nombre -> posición (slot), en el orden de declaración.
+        declarations: el Declare de cada posición, con su tipo.
+    """
+    __slots__ = ("depth", "names", "declarations")
+
+    def __init__(self, depth):
+        self.depth = depth
+        self.names = {}
+        self.declarations = []
+
+    def __len__(self):
+        return len(self.declarations)
+
+
+class Resolver():
+    """Resuelve los nombres de un árbol.
+
+        errors es la lista de (mensaje, fila, columna) de los identificadores
+        no declarados y los repetidos, en el orden del programa. blocks son
+        los Block del árbol en el mismo orden.
+    """
+
+    def __init__(self):
+        self.errors = []
+        self.blocks = []
+        self.uses = 0
+
+    def resolve(self, tree):
+        bindings = {}        # nombre -> pila de (profundidad, posición)
+        depth = -1
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            kind = type(node)
+            if kind is Ident:
+                self.uses += 1
+                visible = bindings.get(node.name)
+                if visible:
+                    node.depth, node.slot = visible[-1]
+                else:
+                    node.depth = node.slot = None
+                    self.error("not declared", node)
+            elif kind is Block:
+                depth += 1
+                table = node.symbols = SymbolTable(depth)
+                self.blocks.append(node)
+                if node.declare is not None:
+                    self.declare(node.declare, table, bindings)
+                # al salir del bloque se desapilan sus nombres
+                stack.append(table)
+                if node.body is not None:
+                    stack.append(node.body)
+            elif kind is SymbolTable:
+                for name in node.names:
+                    visible = bindings[name]
+                    visible.pop()
+                    if not visible:
+                        del bindings[name]
+                depth -= 1
+            else:
+                children = node.children()
+                children.reverse()
+                stack.extend(children)
+        return self
+
+    def declare(self, section, table, bindings):
+        names = table.names
+        for declare in section.declarations:
+            for ident in declare.names:
+                if ident.name in names:
+                    ident.depth = ident.slot = None
+                    self.error("already declared", ident)
+                    continue
+                slot = len(table.declarations)
+                names[ident.name] = slot
+                table.declarations.append(declare)
+                ident.depth, ident.slot = table.depth, slot
+                bindings.setdefault(ident.name, []).append((table.depth, slot))
+
+    def error(self, problem, ident):
+        self.errors.append((f"Error: Variable \"{ident.name}\" {problem}",
+                            ident.lineno, ident.column))
+
+
+def format_error(error):
+    message, lineno, column = error
+    return f"{message} in row {lineno}, column {column}"
+
+
+def resolver(tree, errors=None):
+    """Resuelve los nombres de tree y agrega a la lista errors los mensajes de
+        los identificadores no declarados o repetidos. Devuelve el Resolver.
+    """
+    resolution = Resolver().resolve(tree)
+    if errors is not None:
+        errors.extend(format_error(error) for error in resolution.errors)
+    return resolution
+
+
+def main():
+    # Verificar que se proporcionó un archivo como argumento
+    if len(sys.argv) != 2:
+        print("Error: Por favor proporcione un archivo .imperat como argumento")
+        print("Uso: python resolver.py archivo.imperat")
+        sys.exit(1)
+
+    # Verificar que el archivo tenga la extensión correcta
+    if not sys.argv[1].endswith('.imperat'):
+        print("Error: El archivo debe tener extensión .imperat")
+        sys.exit(1)
+
+    # Intentar abrir y leer el archivo
+    try:
+        with open(sys.argv[1], 'r') as file:
+            input_data = file.read()
+    except FileNotFoundError:
+        print(f"Error: No se encontró el archivo {sys.argv[1]}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error al leer el archivo: {str(e)}")
+        sys.exit(1)
+
+    from parse import parse_source
+
+    errors = []
+    tree = parse_source(input_data, errors)
+    if tree is not None and not errors:
+        resolution = resolver(tree, errors)
+    for error in errors:
+        print(error)
+    if errors or tree is None:
+        sys.exit(1)
+
+    # tabla de cada bloque: nombre, tipo y dirección (profundidad, posición)
+    for block in resolution.blocks:
+        table = block.symbols
+        print(f"Block in row {block.lineno}, column {block.column}, depth {table.depth}")
+        for name, slot in table.names.items():
+            print(f"-{name} : {table.declarations[slot].type_name()} ({table.depth}, {slot})")
+    print(f"Identificadores resueltos: {resolution.uses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,44 @@
 import os
+import io
 import sys
-import subprocess
-import filecmp
-from pathlib import Path
+import glob
+import time
+import json
+import codecs
+import hashlib
+import argparse
+import importlib
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+import lexer
+import parse
+
+# Archivo con los resultados de las pruebas exitosas, por clave de contenido
+RESULTS_CACHE = os.path.join(lexer.CACHE_DIR, 'test_results.json')
+
+# Fuentes de las que depende el resultado de una prueba del lexer: las de
+# lexer.py y los módulos que importa, y parse.py
+SOURCES = ['lexer.py', 'parse.py', 'scanner.py', 'stats.py', 'cachedir.py']
+
+# Pruebas de los otros programas: cada caso TestCases/Tests/<suite>/x.imperat
+# se ejecuta como python <módulo>.py [opciones] x.imperat, y su salida se
+# compara con TestCases/Outs/<suite>/x.out. Dependen de todas las fuentes.
+# Con --parser=descent todas analizan con el parser de descent.py.
+SUITES = {
+    'parse': ('parse', []),
+    'optimizer': ('optimizer', []),
+    'resolver': ('resolver', []),
+    'typechecker': ('typechecker', []),
+    'vm': ('vm', []),
+    'translator': ('translator', ['--no-cache']),
+}
+
+# Marcas de orden de bytes y la codificación que indican
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
 
 def normalize_output(text):
     # Eliminar BOM si existe y normalizar saltos de línea
@@ -23,19 +59,21 @@ def normalize_output(text):
             prev_empty = True
     return '\n'.join(result)
 
+def detect_encoding(data):
+    # La codificación se decide una sola vez, por la marca de orden de bytes
+    for bom, encoding in BOMS:
+        if data.startswith(bom):
+            return encoding
+    return 'utf-8'
+
 def read_file_with_encoding(file_path):
-    # Lista de codificaciones a intentar
-    encodings = ['utf-8', 'utf-8-sig', 'utf-16', 'utf-16le', 'utf-16be', 'latin1']
-    
-    for encoding in encodings:
-        try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                content = f.read()
-                return normalize_output(content)
-        except UnicodeError:
-            continue
-    
-    raise ValueError(f"No se pudo leer el archivo {file_path} con ninguna codificación conocida")
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    try:
+        return normalize_output(data.decode(detect_encoding(data)))
+    except UnicodeError:
+        # Sin marca y sin ser UTF-8 válido: latin1 acepta cualquier byte
+        return normalize_output(data.decode('latin1'))
 
 def write_file_with_encoding(file_path, content):
     # Intentar escribir en UTF-8 primero
@@ -47,78 +85,198 @@ def write_file_with_encoding(file_path, content):
         with open(file_path, 'w', encoding='utf-16') as f:
             f.write(content)
 
-def run_test(test_file):
-    # Obtener el nombre base del archivo de prueba
-    test_name = os.path.basename(test_file)
-    base_name = test_name.replace('.imperat', '')
-    
+def file_hash(file_path):
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def sources_hash(sources=SOURCES):
+    h = hashlib.sha1()
+    for source in sources:
+        h.update(file_hash(source).encode())
+    return h.hexdigest()
+
+def suite_of(test_file):
+    """Suite del caso (una clave de SUITES), o None si es del lexer."""
+    suite = os.path.basename(os.path.dirname(test_file))
+    return suite if suite in SUITES else None
+
+def test_name_of(test_file):
+    suite = suite_of(test_file)
+    name = os.path.basename(test_file)
+    return f"{suite}/{name}" if suite else name
+
+def expected_path(test_file):
+    base_name = os.path.basename(test_file).replace('.imperat', '')
+    suite = suite_of(test_file)
+    if suite:
+        return os.path.join('TestCases', 'Outs', suite, f'{base_name}.out')
+    return os.path.join('TestCases', 'Outs', f'{base_name}.out')
+
+def cache_key(test_file, sources):
+    """Clave de un caso: hash de la entrada, de la salida esperada y de las
+        fuentes del lexer y el parser."""
+    try:
+        expected = file_hash(expected_path(test_file))
+    except OSError:
+        expected = ''
+    return f"{file_hash(test_file)}:{expected}:{sources}"
+
+def load_cache():
+    try:
+        with open(RESULTS_CACHE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(cache):
+    try:
+        os.makedirs(os.path.dirname(RESULTS_CACHE), exist_ok=True)
+        with open(RESULTS_CACHE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+    except OSError:
+        pass  # sin caché en directorios de solo lectura
+
+def run_lexer(test_file, scanner='ply'):
+    # Ejecutar el lexer dentro del proceso, sin lanzar un intérprete nuevo
+    with open(test_file, 'r') as file:
+        return normalize_output(lexer.lex_text(file.read(),
+                                               lexer=lexer.new_lexer(scanner=scanner)))
+
+def run_program(test_file, parser='yacc'):
+    # El main del programa de la suite, en el mismo proceso, con su salida
+    # capturada; su código de salida no se compara. parser es el que usan
+    # parse.py y parse_source (ver parse.DEFAULT_PARSER)
+    module, options = SUITES[suite_of(test_file)]
+    main = importlib.import_module(module).main
+    output = io.StringIO()
+    argv = sys.argv
+    sys.argv = [f'{module}.py'] + options + [test_file]
+    default, parse.DEFAULT_PARSER = parse.DEFAULT_PARSER, parser
+    try:
+        with redirect_stdout(output):
+            main()
+    except SystemExit:
+        pass
+    finally:
+        sys.argv = argv
+        parse.DEFAULT_PARSER = default
+    return normalize_output(output.getvalue())
+
+def run_test(test_file, scanner='ply', parser='yacc'):
+    """Ejecuta un caso de prueba y devuelve (nombre, exitosa, esperada,
+        generada, segundos). Se ejecuta dentro de los procesos del pool,
+        por eso no imprime nada.
+    """
+    # Obtener el nombre del caso de prueba
+    test_name = test_name_of(test_file)
+
     # Definir las rutas de los archivos
-    out_expected = os.path.join('TestCases', 'Outs', f'{base_name}.out')
-    out_generated = os.path.join('Outs', f'{base_name}.out')
-    
-    # Crear el directorio Outs si no existe
-    os.makedirs('Outs', exist_ok=True)
-    
-    # Ejecutar el lexer y guardar la salida
+    out_expected = expected_path(test_file)
+
+    start = time.perf_counter()
     try:
-        result = subprocess.run(['python', 'lexer.py', test_file], 
-                             capture_output=True, 
-                             text=True,
-                             encoding='utf-8')
-        
-        # Normalizar la salida antes de escribirla
-        output = normalize_output(result.stdout)
-        if result.stderr:
-            output += '\n' + normalize_output(result.stderr)
-            
-        # Escribir la salida normalizada
-        write_file_with_encoding(out_generated, output)
-        
+        if suite_of(test_file):
+            generated = run_program(test_file, parser)
+        else:
+            generated = run_lexer(test_file, scanner)
     except Exception as e:
-        print(f"Error al ejecutar la prueba {test_name}: {str(e)}")
-        return False
-    
-    # Comparar con la salida esperada
+        generated = f"Error al ejecutar la prueba {test_name}: {str(e)}"
+    elapsed = time.perf_counter() - start
+
+    # Comparar con la salida esperada, en memoria
     try:
         expected = read_file_with_encoding(out_expected)
-        generated = read_file_with_encoding(out_generated)
-        
-        if expected == generated:
-            print(f"✓ {test_name}: Prueba exitosa")
-            return True
-        else:
-            print(f"✗ {test_name}: Las salidas no coinciden")
-            print("\nSalida esperada:")
-            print(expected)
-            print("\nSalida generada:")
-            print(generated)
-            return False
     except Exception as e:
-        print(f"Error al comparar las salidas de {test_name}: {str(e)}")
-        return False
+        expected = f"Error al leer la salida esperada de {test_name}: {str(e)}"
+
+    return test_name, expected == generated, expected, generated, elapsed
+
+def report(result):
+    test_name, passed, expected, generated, elapsed = result
+    if passed:
+        print(f"✓ {test_name}: Prueba exitosa ({elapsed * 1000:.1f} ms)")
+        return
+
+    # Solo se escribe la salida generada cuando la prueba falla
+    base_name = test_name.replace('.imperat', '')
+    out_generated = os.path.join('Outs', f'{base_name}.out')
+    os.makedirs(os.path.dirname(out_generated), exist_ok=True)
+    write_file_with_encoding(out_generated, generated)
+
+    print(f"✗ {test_name}: Las salidas no coinciden ({elapsed * 1000:.1f} ms)")
+    print("\nSalida esperada:")
+    print(expected)
+    print("\nSalida generada:")
+    print(generated)
 
 def main():
-    # Obtener todos los archivos de prueba
+    parser = argparse.ArgumentParser(description="Ejecuta los casos de prueba")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="cantidad de procesos para ejecutar las pruebas")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="ejecutar todas las pruebas aunque no hayan cambiado")
+    parser.add_argument('--scanner', choices=lexer.SCANNERS, default='ply',
+                        help="analizador léxico con el que se ejecutan las pruebas")
+    parser.add_argument('--parser', choices=parse.PARSERS, default='yacc',
+                        help="parser con el que se ejecutan las suites de los programas")
+    args = parser.parse_args()
+
+    # Obtener todos los archivos de prueba: los del lexer y los de cada suite
     test_dir = os.path.join('TestCases', 'Tests')
     test_files = sorted([f for f in os.listdir(test_dir) if f.endswith('.imperat')])
-    
-    if not test_files:
+    paths = [os.path.join(test_dir, test_file) for test_file in test_files]
+    for suite in SUITES:
+        paths += sorted(glob.glob(os.path.join(test_dir, suite, '*.imperat')))
+
+    if not paths:
         print("No se encontraron archivos de prueba en TestCase/Test")
         return
-    
+
     # Ejecutar todas las pruebas
-    total = len(test_files)
+    total = len(paths)
     passed = 0
-    
+
     print(f"\nEjecutando {total} pruebas...\n")
-    
-    for test_file in test_files:
-        full_path = os.path.join(test_dir, test_file)
-        if run_test(full_path):
+
+    start = time.perf_counter()
+
+    # Las pruebas que ya pasaron con el mismo contenido no se ejecutan
+    cache = {} if args.no_cache else load_cache()
+    sources = f"{sources_hash()}:{args.scanner}"
+    programs = f"{sources_hash(sorted(glob.glob('*.py')))}:{args.parser}"
+    keys = {path: cache_key(path, programs if suite_of(path) else sources)
+            for path in paths}
+    cached = {path for path in paths
+              if cache.get(test_name_of(path)) == keys[path]}
+    pending = [path for path in paths if path not in cached]
+
+    if args.jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = dict(zip(pending, pool.map(run_test, pending,
+                                                 [args.scanner] * len(pending),
+                                                 [args.parser] * len(pending))))
+    else:
+        results = {path: run_test(path, args.scanner, args.parser) for path in pending}
+
+    for path in paths:
+        test_name = test_name_of(path)
+        if path in cached:
+            print(f"✓ {test_name}: Prueba exitosa (caché)")
             passed += 1
-    
+            continue
+        result = results[path]
+        report(result)
+        passed += result[1]
+        if result[1]:
+            cache[test_name] = keys[path]
+        else:
+            cache.pop(test_name, None)
+    save_cache(cache)
+    elapsed = time.perf_counter() - start
+
     # Mostrar resumen
-    print(f"\nResumen: {passed}/{total} pruebas exitosas")
-    
+    print(f"\nResumen: {passed}/{total} pruebas exitosas ({len(cached)} en caché)")
+    print(f"Tiempo total: {elapsed * 1000:.1f} ms")
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,320 @@
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Description: Analizador léxico alternativo al de PLY, para el conjunto fijo de
+#   tokens de lexer.py: un autómata finito determinista sobre clases de
+#   caracteres, con las tablas calculadas una sola vez.
+#
+#   El lexer de PLY prueba en cada posición la expresión regular que une todas
+#   las reglas t_Tk* y llama a una función de Python para TkId, TkNum,
+#   TkString y los saltos de línea. Aquí:
+#
+#   - La entrada se traduce de una vez (str.translate, en C) a un byte por
+#     carácter con su clase: letra, dígito, comilla, cada símbolo, etc.
+#   - Cada token se reconoce recorriendo la tabla de transiciones hasta la
+#     transición muerta; el estado en que se detiene dice qué se reconoció.
+#     Un byte de clase 0 al final hace de centinela, así el lazo no revisa
+#     el largo de la entrada.
+#   - El interior de los strings y de los comentarios no pasa por la tabla:
+#     su final se busca con str.find, y los escapes se validan con métodos
+#     de str (ver string_end).
+#   - Las palabras reservadas se buscan en una tabla de hash perfecto
+#     calculada sobre la primera letra, la última y el largo, que no depende
+#     del largo del identificador (reserved.get calcula el hash del texto
+#     completo de cada identificador nuevo).
+#
+#   Los tokens y los mensajes de error son los mismos que los del lexer de PLY
+#   (benchmarks/bench_scanner.py lo verifica). Se elige con
+#   python lexer.py --scanner dfa, o con lexer.new_lexer(scanner="dfa").
+
+import copy
+from ply.lex import LexToken
+
+
+# clases de caracteres fijas; cada carácter de un símbolo tiene además la suya
+END = 0        # centinela al final de la entrada
+OTHER = 1      # cualquier carácter que no forma parte de ningún token
+LETTER = 2     # a-z A-Z _
+DIGIT = 3      # 0-9
+UDIGIT = 4     # otros dígitos decimales Unicode: \d los acepta en TkNum
+QUOTE = 5
+NEWLINE = 6
+BLANK = 7      # espacio y tabulador (t_ignore)
+SLASH = 8
+FIXED_CLASSES = 9
+
+# acciones de los estados de aceptación, además del tipo de un símbolo
+IDENT = 1
+NUMBER = 2
+STRING = 3
+LINES = 4
+IGNORE = 5
+
+
+class ClassMap(dict):
+    """Tabla de str.translate: carácter -> clase (como carácter). Los
+        caracteres fuera de ASCII se clasifican la primera vez que aparecen."""
+
+    def __missing__(self, code):
+        char = chr(code)
+        value = self[code] = chr(UDIGIT if char.isdecimal() else OTHER)
+        return value
+
+
+def perfect_hash(words):
+    """Busca una función h(w) = (a * w[0] + b * w[-1] + len(w)) % size sin
+        colisiones sobre words. Devuelve (a, b, size)."""
+    keys = [(ord(word[0]), ord(word[-1]), len(word)) for word in words]
+    for size in range(len(words), 8 * len(words) + 1):
+        for a in range(1, size):
+            for b in range(size):
+                if len({(a * first + b * last + length) % size
+                        for first, last, length in keys}) == len(keys):
+                    return a, b, size
+    raise ValueError("No se encontró un hash perfecto para las palabras reservadas")
+
+
+def string_end(data, i):
+    """Devuelve la posición siguiente a la comilla que cierra el string cuyo
+        contenido empieza en i, o 0 si no es un string válido: sin cerrar
+        antes del fin de la línea, o con un escape distinto de \n \" y \\.
+
+        Sin escapes basta buscar la próxima comilla. Con escapes se toma el
+        resto de la línea y se reemplaza cada escape válido por dos caracteres
+        neutros (primero los pares \\, de izquierda a derecha como los agrupa
+        la expresión regular), sin mover las posiciones: la primera comilla
+        que queda es la de cierre, y no debe quedar ninguna \ antes de ella.
+        Una línea con muchos strings con escapes se copia una vez por string.
+    """
+    close = data.find('"', i)
+    if close >= 0:
+        text = data[i:close]
+        if "\\" not in text:
+            return close + 1 if "\n" not in text else 0
+    end = data.find("\n", i)
+    text = data[i:end] if end >= 0 else data[i:]
+    text = text.replace("\\\\", "__").replace('\\"', "__").replace("\\n", "__")
+    close = text.find('"')
+    if close < 0 or "\\" in text[:close]:
+        return 0
+    return i + close + 1
+
+
+class Tables():
+    """Clases de caracteres, transiciones y palabras reservadas.
+
+        Los estados se representan por el índice de su fila en delta (estado
+        por cantidad de clases), y la fila 0 es el estado muerto. accept
+        guarda, en el índice de la fila, la acción del estado o el tipo del
+        símbolo reconocido; 0 si el estado no acepta.
+    """
+
+    def __init__(self, symbols, reserved):
+        # clases
+        self.class_map = ClassMap()
+        for code in range(128):
+            self.class_map[code] = chr(OTHER)
+        for char in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_":
+            self.class_map[ord(char)] = chr(LETTER)
+        for char in "0123456789":
+            self.class_map[ord(char)] = chr(DIGIT)
+        for char, cls in (('"', QUOTE), ("\n", NEWLINE),
+                          (" ", BLANK), ("\t", BLANK), ("/", SLASH)):
+            self.class_map[ord(char)] = chr(cls)
+        classes = FIXED_CLASSES
+        for char in sorted(set("".join(symbols))):
+            self.class_map[ord(char)] = chr(classes)
+            classes += 1
+        self.classes = classes
+
+        # estados
+        self.delta = [0] * classes  # estado muerto
+        self.accept = [0] * classes
+
+        def state(action=0):
+            row = len(self.delta)
+            self.delta.extend([0] * classes)
+            self.accept.extend([action] + [0] * (classes - 1))
+            return row
+
+        def move(source, targets, cls):
+            self.delta[source + cls] = targets
+
+        self.start = start = state()
+        self.body = body = state()
+        self.comment = comment = state(IGNORE)
+        ident = state(IDENT)
+        number = state(NUMBER)
+        slash = state()
+        lines = state(LINES)
+        blank = state(IGNORE)
+
+        move(start, ident, LETTER)
+        for cls in (LETTER, DIGIT):
+            move(ident, ident, cls)
+        for cls in (DIGIT, UDIGIT):
+            move(start, number, cls)
+            move(number, number, cls)
+
+        # "[^"\\\n]*(?:\\[n"\\][^"\\\n]*)*"
+        # body no tiene transiciones: el contenido del string lo reconoce
+        # string_end, y al terminar se pasa al estado string
+        move(start, body, QUOTE)
+        self.string = state(STRING)
+
+        # //.*
+        move(start, slash, SLASH)
+        # el resto de la línea de un comentario también se salta con str.find
+        move(slash, comment, SLASH)
+
+        move(start, lines, NEWLINE)
+        move(lines, lines, NEWLINE)
+        move(start, blank, BLANK)
+        move(blank, blank, BLANK)
+
+        # símbolos: un estado por prefijo, y acepta el que es un símbolo
+        prefixes = {"": start}
+        for word in sorted(symbols, key=len):
+            for end in range(1, len(word) + 1):
+                prefix = word[:end]
+                if prefix not in prefixes:
+                    prefixes[prefix] = state()
+                    cls = ord(self.class_map[ord(prefix[-1])])
+                    move(prefixes[prefix[:-1]], prefixes[prefix], cls)
+            self.accept[prefixes[word]] = symbols[word]
+
+        # palabras reservadas
+        self.a, self.b, size = perfect_hash(list(reserved))
+        self.keywords = [("", "TkId")] * size
+        for word, kind in reserved.items():
+            index = (self.a * ord(word[0]) + self.b * ord(word[-1]) + len(word)) % size
+            self.keywords[index] = (word, kind)
+        self.longest_keyword = max(map(len, reserved))
+
+
+class DFALexer():
+    """Lexer con la interfaz de un lexer de PLY que usan lexer.tokenize y
+        lexer.lex_file: input(), iteración y los atributos lineno, line_start
+        y errors (que prepara lexer.reset_lexer).
+    """
+
+    def __init__(self, symbols, reserved):
+        self.tables = Tables(symbols, reserved)
+        self.errors = []
+        self.lineno = 1
+        self.line_start = 0
+        self.line_index = None
+        self.lexdata = ""
+        self.stream = iter(())
+
+    def clone(self):
+        """Copia que comparte las tablas."""
+        lexer = copy.copy(self)
+        lexer.errors = []
+        lexer.stream = iter(())
+        return lexer
+
+    def input(self, data):
+        self.lexdata = data
+        self.stream = self.scan(data)
+
+    def __iter__(self):
+        return self.stream
+
+    def token(self):
+        return next(self.stream, None)
+
+    def scan(self, data):
+        """Generador de los tokens de data. Actualiza lineno y line_start en
+            cada salto de línea, como t_newline."""
+        tables = self.tables
+        delta = tables.delta
+        accept = tables.accept
+        start, body, comment = tables.start, tables.body, tables.comment
+        string = tables.string
+        keywords = tables.keywords
+        a, b, size = tables.a, tables.b, len(keywords)
+        longest = tables.longest_keyword
+        classes = (data.translate(tables.class_map) + chr(END)).encode("latin-1")
+        find = data.find
+        lineno = self.lineno
+        line_start = self.line_start
+        length = len(data)
+        pos = 0
+
+        while pos < length:
+            # recorrido hasta la transición muerta (el centinela la asegura)
+            state = start
+            i = pos
+            while True:
+                following = delta[state + classes[i]]
+                if not following:
+                    break
+                state = following
+                i += 1
+            if state == comment:
+                i = find("\n", i)
+                if i < 0:
+                    i = length
+            elif state == body:
+                i = string_end(data, i)
+                if i:
+                    state = string
+            action = accept[state]
+
+            if not action:
+                # el recorrido pasó del último estado de aceptación ("--" sin
+                # ">"), o no hubo ninguno: error en pos
+                action, i = self.last_accept(classes, pos)
+                if not action:
+                    self.errors.append(f"Error: Unexpected character \"{data[pos]}\" "
+                                       f"in row {lineno}, column {pos - line_start + 1}")
+                    pos += 1
+                    continue
+
+            if action == IGNORE:
+                pos = i
+                continue
+            if action == LINES:
+                lineno += i - pos
+                line_start = i
+                self.lineno = lineno
+                self.line_start = line_start
+                pos = i
+                continue
+
+            tok = LexToken()
+            tok.lineno = lineno
+            tok.lexpos = pos
+            if action == IDENT:
+                text = data[pos:i]
+                tok.value = text
+                tok.type = "TkId"
+                if i - pos <= longest:
+                    word, kind = keywords[(a * ord(text[0]) + b * ord(text[-1]) + i - pos) % size]
+                    if word == text:
+                        tok.type = kind
+            elif action == NUMBER:
+                tok.type = "TkNum"
+                tok.value = int(data[pos:i])
+            elif action == STRING:
+                tok.type = "TkString"
+                tok.value = data[pos + 1:i - 1]
+            else:
+                tok.type = action
+                tok.value = data[pos:i]
+            pos = i
+            yield tok
+
+    def last_accept(self, classes, pos):
+        """Recorre de nuevo desde pos recordando el último estado de
+            aceptación. Devuelve (acción, fin), con acción 0 si no hubo."""
+        delta, accept = self.tables.delta, self.tables.accept
+        state = self.tables.start
+        found = (0, pos)
+        i = pos
+        while True:
+            state = delta[state + classes[i]]
+            if not state:
+                return found
+            i += 1
+            if accept[state]:
+                found = (accept[state], i)
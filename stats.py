@@ -0,0 +1,180 @@
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Description: Instrumentación de lexer.py y parse.py, activada con --stats.
+#
+#   Reporta por fase el tiempo y el pico de memoria reservada (tracemalloc),
+#   la cantidad de tokens de cada tipo, las reducciones de cada regla de la
+#   gramática y la altura máxima de la pila del parser. Sin --stats el único
+#   costo son dos lecturas del reloj al construir el lexer y el parser.
+#
+#   La memoria de la construcción del lexer y el parser (al importar los
+#   módulos) solo se mide si tracemalloc ya estaba activo al arrancar:
+#   python -X tracemalloc lexer.py --stats archivo.imperat
+
+import json
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+# momento en que se importó este módulo, el primero que importa lexer.py
+STARTED = time.perf_counter()
+
+
+class Stats():
+    """Mediciones de una ejecución."""
+
+    def __init__(self):
+        self.active = False
+        self.phases = {}
+        self.tokens = Counter()
+        self.reductions = Counter()
+        self.productions = Counter()
+        self.stack_max = 0
+
+    @contextmanager
+    def phase(self, name):
+        """Mide el tiempo y el pico de memoria del bloque. Si la fase se repite
+            (varios archivos) se suman los tiempos y se guarda el mayor pico."""
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.phases.setdefault(name, {"segundos": 0.0})
+            entry["segundos"] += time.perf_counter() - start
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1] - base
+                entry["pico_bytes"] = max(entry.get("pico_bytes", 0), peak)
+
+    def add_time(self, name, seconds):
+        """Suma tiempo a una fase medida en muchos intervalos cortos."""
+        entry = self.phases.setdefault(name, {"segundos": 0.0})
+        entry["segundos"] += seconds
+
+    def start(self):
+        """Activa la medición para lo que queda de la ejecución. Descarta lo
+            medido en una ejecución anterior del mismo proceso (daemon.py),
+            salvo la construcción del lexer y el parser."""
+        self.active = True
+        self.phases = {name: entry for name, entry in self.phases.items()
+                       if name.startswith("construccion_")}
+        self.tokens.clear()
+        self.reductions.clear()
+        self.productions.clear()
+        self.stack_max = 0
+        self.phases["arranque"] = {"segundos": time.perf_counter() - STARTED}
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def count_tokens(self, stream):
+        """Generador que deja pasar los tokens de stream contándolos."""
+        tokens = self.tokens
+        for tok in stream:
+            tokens[tok.type] += 1
+            yield tok
+
+    def timed_tokens(self, stream, name="tokenizacion"):
+        """Como count_tokens, sumando a la fase name el tiempo de obtener cada
+            token. Así el lexer se mide mientras el parser lo consume, y los
+            errores léxicos y sintácticos se reportan en el mismo orden que
+            sin --stats."""
+        tokens = self.tokens
+        clock = time.perf_counter
+        entry = self.phases.setdefault(name, {"segundos": 0.0})
+        stream = iter(stream)
+        while True:
+            start = clock()
+            tok = next(stream, None)
+            entry["segundos"] += clock() - start
+            if tok is None:
+                return
+            tokens[tok.type] += 1
+            yield tok
+
+    @contextmanager
+    def instrument(self, parser):
+        """Cuenta las reducciones de cada regla y la altura de la pila mientras
+            dura el bloque, envolviendo las funciones p_ del parser."""
+        productions = [prod for prod in parser.productions if prod.callable]
+        originals = [prod.callable for prod in productions]
+
+        def counting(prod, function):
+            name, rule, length = prod.func, prod.str, prod.len
+
+            def wrapper(p):
+                self.reductions[name] += 1
+                self.productions[rule] += 1
+                # al reducir, la pila ya no tiene los símbolos de la regla
+                depth = len(p.stack) + length
+                if depth > self.stack_max:
+                    self.stack_max = depth
+                return function(p)
+            return wrapper
+
+        for prod, function in zip(productions, originals):
+            prod.callable = counting(prod, function)
+        try:
+            yield
+        finally:
+            for prod, function in zip(productions, originals):
+                prod.callable = function
+
+    def as_dict(self):
+        return {
+            "fases": self.phases,
+            "tokens": dict(self.tokens.most_common()),
+            "reducciones": dict(self.reductions.most_common()),
+            "producciones": dict(self.productions.most_common()),
+            "pila_maxima": self.stack_max,
+        }
+
+    def report(self, format="text", out=None):
+        """Escribe las mediciones en out (stderr por defecto, para no mezclarlas
+            con la salida del programa)."""
+        if out is None:
+            out = sys.stderr
+        if format == "json":
+            out.write(json.dumps(self.as_dict(), indent=2) + "\n")
+            return
+
+        lines = ["Fases:"]
+        for name, entry in self.phases.items():
+            peak = entry.get("pico_bytes")
+            memory = f"  pico {peak / 1024:10.1f} KB" if peak is not None else ""
+            lines.append(f"  {name:<22} {entry['segundos'] * 1000:9.2f} ms{memory}")
+        if self.tokens:
+            lines.append(f"Tokens: {sum(self.tokens.values())}")
+            lines.extend(f"  {kind:<22} {count}" for kind, count in self.tokens.most_common())
+        if self.reductions:
+            lines.append(f"Reducciones: {sum(self.reductions.values())}")
+            lines.extend(f"  {name:<30} {count}" for name, count in self.reductions.most_common())
+            lines.append(f"Altura máxima de la pila del parser: {self.stack_max}")
+        out.write("\n".join(lines) + "\n")
+
+
+def no_phase(name):
+    """Reemplazo de Stats.phase cuando no se mide."""
+    return nullcontext()
+
+
+def stats_flag(argv):
+    """Separa --stats o --stats=json de los argumentos. Devuelve (argumentos,
+        formato), con formato None si no se pidió."""
+    rest = []
+    format = None
+    for arg in argv:
+        if arg == "--stats":
+            format = "text"
+        elif arg.startswith("--stats="):
+            format = arg.split("=", 1)[1]
+        else:
+            rest.append(arg)
+    return rest, format
+
+
+# mediciones del proceso; lexer.py y parse.py registran aquí su construcción
+STATS = Stats()
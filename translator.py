@@ -0,0 +1,404 @@
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Description: Traducción de un programa .imperat a código de Python, como
+#   alternativa a la máquina virtual de vm.py.
+#
+#   El AST (con los nombres resueltos y los tipos verificados) se traduce a
+#   un árbol del módulo ast de Python, y compile() lo convierte en un objeto
+#   de código que ejecuta el intérprete de Python directamente:
+#
+#   - Cada variable es una variable local de la función programa, con la
+#     profundidad de su bloque en el nombre (x_0, x_1) para que un bloque
+#     interno pueda redeclarar un nombre.
+#   - while es un while de Python; if ... [] ... fi es un if/elif con un else
+#     que lanza el error de ninguna guardia verdadera.
+#   - F.i es F.get(i) y F(a:b)(c:d) es F.update(((a, b), (c, d))).
+#   - print y el + de strings usan f-strings; solo los bool y las funciones
+#     pasan por vm.format_value.
+#
+#   El objeto de código se guarda con marshal en cachedir.CACHE_DIR, con el
+#   hash del texto del programa como nombre (como los .pyc). Una ejecución con
+#   el programa en caché no analiza ni traduce nada: lee el archivo, calcula el
+#   hash y ejecuta el código guardado. Por eso el parser, el resolver y el
+#   verificador de tipos se importan solo cuando el programa no está en caché;
+#   de vm.py se usan únicamente VMError y format_value, que el código
+#   traducido necesita al ejecutar.
+#
+#   Uso: python translator.py [--no-cache] [--source] archivo.imperat
+
+import argparse
+import ast
+import hashlib
+import importlib.util
+import marshal
+import os
+import sys
+
+from ast_nodes import BinOp, String
+from functions import FunctionValue
+from cachedir import CACHE_DIR
+from vm import CompileError, VMError, format_value, unescape
+
+
+# Versión del código que genera Translator: se cambia junto con él para que
+# no se usen objetos de código viejos. El número mágico de Python distingue
+# los de otras versiones del intérprete.
+VERSION = 2
+MAGIC = importlib.util.MAGIC_NUMBER + VERSION.to_bytes(2, "little")
+
+# operadores de Python de cada operador de la gramática
+BINARY_OPS = {
+    "Plus": ast.Add,
+    "Minus": ast.Sub,
+    "Mult": ast.Mult,
+}
+
+COMPARE_OPS = {
+    "Less": ast.Lt,
+    "Leq": ast.LtE,
+    "Greater": ast.Gt,
+    "Geq": ast.GtE,
+    "Equal": ast.Eq,
+    "NEqual": ast.NotEq,
+}
+
+# tipos cuyo texto en print es el de str()
+PLAIN_TYPES = ("int", "string")
+
+
+def name(text, store=False):
+    return ast.Name(id=text, ctx=ast.Store() if store else ast.Load())
+
+
+def call(function, *args):
+    return ast.Call(func=function, args=list(args), keywords=[])
+
+
+class Translator():
+    """Traduce un AST con los nombres resueltos y los tipos verificados a
+        un módulo de Python que define programa(write).
+
+        empty guarda los tamaños de las funciones declaradas: el módulo crea
+        una vez el valor inicial de cada tamaño (los valores son inmutables,
+        así que todas las variables lo comparten, como en vm.py).
+    """
+
+    def __init__(self):
+        self.empty = set()
+
+    def translate(self, tree):
+        body = self.statement(tree) or [ast.Pass()]
+        function = ast.FunctionDef(
+            name="programa",
+            args=ast.arguments(posonlyargs=[], args=[ast.arg(arg="write")],
+                               kwonlyargs=[], kw_defaults=[], defaults=[]),
+            body=body, decorator_list=[], returns=None)
+        empty = ast.Dict(keys=[ast.Constant(size) for size in sorted(self.empty)],
+                         values=[call(name("FunctionValue"), ast.Constant(size))
+                                 for size in sorted(self.empty)])
+        module = ast.Module(body=[ast.Assign(targets=[name("EMPTY", True)], value=empty),
+                                  function],
+                            type_ignores=[])
+        return ast.fix_missing_locations(module)
+
+    # utilidades
+
+    def at(self, result, node):
+        """Ubica result en la fila y columna de node (para los errores)."""
+        result.lineno = result.end_lineno = node.lineno
+        result.col_offset = max(node.column - 1, 0)
+        result.end_col_offset = result.col_offset + 1
+        return result
+
+    def variable(self, ident, store=False):
+        return self.at(name(f"{ident.name}_{ident.depth}", store), ident)
+
+    # instrucciones: cada una devuelve una lista de instrucciones de Python
+
+    def statement(self, node):
+        return getattr(self, "statement_" + type(node).__name__)(node)
+
+    def body(self, node):
+        return self.statement(node) or [self.at(ast.Pass(), node)]
+
+    def statement_Block(self, node):
+        result = []
+        if node.declare is not None:
+            for declare in node.declare.declarations:
+                result.extend(self.declare(declare))
+        if node.body is not None:
+            result.extend(self.statement(node.body))
+        return result
+
+    def declare(self, node):
+        if node.type == "function":
+            size = node.size.value + 1
+            self.empty.add(size)
+            default = ast.Subscript(value=name("EMPTY"), slice=ast.Constant(size),
+                                    ctx=ast.Load())
+        else:
+            default = ast.Constant(0 if node.type == "int" else False)
+        targets = [self.variable(ident, True) for ident in node.names]
+        return [self.at(ast.Assign(targets=targets, value=default), node)]
+
+    def statement_Secuencing(self, node):
+        result = []
+        for instruction in node.instructions:
+            result.extend(self.statement(instruction))
+        return result
+
+    def statement_Asig(self, node):
+        return [self.at(ast.Assign(targets=[self.variable(node.target, True)],
+                                   value=self.expression(node.value)), node)]
+
+    def statement_If(self, node):
+        # el else de la última guardia es el error; cada guardia anterior
+        # es el elif (un If anidado en el else) de la siguiente
+        error = call(name("VMError"), ast.Constant("Error: No guard of the if is true"),
+                     ast.Constant(node.lineno))
+        orelse = [self.at(ast.Raise(exc=error, cause=None), node)]
+        for guard in reversed(node.guards):
+            statement = ast.If(test=self.expression(guard.condition),
+                               body=self.body(guard.body), orelse=orelse)
+            orelse = [self.at(statement, guard)]
+        return orelse
+
+    def statement_While(self, node):
+        return [self.at(ast.While(test=self.expression(node.condition),
+                                  body=self.body(node.body), orelse=[]), node)]
+
+    def statement_Print(self, node):
+        text = ast.JoinedStr(values=self.text(node.value) + [ast.Constant("\n")])
+        return [self.at(ast.Expr(value=call(name("write"), text)), node)]
+
+    def statement_Skip(self, node):
+        return []
+
+    # expresiones
+
+    def expression(self, node):
+        return self.at(getattr(self, "expression_" + type(node).__name__)(node), node)
+
+    def text(self, node):
+        """Partes de un f-string con el texto que print muestra de node. Una
+            cadena a + b + c de concatenaciones da las partes de cada operando.
+        """
+        parts = []
+        operands = [node]
+        while operands:
+            operand = operands.pop()
+            if type(operand) is BinOp and operand.type == "string":
+                operands.append(operand.right)
+                operands.append(operand.left)
+            elif type(operand) is String:
+                parts.append(ast.Constant(unescape(operand.value)))
+            else:
+                value = self.expression(operand)
+                if operand.type not in PLAIN_TYPES:
+                    value = call(name("format_value"), value)
+                parts.append(ast.FormattedValue(value=value, conversion=-1,
+                                                format_spec=None))
+        return parts
+
+    def expression_Literal(self, node):
+        return ast.Constant(node.value)
+
+    def expression_String(self, node):
+        return ast.Constant(unescape(node.value))
+
+    def expression_Ident(self, node):
+        return self.variable(node)
+
+    def expression_BinOp(self, node):
+        if node.type == "string":
+            # una cadena a + b + c de concatenaciones es un solo f-string
+            return ast.JoinedStr(values=self.text(node))
+        left = self.expression(node.left)
+        right = self.expression(node.right)
+        if node.op in ("And", "Or"):
+            op = ast.And() if node.op == "And" else ast.Or()
+            return ast.BoolOp(op=op, values=[left, right])
+        if node.op in COMPARE_OPS:
+            return ast.Compare(left=left, ops=[COMPARE_OPS[node.op]()], comparators=[right])
+        return ast.BinOp(left=left, op=BINARY_OPS[node.op](), right=right)
+
+    def expression_UnaryOp(self, node):
+        op = ast.Not() if node.op == "Not" else ast.USub()
+        return ast.UnaryOp(op=op, operand=self.expression(node.operand))
+
+    def expression_App(self, node):
+        method = ast.Attribute(value=self.expression(node.function), attr="get",
+                               ctx=ast.Load())
+        return call(method, self.expression(node.index))
+
+    def expression_WriteFunction(self, node):
+        pairs = ast.Tuple(elts=[ast.Tuple(elts=[self.expression(update.index),
+                                                self.expression(update.value)],
+                                          ctx=ast.Load())
+                                for update in node.updates], ctx=ast.Load())
+        method = ast.Attribute(value=self.expression(node.function), attr="update",
+                               ctx=ast.Load())
+        return call(method, pairs)
+
+
+def traducir(tree, filename="<imperat>"):
+    """Resuelve los nombres del AST de un programa, verifica sus tipos y lo
+        traduce a un objeto de código de Python. Lanza vm.CompileError con
+        el primer error. Devuelve también el módulo de ast generado.
+    """
+    from resolver import Resolver
+    from typechecker import TypeChecker
+
+    errors = Resolver().resolve(tree).errors
+    if errors:
+        raise CompileError(*errors[0])
+    errors = TypeChecker().check(tree).errors
+    if errors:
+        raise CompileError(*errors[0])
+    module = Translator().translate(tree)
+    return compile(module, filename, "exec"), module
+
+
+#------------------------------------------------
+# Caché de objetos de código
+#------------------------------------------------
+
+def cache_path(source):
+    digest = hashlib.sha256(MAGIC + source.encode("utf-8", "surrogatepass")).hexdigest()
+    return os.path.join(CACHE_DIR, f"imperat_{digest}.bin")
+
+
+def load_code(source):
+    """Objeto de código guardado para el texto source, o None."""
+    try:
+        with open(cache_path(source), "rb") as file:
+            data = file.read()
+        if data.startswith(MAGIC):
+            return marshal.loads(data[len(MAGIC):])
+    except (OSError, EOFError, ValueError, TypeError):
+        pass  # no existe, o está dañado y se reemplaza
+    return None
+
+
+def store_code(source, code):
+    path = cache_path(source)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # se escribe aparte y se renombra, así un proceso concurrente nunca
+        # lee un archivo a medio escribir
+        partial = f"{path}.{os.getpid()}"
+        with open(partial, "wb") as file:
+            file.write(MAGIC + marshal.dumps(code))
+        os.replace(partial, path)
+    except OSError:
+        pass  # directorio de solo lectura, se trabaja sin caché
+
+
+#------------------------------------------------
+# Ejecución
+#------------------------------------------------
+
+def error_line(code, error):
+    """Fila del programa donde ocurrió error: la de la última llamada del
+        traceback que pertenece al código traducido."""
+    lineno = 0
+    traceback = error.__traceback__
+    while traceback is not None:
+        if traceback.tb_frame.f_code.co_filename == code.co_filename:
+            lineno = traceback.tb_lineno
+        traceback = traceback.tb_next
+    return lineno
+
+
+def ejecutar(code, out=None):
+    """Ejecuta el objeto de código de un programa escribiendo lo que imprime
+        en out (sys.stdout por defecto). Lanza vm.VMError como vm.ejecutar.
+    """
+    if out is None:
+        out = sys.stdout
+    namespace = {"FunctionValue": FunctionValue, "format_value": format_value,
+                 "VMError": VMError}
+    exec(code, namespace)
+    try:
+        namespace["programa"](out.write)
+    except IndexError as e:
+        index, size = e.args
+        raise VMError(f"Error: Index {index} out of domain 0..{size - 1}",
+                      error_line(code, e))
+
+
+def main():
+    argparser = argparse.ArgumentParser(add_help=True)
+    argparser.add_argument("file")
+    argparser.add_argument("--no-cache", action="store_true",
+                           help="traducir siempre, sin leer ni guardar la caché")
+    argparser.add_argument("--source", action="store_true",
+                           help="mostrar el código de Python generado, sin ejecutarlo")
+    args = argparser.parse_args()
+
+    # Verificar que el archivo tenga la extensión correcta
+    if not args.file.endswith('.imperat'):
+        print("Error: El archivo debe tener extensión .imperat")
+        sys.exit(1)
+
+    # Intentar abrir y leer el archivo
+    try:
+        with open(args.file, 'r') as file:
+            input_data = file.read()
+    except FileNotFoundError:
+        print(f"Error: No se encontró el archivo {args.file}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error al leer el archivo: {str(e)}")
+        sys.exit(1)
+
+    code = None
+    if not args.no_cache and not args.source:
+        code = load_code(input_data)
+
+    if code is None:
+        from parse import parse_source
+        from optimizer import optimizar
+        from resolver import resolver
+        from typechecker import verificar_tipos
+
+        errors = []
+        tree = parse_source(input_data, errors)
+        if tree is not None and not errors:
+            # como en vm.py, los nombres y los tipos se verifican antes de
+            # que el optimizador elimine código
+            resolver(tree, errors)
+            verificar_tipos(tree, errors)
+        if errors:
+            for error in errors:
+                print(error)
+            sys.exit(1)
+        if tree is None:
+            sys.exit(1)
+
+        tree = optimizar(tree)[0]
+        try:
+            code, module = traducir(tree, os.path.abspath(args.file))
+        except CompileError as e:
+            print(e)
+            sys.exit(1)
+        except (RecursionError, SyntaxError) as e:
+            # anidamiento que el compilador de Python no acepta (más de 20
+            # while anidados, expresiones muy profundas)
+            print(f"Error: El programa no se puede traducir a Python: {e}")
+            print("Use python vm.py para ejecutarlo")
+            sys.exit(1)
+        if args.source:
+            print(ast.unparse(module))
+            return
+        if not args.no_cache:
+            store_code(input_data, code)
+
+    try:
+        ejecutar(code)
+    except VMError as e:
+        print(e)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
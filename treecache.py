@@ -0,0 +1,491 @@
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Description: Caché en disco de los resultados de parse.py: el árbol, los
+#   tokens y los errores de cada programa ya analizado.
+#
+#   Cada entrada es un archivo cuyo nombre es el hash del texto del programa
+#   y de la versión de la gramática (el contenido de lexer.py, parse.py,
+#   descent.py y ast_nodes.py), así que un cambio en cualquiera de ellos
+#   invalida las entradas viejas. Este módulo no importa PLY: con la entrada
+#   en la caché, python parse.py imprime el árbol sin construir el lexer ni
+#   el parser.
+#
+#   Formato: una tupla de marshal, comprimida con zlib, con
+#   - la tabla de textos: los de los tokens TkId y TkString (la de
+#     TokenBuffer) seguidos de los demás textos del árbol, cada uno una vez,
+#     y la de los valores de los Literal.
+#   - el árbol como un arreglo de enteros en postorden: por cada nodo, el
+#     número de su clase, su fila, su columna y sus atributos (los textos y
+#     valores como índices en las tablas, y la cantidad de elementos de cada
+#     lista de hijos). Un hijo None es un 0. Se decodifica con una pila de
+#     valores, sin recursión.
+#   - los errores, y las columnas de TokenBuffer como bytes.
+#
+#   Se guardan hasta max_bytes (IMPERAT_TREE_CACHE_MB megabytes, 64 por
+#   defecto). Un acierto actualiza la fecha de modificación de la entrada, y
+#   al superar el tamaño se borran las usadas hace más tiempo (LRU). Los
+#   contadores de aciertos, fallos y entradas borradas se acumulan en
+#   memoria y flush() los agrega como una línea al final de stats.log (una
+#   sola escritura en modo append, así los procesos que escriben a la vez no
+#   pierden cuentas). put() lo llama siempre, y parse.py al terminar.
+#
+#   Uso: python treecache.py [--clear]   muestra los contadores
+
+import hashlib
+import marshal
+import os
+import sys
+import zlib
+from array import array
+
+import cachedir
+from ast_nodes import (Block, DeclareSection, Declare, Secuencing, Asig,
+                       WriteFunction, TwoPoints, If, Guard, While, Print, Skip,
+                       BinOp, UnaryOp, App, Literal, String, Ident, imprimir_ast)
+
+
+# Directorio de la caché, junto a las tablas de lexer.py
+CACHE_DIR = os.path.join(cachedir.CACHE_DIR, "trees")
+
+# columnas de cada línea de stats.log
+STATS_FIELDS = ("hits", "misses", "evictions")
+
+MAX_BYTES = int(float(os.environ.get("IMPERAT_TREE_CACHE_MB", "64")) * (1 << 20))
+
+# versión del formato de las entradas
+FORMAT = 1
+
+# módulos de los que depende el resultado del análisis
+GRAMMAR_SOURCES = ("lexer.py", "parse.py", "descent.py", "ast_nodes.py")
+
+# argumentos del constructor de cada clase: TEXT es un str, RAW un valor que
+# marshal guarda tal cual, NODE un hijo (o None) y LIST una lista de hijos
+TEXT, RAW, NODE, LIST = range(4)
+
+LAYOUTS = [
+    None,  # 0 es un hijo None
+    (Block, (NODE, NODE)),
+    (DeclareSection, (LIST,)),
+    (Declare, (TEXT, LIST, NODE)),
+    (Secuencing, (LIST,)),
+    (Asig, (NODE, NODE)),
+    (WriteFunction, (NODE, LIST)),
+    (TwoPoints, (NODE, NODE)),
+    (If, (LIST,)),
+    (Guard, (NODE, NODE)),
+    (While, (NODE, NODE)),
+    (Print, (NODE,)),
+    (Skip, ()),
+    (BinOp, (TEXT, NODE, NODE)),
+    (UnaryOp, (TEXT, NODE)),
+    (App, (NODE, NODE)),
+    (Literal, (RAW,)),
+    (String, (TEXT,)),
+    (Ident, (TEXT,)),
+]
+
+CLASSES = [layout and layout[0] for layout in LAYOUTS]
+CLASS_IDS = {cls: kind for kind, cls in enumerate(CLASSES) if cls}
+
+
+def arguments(node):
+    """Argumentos del constructor de node, en orden (sin fila ni columna)."""
+    kind = type(node)
+    if kind is Block:
+        return (node.declare, node.body)
+    if kind is DeclareSection:
+        return (node.declarations,)
+    if kind is Declare:
+        return (node.type, node.names, node.size)
+    if kind is Secuencing:
+        return (node.instructions,)
+    if kind is Asig:
+        return (node.target, node.value)
+    if kind is WriteFunction:
+        return (node.function, node.updates)
+    if kind is TwoPoints:
+        return (node.index, node.value)
+    if kind is Guard or kind is While:
+        return (node.condition, node.body)
+    if kind is If:
+        return (node.guards,)
+    if kind is Print:
+        return (node.value,)
+    if kind is BinOp:
+        return (node.op, node.left, node.right)
+    if kind is UnaryOp:
+        return (node.op, node.operand)
+    if kind is App:
+        return (node.function, node.index)
+    if kind is Literal or kind is String:
+        return (node.value,)
+    if kind is Ident:
+        return (node.name,)
+    return ()  # Skip
+
+
+def encode_tree(tree, strings, string_index, literals):
+    """Codifica tree como lista de enteros en postorden. Los textos se
+        agregan a strings (con su índice en string_index) y los valores de
+        los Literal a literals."""
+    codes = []
+    append = codes.append
+    literal_index = {}
+    stack = [(tree, False)]
+    while stack:
+        node, ready = stack.pop()
+        if node is None:
+            append(0)
+            continue
+        kind = CLASS_IDS[type(node)]
+        layout = LAYOUTS[kind][1]
+        args = arguments(node)
+        if not ready:
+            stack.append((node, True))
+            children = []
+            for field, value in zip(layout, args):
+                if field == NODE:
+                    children.append(value)
+                elif field == LIST:
+                    children.extend(value)
+            children.reverse()
+            stack.extend((child, False) for child in children)
+            continue
+        append(kind)
+        append(node.lineno)
+        append(node.column)
+        for field, value in zip(layout, args):
+            if field == TEXT:
+                index = string_index.get(value)
+                if index is None:
+                    index = string_index[value] = len(strings)
+                    strings.append(value)
+                append(index)
+            elif field == RAW:
+                # true y 1 son iguales como claves, por eso se incluye el tipo
+                key = (type(value), value)
+                index = literal_index.get(key)
+                if index is None:
+                    index = literal_index[key] = len(literals)
+                    literals.append(value)
+                append(index)
+            elif field == LIST:
+                append(len(value))
+    return codes
+
+
+def decode_tree(codes, strings, literals):
+    """Reconstruye el árbol codificado por encode_tree. Cada nodo toma sus
+        hijos del tope de la pila values y deja ahí el nodo construido; las
+        clases más frecuentes se comparan primero."""
+    values = []
+    append = values.append
+    pop = values.pop
+    i = 0
+    length = len(codes)
+    while i < length:
+        cls = CLASSES[codes[i]]
+        if cls is None:
+            append(None)
+            i += 1
+            continue
+        lineno = codes[i + 1]
+        column = codes[i + 2]
+        if cls is Ident:
+            append(Ident(strings[codes[i + 3]], lineno, column))
+            i += 4
+        elif cls is Literal:
+            append(Literal(literals[codes[i + 3]], lineno, column))
+            i += 4
+        elif cls is BinOp:
+            right = pop()
+            values[-1] = BinOp(strings[codes[i + 3]], values[-1], right, lineno, column)
+            i += 4
+        elif cls is App or cls is Asig or cls is TwoPoints or cls is Guard \
+                or cls is While or cls is Block:
+            second = pop()
+            values[-1] = cls(values[-1], second, lineno, column)
+            i += 3
+        elif cls is UnaryOp:
+            values[-1] = UnaryOp(strings[codes[i + 3]], values[-1], lineno, column)
+            i += 4
+        elif cls is Print:
+            values[-1] = Print(values[-1], lineno, column)
+            i += 3
+        elif cls is String:
+            append(String(strings[codes[i + 3]], lineno, column))
+            i += 4
+        elif cls is Skip:
+            append(Skip(lineno, column))
+            i += 3
+        elif cls is WriteFunction:
+            start = len(values) - codes[i + 3]
+            updates = values[start:]
+            del values[start:]
+            values[-1] = WriteFunction(values[-1], updates, lineno, column)
+            i += 4
+        elif cls is Declare:
+            size = pop()
+            start = len(values) - codes[i + 4]
+            names = values[start:]
+            del values[start:]
+            append(Declare(strings[codes[i + 3]], names, size, lineno, column))
+            i += 5
+        else:  # Secuencing, If, DeclareSection: una lista de hijos
+            start = len(values) - codes[i + 3]
+            items = values[start:]
+            del values[start:]
+            append(cls(items, lineno, column))
+            i += 4
+    return values[-1] if values else None
+
+
+class Entry():
+    """Resultado guardado del análisis de un programa."""
+    __slots__ = ("tree", "errors", "columns", "token_strings", "strings")
+
+    def __init__(self, tree, errors, columns, token_strings, strings):
+        self.tree = tree
+        self.errors = errors
+        self.columns = columns              # bytes de types, lines, columns, values
+        self.token_strings = token_strings  # textos de los tokens en strings
+        self.strings = strings
+
+    def tokens(self):
+        """Los tokens del programa como un lexer.TokenBuffer (importa el
+            lexer)."""
+        from lexer import TokenBuffer
+
+        buffer = TokenBuffer()
+        types, lines, columns, values, big_numbers = self.columns
+        buffer.types.frombytes(types)
+        buffer.lines.frombytes(lines)
+        buffer.columns.frombytes(columns)
+        buffer.values.frombytes(values)
+        buffer.big_numbers = list(big_numbers)
+        buffer.strings = self.strings[:self.token_strings]
+        buffer.string_index = {text: i for i, text in enumerate(buffer.strings)}
+        return buffer
+
+
+_grammar_version = None
+
+
+def grammar_version():
+    """Hash del código de los módulos de GRAMMAR_SOURCES, leído sin
+        importarlos."""
+    global _grammar_version
+    if _grammar_version is None:
+        h = hashlib.sha256(f"formato {FORMAT}".encode())
+        root = os.path.dirname(os.path.abspath(__file__))
+        for name in GRAMMAR_SOURCES:
+            with open(os.path.join(root, name), "rb") as file:
+                h.update(file.read())
+        _grammar_version = h.digest()
+    return _grammar_version
+
+
+class TreeCache():
+    """Entradas de la caché en directory, hasta max_bytes en total."""
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or CACHE_DIR
+        self.max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+        self.stats_file = os.path.join(self.directory, "stats.log")
+        # cuentas que todavía no están en stats.log
+        self.pending = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def path(self, source):
+        h = hashlib.sha256(grammar_version())
+        h.update(source.encode("utf-8", "surrogatepass"))
+        return os.path.join(self.directory, h.hexdigest() + ".tree")
+
+    def get(self, source):
+        """La Entry de source, o None si no está. Cuenta un acierto."""
+        path = self.path(source)
+        try:
+            with open(path, "rb") as file:
+                data = marshal.loads(zlib.decompress(file.read()))
+            strings, literals, codes, errors, columns, token_strings = data
+            tree = decode_tree(array("I", codes).tolist(), strings, literals)
+            entry = Entry(tree, errors, columns, token_strings, strings)
+        except (OSError, EOFError, ValueError, TypeError, IndexError, zlib.error):
+            return None  # no está, o está dañada y se reemplaza
+        try:
+            os.utime(path)  # usada ahora, para el LRU
+        except OSError:
+            pass
+        self.count(hits=1)
+        return entry
+
+    def put(self, source, tree, errors, buffer):
+        """Guarda el árbol tree, los errores y los tokens (un TokenBuffer) del
+            análisis de source. Cuenta un fallo."""
+        strings = list(buffer.strings)
+        string_index = dict(buffer.string_index)
+        literals = []
+        codes = array("I", encode_tree(tree, strings, string_index, literals))
+        columns = (buffer.types.tobytes(), buffer.lines.tobytes(),
+                   buffer.columns.tobytes(), buffer.values.tobytes(),
+                   buffer.big_numbers)
+        data = zlib.compress(marshal.dumps((strings, literals, codes.tobytes(),
+                                            list(errors), columns, len(buffer.strings))))
+
+        path = self.path(source)
+        evicted = 0
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # se escribe aparte y se renombra, así otro proceso nunca lee
+            # una entrada a medio escribir
+            partial = f"{path}.{os.getpid()}"
+            with open(partial, "wb") as file:
+                file.write(data)
+            os.replace(partial, path)
+            evicted = self.evict(keep=path)
+        except OSError:
+            pass  # directorio de solo lectura, se trabaja sin caché
+        self.count(misses=1, evictions=evicted)
+        self.flush()
+
+    def entries(self):
+        """(fecha de uso, tamaño, path) de cada entrada."""
+        result = []
+        try:
+            with os.scandir(self.directory) as iterator:
+                for item in iterator:
+                    if item.name.endswith(".tree"):
+                        info = item.stat()
+                        result.append((info.st_mtime, info.st_size, item.path))
+        except OSError:
+            pass
+        return result
+
+    def evict(self, keep=None):
+        """Borra las entradas usadas hace más tiempo hasta que el total no
+            supere max_bytes. Devuelve cuántas borró."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+                evicted += 1
+            except OSError:
+                pass
+        return evicted
+
+    def stats(self):
+        """Suma de las líneas de stats.log."""
+        stats = {"hits": 0, "misses": 0, "evictions": 0}
+        try:
+            with open(self.stats_file, "r", encoding="utf-8") as file:
+                for line in file:
+                    values = line.split()
+                    if len(values) == 3 and all(value.isdigit() for value in values):
+                        for name, value in zip(STATS_FIELDS, values):
+                            stats[name] += int(value)
+        except OSError:
+            pass
+        return stats
+
+    def count(self, hits=0, misses=0, evictions=0):
+        """Suma a los contadores pendientes, que se escriben con flush()."""
+        pending = self.pending
+        pending["hits"] += hits
+        pending["misses"] += misses
+        pending["evictions"] += evictions
+
+    def flush(self):
+        """Agrega a stats.log las cuentas pendientes, en una línea."""
+        pending = self.pending
+        if not any(pending.values()):
+            return
+        line = " ".join(str(pending[name]) for name in STATS_FIELDS) + "\n"
+        for name in STATS_FIELDS:
+            pending[name] = 0
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd = os.open(self.stats_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode())
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        try:
+            os.remove(self.stats_file)
+        except OSError:
+            pass
+
+
+def print_entry(entry):
+    """Imprime una entrada como parse.main: los errores, o el árbol."""
+    if entry.errors:
+        for error in entry.errors:
+            print(error)
+    elif entry.tree is not None:
+        imprimir_ast(entry.tree)
+
+
+def main_cached(argv):
+    """python parse.py archivo.imperat con el árbol en la caché: lo imprime
+        y termina el proceso. En cualquier otro caso (otras opciones, un
+        archivo que no se puede leer, un fallo) vuelve, y parse.py sigue.
+        Si buscó el texto y no estaba, lo devuelve, para que parse.py no lo
+        vuelva a buscar."""
+    if len(argv) != 1 or not argv[0].endswith(".imperat"):
+        return None
+    try:
+        with open(argv[0], "r") as file:
+            input_data = file.read()
+    except Exception:
+        return None
+    cache = TreeCache()
+    entry = cache.get(input_data)
+    if entry is not None:
+        try:
+            print_entry(entry)
+        finally:
+            cache.flush()
+        sys.exit(0)
+    return input_data
+
+
+def main():
+    cache = TreeCache()
+    if sys.argv[1:] == ["--clear"]:
+        cache.clear()
+        print(f"Caché borrada: {cache.directory}")
+        return
+    if sys.argv[1:]:
+        print("Uso: python treecache.py [--clear]")
+        sys.exit(1)
+
+    stats = cache.stats()
+    entries = cache.entries()
+    lookups = stats["hits"] + stats["misses"]
+    rate = stats["hits"] / lookups if lookups else 0
+    print(f"Directorio: {cache.directory}")
+    print(f"Entradas: {len(entries)}, "
+          f"{sum(size for _, size, _ in entries) / 1024:.1f} KB "
+          f"de {cache.max_bytes / (1 << 20):.0f} MB")
+    print(f"Aciertos: {stats['hits']}")
+    print(f"Fallos: {stats['misses']}")
+    print(f"Tasa de aciertos: {rate:.1%}")
+    print(f"Entradas borradas (LRU): {stats['evictions']}")
+
+
+if __name__ == "__main__":
+    main()
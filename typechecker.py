@@ -0,0 +1,269 @@
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Description: Verificación estática de tipos sobre el AST, después de
+#   resolver los nombres (resolver.py).
+#
+#   La gramática acepta cualquier combinación de operandos en una expresión
+#   (true + 1, F.x and 3, comparaciones entre funciones). Este pase infiere de
+#   abajo hacia arriba el tipo de cada expresión: int, bool, string o
+#   function[..N], y lo guarda en Expr.type. Un programa que pasa la
+#   verificación no aplica ninguna operación a valores del tipo equivocado,
+#   así que vm.py no revisa los tipos al ejecutar.
+#
+#   - El tipo de una operación se calcula una vez por combinación de
+#     operador y tipos de los operandos y se guarda en rules.
+#   - Una subexpresión con un error de tipos queda con tipo None, y las
+#     expresiones que la contienen no reportan otro error por ella.
+#
+#   Uso: python typechecker.py archivo.imperat
+
+import sys
+from ast_nodes import (Block, Asig, Guard, While, Print, BinOp, UnaryOp,
+                       App, WriteFunction, Literal, String, Ident)
+
+
+# texto de cada operador en los mensajes de error
+OPERATORS = {
+    "Plus": "+", "Minus": "-", "Mult": "*", "Not": "!", "App": ".",
+    "Equal": "==", "NEqual": "<>", "Less": "<", "Leq": "<=",
+    "Greater": ">", "Geq": ">=", "And": "and", "Or": "or",
+}
+
+ARITHMETIC = ("Plus", "Minus", "Mult")
+ORDER = ("Less", "Leq", "Greater", "Geq")
+EQUALITY = ("Equal", "NEqual")
+LOGIC = ("And", "Or")
+
+
+def is_function(type):
+    return type is not None and type.startswith("function")
+
+
+def binary_rule(op, left, right):
+    """Tipo del resultado de left op right, o None si no se puede aplicar."""
+    if op == "Plus" and "string" in (left, right):
+        # concatenación: el otro operando se muestra como lo haría print
+        return "string"
+    if op in ARITHMETIC:
+        return "int" if left == right == "int" else None
+    if op in ORDER:
+        return "bool" if left == right == "int" else None
+    if op in EQUALITY:
+        return "bool" if left == right and left in ("int", "bool", "string") else None
+    if op in LOGIC:
+        return "bool" if left == right == "bool" else None
+    if op == "App":
+        return "int" if is_function(left) and right == "int" else None
+    return None
+
+
+UNARY_RULES = {("Not", "bool"): "bool", ("Minus", "int"): "int"}
+
+
+def operands(node):
+    """Subexpresiones de node, en orden (las de cada par de un F(a:b))."""
+    if type(node) is WriteFunction:
+        result = [node.function]
+        for update in node.updates:
+            result.append(update.index)
+            result.append(update.value)
+        return result
+    return node.children()
+
+
+class TypeChecker():
+    """Verifica los tipos de un árbol con los nombres ya resueltos.
+
+        errors es la lista de (mensaje, fila, columna) de los errores de
+        tipos, en el orden del programa.
+    """
+
+    def __init__(self):
+        self.errors = []
+        self.rules = {}        # (operador, tipo, tipo) -> tipo del resultado
+        self.tables = []       # SymbolTable de los bloques abiertos
+        self.count = 0         # expresiones verificadas
+
+    def check(self, tree):
+        tables = self.tables
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            kind = type(node)
+            if node is None:
+                # salida de un bloque
+                tables.pop()
+            elif kind is Block:
+                tables.append(node.symbols)
+                if node.declare is not None:
+                    self.declarations(node.declare)
+                stack.append(None)
+                if node.body is not None:
+                    stack.append(node.body)
+            elif kind is Asig:
+                target = self.expression(node.target)
+                value = self.expression(node.value)
+                if target is not None and value is not None and target != value:
+                    self.error(f"Error: Variable \"{node.target.name}\" of type "
+                               f"{target} assigned a value of type {value}", node)
+            elif kind is Guard or kind is While:
+                self.expect("bool", node.condition)
+                stack.append(node.body)
+            elif kind is Print:
+                # print muestra valores de cualquier tipo
+                self.expression(node.value)
+            else:
+                children = node.children()
+                children.reverse()
+                stack.extend(children)
+        return self
+
+    def declarations(self, section):
+        """El tamaño de cada function[..N] debe ser un int (la gramática
+            también acepta true y false)."""
+        for declare in section.declarations:
+            if declare.size is not None:
+                self.expect("int", declare.size)
+
+    def expression(self, node):
+        """Verifica la expresión node y devuelve su tipo (None si tiene un
+            error). Los operandos se verifican antes que la operación, con
+            una pila explícita."""
+        stack = [(node, False)]
+        while stack:
+            current, ready = stack.pop()
+            if ready:
+                current.type = self.infer(current)
+                self.count += 1
+                continue
+            stack.append((current, True))
+            children = operands(current)
+            children.reverse()
+            stack.extend((child, False) for child in children)
+        return node.type
+
+    def infer(self, node):
+        """Tipo de node a partir de los tipos ya calculados de sus operandos."""
+        kind = type(node)
+        if kind is Ident:
+            if node.depth is None:
+                # no declarada: ya la reportó resolver.py
+                return None
+            return self.tables[node.depth].declarations[node.slot].type_name()
+        if kind is Literal:
+            return "bool" if isinstance(node.value, bool) else "int"
+        if kind is String:
+            return "string"
+        if kind is BinOp:
+            return self.operation(node.op, node, node.left.type, node.right.type)
+        if kind is App:
+            return self.operation("App", node, node.function.type, node.index.type)
+        if kind is UnaryOp:
+            operand = node.operand.type
+            if operand is None:
+                return None
+            result = UNARY_RULES.get((node.op, operand))
+            if result is None:
+                self.error(f"Error: Operator \"{OPERATORS[node.op]}\" "
+                           f"cannot be applied to {operand}", node)
+            return result
+        # WriteFunction
+        function = node.function.type
+        if function is not None and not is_function(function):
+            self.error(f"Error: Variable \"{node.function.name}\" of type "
+                       f"{function} is not a function", node.function)
+            function = None
+        valid = function is not None
+        # los índices y valores ya se verificaron como operandos
+        for update in node.updates:
+            valid = self.compare("int", update.index, update.index.type) and valid
+            valid = self.compare("int", update.value, update.value.type) and valid
+        return function if valid else None
+
+    def operation(self, op, node, left, right):
+        if left is None or right is None:
+            return None
+        key = (op, left, right)
+        if key in self.rules:
+            result = self.rules[key]
+        else:
+            result = self.rules[key] = binary_rule(op, left, right)
+        if result is None:
+            self.error(f"Error: Operator \"{OPERATORS[op]}\" cannot be applied "
+                       f"to {left} and {right}", node)
+        return result
+
+    def expect(self, expected, node):
+        """Verifica que la expresión node sea de tipo expected."""
+        return self.compare(expected, node, self.expression(node))
+
+    def compare(self, expected, node, found):
+        """Compara found, el tipo ya calculado de la expresión node, con
+            expected."""
+        if found is None:
+            return False
+        if found != expected:
+            self.error(f"Error: Expected type {expected}, found {found}", node)
+            return False
+        return True
+
+    def error(self, message, node):
+        self.errors.append((message, node.lineno, node.column))
+
+
+def format_error(error):
+    message, lineno, column = error
+    return f"{message} in row {lineno}, column {column}"
+
+
+def verificar_tipos(tree, errors=None):
+    """Verifica los tipos de tree, que debe tener los nombres resueltos, y
+        agrega a la lista errors los mensajes de sus errores de tipos.
+        Devuelve el TypeChecker.
+    """
+    checker = TypeChecker().check(tree)
+    if errors is not None:
+        errors.extend(format_error(error) for error in checker.errors)
+    return checker
+
+
+def main():
+    # Verificar que se proporcionó un archivo como argumento
+    if len(sys.argv) != 2:
+        print("Error: Por favor proporcione un archivo .imperat como argumento")
+        print("Uso: python typechecker.py archivo.imperat")
+        sys.exit(1)
+
+    # Verificar que el archivo tenga la extensión correcta
+    if not sys.argv[1].endswith('.imperat'):
+        print("Error: El archivo debe tener extensión .imperat")
+        sys.exit(1)
+
+    # Intentar abrir y leer el archivo
+    try:
+        with open(sys.argv[1], 'r') as file:
+            input_data = file.read()
+    except FileNotFoundError:
+        print(f"Error: No se encontró el archivo {sys.argv[1]}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error al leer el archivo: {str(e)}")
+        sys.exit(1)
+
+    from parse import parse_source
+    from resolver import resolver
+
+    errors = []
+    tree = parse_source(input_data, errors)
+    if tree is not None and not errors:
+        resolver(tree, errors)
+        checker = verificar_tipos(tree, errors)
+    for error in errors:
+        print(error)
+    if errors or tree is None:
+        sys.exit(1)
+    print(f"Expresiones verificadas: {checker.count}")
+    print(f"Reglas de operación calculadas: {len(checker.rules)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,487 @@
+# Owner(s): Sergio Carrillo 14-11315 y David Pereira 18-10245
+# Description: Compilador del AST a bytecode y máquina virtual de pila que
+#   ejecuta los programas .imperat.
+#
+#   El bytecode es un arreglo de enteros de ancho fijo: cada instrucción
+#   ocupa dos posiciones (código de operación y argumento). Las variables se
+#   resuelven al compilar a un índice en el arreglo de variables (slot), y
+#   los if/while se traducen a saltos. El programa se verifica antes con
+#   typechecker.py, así que las operaciones no revisan el tipo de sus
+#   operandos al ejecutar.
+#
+#   Uso: python vm.py archivo.imperat
+
+import sys
+from array import array
+from functions import FunctionValue
+
+
+# Códigos de operación. El argumento es un slot, un índice en la tabla de
+# constantes, un destino de salto o una cantidad, según la instrucción.
+LOAD = 0            # apila slots[arg]
+CONST = 1           # apila consts[arg]
+STORE = 2           # desapila en slots[arg]
+ADD = 3             # suma de enteros; + con un string es CONCAT
+SUB = 4
+MUL = 5
+LT = 6
+LE = 7
+GT = 8
+GE = 9
+EQ = 10
+NE = 11
+NEG = 12
+NOT = 13
+JUMP = 14           # pc = arg
+JUMP_IF_FALSE = 15  # desapila, salta si es falso
+JUMP_IF_FALSE_OR_POP = 16  # and: salta dejando el valor si es falso
+JUMP_IF_TRUE_OR_POP = 17   # or: salta dejando el valor si es verdadero
+APP = 18            # F.i
+UPDATE = 19         # F(a:b)... con arg pares índice:valor
+PRINT = 20
+ABORT = 21          # error en tiempo de ejecución con el mensaje consts[arg]
+HALT = 22
+CONCAT = 23         # concatena el texto con el que print muestra cada valor
+
+OPNAMES = ["LOAD", "CONST", "STORE", "ADD", "SUB", "MUL", "LT", "LE", "GT",
+           "GE", "EQ", "NE", "NEG", "NOT", "JUMP", "JUMP_IF_FALSE",
+           "JUMP_IF_FALSE_OR_POP", "JUMP_IF_TRUE_OR_POP", "APP", "UPDATE",
+           "PRINT", "ABORT", "HALT", "CONCAT"]
+
+BINARY_OPS = {
+    "Plus": ADD,
+    "Minus": SUB,
+    "Mult": MUL,
+    "Less": LT,
+    "Leq": LE,
+    "Greater": GT,
+    "Geq": GE,
+    "Equal": EQ,
+    "NEqual": NE,
+}
+
+# valor inicial de cada tipo de variable
+DEFAULTS = {"int": 0, "bool": False}
+
+
+class CompileError(Exception):
+    """Error al compilar: identificador no declarado o declarado dos veces,
+        o error de tipos."""
+    def __init__(self, message, lineno=0, column=0):
+        Exception.__init__(self, f"{message} in row {lineno}, column {column}")
+        self.lineno = lineno
+        self.column = column
+
+
+class VMError(Exception):
+    """Error en tiempo de ejecución del programa."""
+    def __init__(self, message, lineno=0):
+        Exception.__init__(self, f"{message} in row {lineno}")
+        self.lineno = lineno
+
+
+class Program():
+    """Programa compilado.
+
+        code: arreglo de pares (operación, argumento).
+        consts: tabla de constantes (enteros, booleanos, textos, funciones).
+        lines: fila del código fuente de cada instrucción (code[2*i]).
+        names: nombre de la variable de cada slot.
+    """
+    __slots__ = ("code", "consts", "lines", "names")
+
+    def __init__(self, code, consts, lines, names):
+        self.code = code
+        self.consts = consts
+        self.lines = lines
+        self.names = names
+
+    def disassemble(self):
+        """Devuelve el bytecode en texto, una instrucción por línea."""
+        result = []
+        for pc in range(0, len(self.code), 2):
+            op, arg = self.code[pc], self.code[pc + 1]
+            text = f"{pc:6} {OPNAMES[op]:<22} {arg}"
+            if op in (LOAD, STORE):
+                text += f" ({self.names[arg]})"
+            elif op in (CONST, ABORT):
+                text += f" ({format_value(self.consts[arg])})"
+            result.append(text)
+        return "\n".join(result)
+
+
+def unescape(text):
+    """Interpreta las secuencias de escape \\n, \\" y \\\\ de un String."""
+    if "\\" not in text:
+        return text
+    result = []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "\\" and i + 1 < len(text):
+            i += 1
+            char = "\n" if text[i] == "n" else text[i]
+        result.append(char)
+        i += 1
+    return "".join(result)
+
+
+def format_value(value):
+    """Texto con el que print muestra un valor."""
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, FunctionValue):
+        return ", ".join(f"{i}:{v}" for i, v in enumerate(value))
+    return str(value)
+
+
+#------------------------------------------------
+# Compilador
+#------------------------------------------------
+
+class Compiler():
+    """Traduce un AST a un Program.
+
+        Cada variable declarada recibe un slot propio; un bloque interno que
+        redeclara un nombre usa otro slot. Al entrar a un bloque se emite la
+        inicialización de sus variables, para que un bloque dentro de un
+        ciclo comience siempre con los valores por defecto.
+
+        Los nombres los resuelve antes resolver.py: el slot de un Ident es el
+        primer slot de los bloques de su profundidad más su posición.
+    """
+
+    def __init__(self):
+        self.code = array("l")
+        self.lines = array("l")
+        self.consts = []
+        self.const_index = {}
+        self.names = []
+        self.bases = []     # primer slot de cada bloque abierto, por profundidad
+
+    def compile(self, tree):
+        from resolver import Resolver
+        from typechecker import TypeChecker
+
+        errors = Resolver().resolve(tree).errors
+        if errors:
+            raise CompileError(*errors[0])
+        errors = TypeChecker().check(tree).errors
+        if errors:
+            raise CompileError(*errors[0])
+        self.statement(tree)
+        self.emit(HALT, 0, tree)
+        return Program(self.code, self.consts, self.lines, self.names)
+
+    # utilidades
+
+    def emit(self, op, arg, node):
+        """Agrega una instrucción y devuelve su posición en code."""
+        pc = len(self.code)
+        self.code.append(op)
+        self.code.append(arg)
+        self.lines.append(node.lineno)
+        return pc
+
+    def patch(self, pc, target=None):
+        """Completa el destino del salto en pc (por defecto, la posición actual)."""
+        self.code[pc + 1] = len(self.code) if target is None else target
+
+    def const(self, value):
+        # True y 1 son iguales como claves, por eso se incluye el tipo
+        key = (type(value), id(value) if isinstance(value, FunctionValue) else value)
+        if key not in self.const_index:
+            self.const_index[key] = len(self.consts)
+            self.consts.append(value)
+        return self.const_index[key]
+
+    def lookup(self, ident):
+        return self.bases[ident.depth] + ident.slot
+
+    # instrucciones
+
+    def statement(self, node):
+        getattr(self, "statement_" + type(node).__name__)(node)
+
+    def statement_Block(self, node):
+        self.bases.append(len(self.names))
+        if node.declare is not None:
+            for declare in node.declare.declarations:
+                self.declare(declare)
+        if node.body is not None:
+            self.statement(node.body)
+        self.bases.pop()
+
+    def declare(self, node):
+        if node.type == "function":
+            default = FunctionValue(node.size.value + 1)
+        else:
+            default = DEFAULTS[node.type]
+        for ident in node.names:
+            slot = self.lookup(ident)
+            self.names.append(ident.name)
+            self.emit(CONST, self.const(default), ident)
+            self.emit(STORE, slot, ident)
+
+    def statement_Secuencing(self, node):
+        for instruction in node.instructions:
+            self.statement(instruction)
+
+    def statement_Asig(self, node):
+        self.expression(node.value)
+        self.emit(STORE, self.lookup(node.target), node)
+
+    def statement_If(self, node):
+        exits = []
+        for guard in node.guards:
+            self.expression(guard.condition)
+            skip = self.emit(JUMP_IF_FALSE, 0, guard)
+            self.statement(guard.body)
+            exits.append(self.emit(JUMP, 0, guard))
+            self.patch(skip)
+        self.emit(ABORT, self.const("Error: No guard of the if is true"), node)
+        for pc in exits:
+            self.patch(pc)
+
+    def statement_While(self, node):
+        start = len(self.code)
+        self.expression(node.condition)
+        exit = self.emit(JUMP_IF_FALSE, 0, node)
+        self.statement(node.body)
+        self.emit(JUMP, start, node)
+        self.patch(exit)
+
+    def statement_Print(self, node):
+        self.expression(node.value)
+        self.emit(PRINT, 0, node)
+
+    def statement_Skip(self, node):
+        pass
+
+    # expresiones
+
+    def expression(self, node):
+        getattr(self, "expression_" + type(node).__name__)(node)
+
+    def expression_Literal(self, node):
+        self.emit(CONST, self.const(node.value), node)
+
+    def expression_String(self, node):
+        self.emit(CONST, self.const(unescape(node.value)), node)
+
+    def expression_Ident(self, node):
+        self.emit(LOAD, self.lookup(node), node)
+
+    def expression_BinOp(self, node):
+        if node.op in ("And", "Or"):
+            # evaluación en cortocircuito
+            self.expression(node.left)
+            op = JUMP_IF_FALSE_OR_POP if node.op == "And" else JUMP_IF_TRUE_OR_POP
+            jump = self.emit(op, 0, node)
+            self.expression(node.right)
+            self.patch(jump)
+            return
+        self.expression(node.left)
+        self.expression(node.right)
+        if node.type == "string":
+            self.emit(CONCAT, 0, node)
+        else:
+            self.emit(BINARY_OPS[node.op], 0, node)
+
+    def expression_UnaryOp(self, node):
+        self.expression(node.operand)
+        self.emit(NOT if node.op == "Not" else NEG, 0, node)
+
+    def expression_App(self, node):
+        self.expression(node.function)
+        self.expression(node.index)
+        self.emit(APP, 0, node)
+
+    def expression_WriteFunction(self, node):
+        self.expression(node.function)
+        for update in node.updates:
+            self.expression(update.index)
+            self.expression(update.value)
+        self.emit(UPDATE, len(node.updates), node)
+
+
+def compilar(tree):
+    """Compila el AST de un programa y devuelve su Program."""
+    return Compiler().compile(tree)
+
+
+#------------------------------------------------
+# Máquina virtual
+#------------------------------------------------
+
+def ejecutar(program, out=None):
+    """Ejecuta program escribiendo lo que imprime en out (sys.stdout por
+        defecto). Devuelve la cantidad de instrucciones ejecutadas.
+    """
+    if out is None:
+        out = sys.stdout
+    write = out.write
+    code = program.code
+    consts = program.consts
+    slots = [None] * len(program.names)
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    pc = 0
+    steps = 0
+
+    # copias locales de los códigos de operación (más rápidas que globales)
+    load, const, store, add, sub, mul = LOAD, CONST, STORE, ADD, SUB, MUL
+    concat = CONCAT
+    lt, le, gt, ge, eq, ne = LT, LE, GT, GE, EQ, NE
+    jump, jump_if_false = JUMP, JUMP_IF_FALSE
+    jump_if_false_or_pop, jump_if_true_or_pop = JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP
+    app, neg, not_, update, print_ = APP, NEG, NOT, UPDATE, PRINT
+
+    try:
+        while True:
+            op = code[pc]
+            arg = code[pc + 1]
+            pc += 2
+            steps += 1
+            # las instrucciones más frecuentes se comparan primero
+            if op == load:
+                push(slots[arg])
+            elif op == const:
+                push(consts[arg])
+            elif op == store:
+                slots[arg] = pop()
+            elif op == jump_if_false:
+                if not pop():
+                    pc = arg
+            elif op == add:
+                right = pop()
+                stack[-1] = stack[-1] + right
+            elif op == jump:
+                pc = arg
+            elif op == lt:
+                right = pop()
+                stack[-1] = stack[-1] < right
+            elif op == sub:
+                right = pop()
+                stack[-1] = stack[-1] - right
+            elif op == app:
+                index = pop()
+                function = stack[-1]
+                if function.shift == 0 and 0 <= index < function.size:
+                    # función de hasta 32 elementos: una sola hoja
+                    root = function.root
+                    stack[-1] = root[index] if root is not None else 0
+                else:
+                    stack[-1] = function.get(index)
+            elif op == le:
+                right = pop()
+                stack[-1] = stack[-1] <= right
+            elif op == gt:
+                right = pop()
+                stack[-1] = stack[-1] > right
+            elif op == ge:
+                right = pop()
+                stack[-1] = stack[-1] >= right
+            elif op == eq:
+                right = pop()
+                stack[-1] = stack[-1] == right
+            elif op == ne:
+                right = pop()
+                stack[-1] = stack[-1] != right
+            elif op == mul:
+                right = pop()
+                stack[-1] = stack[-1] * right
+            elif op == jump_if_false_or_pop:
+                if stack[-1]:
+                    pop()
+                else:
+                    pc = arg
+            elif op == jump_if_true_or_pop:
+                if stack[-1]:
+                    pc = arg
+                else:
+                    pop()
+            elif op == not_:
+                stack[-1] = not stack[-1]
+            elif op == neg:
+                stack[-1] = -stack[-1]
+            elif op == update:
+                # todos los pares de la cadena F(a:b)(c:d)... en un solo lote
+                values = stack[len(stack) - 2 * arg:]
+                del stack[len(stack) - 2 * arg:]
+                stack[-1] = stack[-1].update(zip(values[0::2], values[1::2]))
+            elif op == concat:
+                right = pop()
+                stack[-1] = format_value(stack[-1]) + format_value(right)
+            elif op == print_:
+                write(format_value(pop()) + "\n")
+            elif op == ABORT:
+                raise VMError(consts[arg], program.lines[(pc - 2) // 2])
+            else:  # HALT
+                return steps
+    except IndexError as e:
+        function = stack[-1]
+        raise VMError(f"Error: Index {e.args[0]} out of domain 0..{function.size - 1}",
+                      program.lines[(pc - 2) // 2])
+    except (TypeError, AttributeError):
+        raise VMError("Error: Operation applied to values of the wrong type",
+                      program.lines[(pc - 2) // 2])
+
+
+def main():
+    # Verificar que se proporcionó un archivo como argumento
+    if len(sys.argv) != 2:
+        print("Error: Por favor proporcione un archivo .imperat como argumento")
+        print("Uso: python vm.py archivo.imperat")
+        sys.exit(1)
+
+    # Verificar que el archivo tenga la extensión correcta
+    if not sys.argv[1].endswith('.imperat'):
+        print("Error: El archivo debe tener extensión .imperat")
+        sys.exit(1)
+
+    # Intentar abrir y leer el archivo
+    try:
+        with open(sys.argv[1], 'r') as file:
+            input_data = file.read()
+    except FileNotFoundError:
+        print(f"Error: No se encontró el archivo {sys.argv[1]}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error al leer el archivo: {str(e)}")
+        sys.exit(1)
+
+    from parse import parse_source
+    from optimizer import optimizar
+    from resolver import resolver
+    from typechecker import verificar_tipos
+
+    errors = []
+    tree = parse_source(input_data, errors)
+    if tree is not None and not errors:
+        # los nombres y los tipos se verifican en el árbol completo, como en
+        # python client.py check: el optimizador elimina guardias y ciclos
+        # que no se ejecutan, y sus errores también se reportan
+        resolver(tree, errors)
+        verificar_tipos(tree, errors)
+    if errors:
+        for error in errors:
+            print(error)
+        sys.exit(1)
+    if tree is None:
+        sys.exit(1)
+
+    tree = optimizar(tree)[0]
+
+    try:
+        ejecutar(compilar(tree))
+    except (CompileError, VMError) as e:
+        print(e)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()